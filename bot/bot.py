@@ -13,6 +13,7 @@ from sentry_sdk import push_scope
 
 from bot import api, constants
 from bot.async_stats import AsyncStatsClient
+from bot.filter_list_store import FilterListStore
 from bot.log import get_logger
 
 log = get_logger('bot')
@@ -43,6 +44,9 @@ class Bot(commands.Bot):
         self.redis_session = redis_session
         self.api_client: Optional[api.APIClient] = None
         self.filter_list_cache = defaultdict(dict)
+        # Bumped whenever a filter list changes, so anything derived from a list knows when to rebuild.
+        self.filter_list_versions = defaultdict(int)
+        self.filter_list_store = FilterListStore(self)
 
         self._connector = None
         self._resolver = None
@@ -83,11 +87,8 @@ class Bot(commands.Bot):
         self.closing_tasks: List[asyncio.Task] = []
 
     async def cache_filter_list_data(self) -> None:
-        """Cache all the data in the FilterList on the site."""
-        full_cache = await self.api_client.get('bot/filter-lists')
-
-        for item in full_cache:
-            self.insert_item_into_filter_list_cache(item)
+        """Cache all the data in the FilterList on the site, and share it with the other bot processes."""
+        await self.filter_list_store.reload()
 
     async def ping_services(self) -> None:
         """A helper to make sure all the services the bot relies on are available on startup."""
@@ -204,6 +205,8 @@ class Bot(commands.Bot):
         if self.stats._transport:
             self.stats._transport.close()
 
+        await self.filter_list_store.close()
+
         if self.redis_session:
             await self.redis_session.close()
 
@@ -222,6 +225,21 @@ class Bot(commands.Bot):
             "created_at": item["created_at"],
             "updated_at": item["updated_at"],
         }
+        self.filter_list_versions[f"{type_}.{allowed}"] += 1
+
+    def remove_item_from_filter_list_cache(self, type_: str, allowed: bool, content: str) -> None:
+        """Remove an item from the bots filter_list_cache."""
+        self.filter_list_cache[f"{type_}.{allowed}"].pop(content, None)
+        self.filter_list_versions[f"{type_}.{allowed}"] += 1
+
+    def replace_filter_list_cache(self, items: List[Dict[str, str]]) -> None:
+        """Replace all items in the bots filter_list_cache."""
+        for list_key in self.filter_list_cache:
+            self.filter_list_versions[list_key] += 1
+        self.filter_list_cache.clear()
+
+        for item in items:
+            self.insert_item_into_filter_list_cache(item)
 
     async def login(self, *args, **kwargs) -> None:
         """Re-create the connector and set up sessions before logging into Discord."""
@@ -252,8 +270,8 @@ class Bot(commands.Bot):
         except Exception as e:
             raise StartupError(e)
 
-        # Build the FilterList cache
-        await self.cache_filter_list_data()
+        # Build the FilterList cache, from the snapshot shared by all bot processes if there's one.
+        await self.filter_list_store.load()
 
         await self.stats.create_socket()
         await super().login(*args, **kwargs)
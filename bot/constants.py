@@ -632,6 +632,14 @@ class RedirectOutput(metaclass=YAMLGetter):
     delete_invocation: bool
 
 
+class Doc(metaclass=YAMLGetter):
+    section = 'doc'
+
+    parse_processes: int
+    page_cache_size: int
+    refresh_concurrency: int
+
+
 class PythonNews(metaclass=YAMLGetter):
     section = 'python_news'
 
@@ -688,6 +696,14 @@ class VideoPermission(metaclass=YAMLGetter):
     default_permission_duration: int
 
 
+class InfractionScheduling(metaclass=YAMLGetter):
+    section = "infraction_scheduling"
+
+    window: int
+    sweep_interval: int
+    page_size: int
+
+
 class ThreadArchiveTimes(Enum):
     HOUR = 60
     DAY = 1440
@@ -1,24 +1,29 @@
 import abc
+import asyncio
 import typing as t
 from collections import namedtuple
 
-from discord import Guild
+from discord import Guild, Member, NotFound
 from discord.ext.commands import Context
 from more_itertools import chunked
 
 import bot
 from bot.api import ResponseCodeError
 from bot.log import get_logger
-from bot.utils.members import get_or_fetch_member
+from bot.utils import scheduling
 
 log = get_logger(__name__)
 
 CHUNK_SIZE = 1000
+# Maximum number of members fetched from the API at the same time when diffing users.
+FETCH_CONCURRENCY = 10
 
 # These objects are declared as namedtuples because tuples are hashable,
 # something that we make use of when diffing site roles against guild roles.
 _Role = namedtuple('Role', ('id', 'name', 'colour', 'permissions', 'position'))
 _Diff = namedtuple('Diff', ('created', 'updated', 'deleted'))
+# The user fields compared by the user syncer as a tuple, besides roles, which are compared as sets.
+_USER_FIELDS = ('name', 'discriminator', 'in_guild')
 
 
 # Implementation of static abstract methods are not enforced if the subclass is never instantiated.
@@ -144,41 +149,41 @@ class UserSyncer(Syncer):
         """Return the difference of users between the cache of `guild` and the database."""
         log.trace("Getting the diff for users.")
 
+        if not guild.chunked:
+            log.info("Requesting the members of the guild from the gateway before diffing users.")
+            await guild.chunk()
+        # Users missing from a complete member cache aren't in the guild, so they're only fetched if it's incomplete.
+        fetch_missing = not guild.chunked
+
         users_to_create = []
         users_to_update = []
         seen_guild_users = set()
 
-        async for db_user in UserSyncer._get_users():
-            # Store user fields which are to be updated.
-            updated_fields = {}
-
-            def maybe_update(db_field: str, guild_value: t.Union[str, int]) -> None:
-                # Equalize DB user and guild user attributes.
-                if db_user[db_field] != guild_value:
-                    updated_fields[db_field] = guild_value
-
-            if guild_user := await get_or_fetch_member(guild, db_user["id"]):
-                seen_guild_users.add(guild_user.id)
-
-                maybe_update("name", guild_user.name)
-                maybe_update("discriminator", int(guild_user.discriminator))
-                maybe_update("in_guild", True)
-
-                guild_roles = [role.id for role in guild_user.roles]
-                if set(db_user["roles"]) != set(guild_roles):
-                    updated_fields["roles"] = guild_roles
-
-            elif db_user["in_guild"]:
-                # The user is known in the DB but not the guild, and the
-                # DB currently specifies that the user is a member of the guild.
-                # This means that the user has left since the last sync.
-                # Update the `in_guild` attribute of the user on the site
-                # to signify that the user left.
-                updated_fields["in_guild"] = False
-
-            if updated_fields:
-                updated_fields["id"] = db_user["id"]
-                users_to_update.append(updated_fields)
+        user_pages = UserSyncer._get_user_pages()
+        try:
+            async for db_users in user_pages:
+                guild_users = await UserSyncer._get_members(guild, db_users, fetch_missing)
+
+                for db_user, guild_user in zip(db_users, guild_users):
+                    if guild_user:
+                        seen_guild_users.add(guild_user.id)
+                        updated_fields = UserSyncer._get_updated_fields(db_user, guild_user)
+                    elif db_user["in_guild"]:
+                        # The user is known in the DB but not the guild, and the
+                        # DB currently specifies that the user is a member of the guild.
+                        # This means that the user has left since the last sync.
+                        # Update the `in_guild` attribute of the user on the site
+                        # to signify that the user left.
+                        updated_fields = {"in_guild": False}
+                    else:
+                        continue
+
+                    if updated_fields:
+                        updated_fields["id"] = db_user["id"]
+                        users_to_update.append(updated_fields)
+        finally:
+            # Closed explicitly, so the prefetched page is cancelled right away if diffing fails.
+            await user_pages.aclose()
 
         for member in guild.members:
             if member.id not in seen_guild_users:
@@ -196,17 +201,74 @@ class UserSyncer(Syncer):
         return _Diff(users_to_create, users_to_update, None)
 
     @staticmethod
-    async def _get_users() -> t.AsyncIterable:
-        """GET users from database."""
-        query_params = {
-            "page": 1
-        }
-        while query_params["page"]:
-            res = await bot.instance.api_client.get("bot/users", params=query_params)
-            for user in res["results"]:
-                yield user
+    def _get_updated_fields(db_user: dict, guild_user: Member) -> dict:
+        """Return the fields of `db_user` which differ from the guild's `guild_user`, with the guild's values."""
+        db_values = (db_user["name"], db_user["discriminator"], db_user["in_guild"])
+        guild_values = (guild_user.name, int(guild_user.discriminator), True)
+
+        if db_values == guild_values:
+            updated_fields = {}
+        else:
+            updated_fields = {
+                field: guild_value
+                for field, db_value, guild_value in zip(_USER_FIELDS, db_values, guild_values)
+                if db_value != guild_value
+            }
 
-            query_params["page"] = res["next_page_no"]
+        guild_roles = [role.id for role in guild_user.roles]
+        if set(db_user["roles"]) != set(guild_roles):
+            updated_fields["roles"] = guild_roles
+
+        return updated_fields
+
+    @staticmethod
+    async def _get_members(
+        guild: Guild,
+        db_users: t.List[dict],
+        fetch_missing: bool
+    ) -> t.List[t.Optional[Member]]:
+        """
+        Return the member of `guild` for each of `db_users`, or None for users who aren't in the guild.
+
+        If `fetch_missing` is True, users missing from the cache are fetched from the API,
+        with at most `FETCH_CONCURRENCY` requests at the same time.
+        """
+        members = [guild.get_member(db_user["id"]) for db_user in db_users]
+        if not fetch_missing:
+            return members
+
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+        async def fetch_member(index: int) -> None:
+            async with semaphore:
+                try:
+                    members[index] = await guild.fetch_member(db_users[index]["id"])
+                except NotFound:
+                    log.trace("Failed to fetch %d from API.", db_users[index]["id"])
+
+        await asyncio.gather(*(fetch_member(index) for index, member in enumerate(members) if member is None))
+        return members
+
+    @staticmethod
+    async def _get_user_pages() -> t.AsyncIterator[t.List[dict]]:
+        """GET users from database page by page, requesting each page while the previous one is diffed."""
+        next_page = scheduling.create_task(
+            bot.instance.api_client.get("bot/users", params={"page": 1}), name="UserSyncer users page 1"
+        )
+        try:
+            while next_page:
+                res = await next_page
+                if res["next_page_no"]:
+                    next_page = scheduling.create_task(
+                        bot.instance.api_client.get("bot/users", params={"page": res["next_page_no"]}),
+                        name=f"UserSyncer users page {res['next_page_no']}",
+                    )
+                else:
+                    next_page = None
+                yield res["results"]
+        finally:
+            if next_page:
+                next_page.cancel()
 
     @staticmethod
     async def _sync(diff: _Diff) -> None:
@@ -0,0 +1,98 @@
+import re
+import typing as t
+import unicodedata
+
+import regex
+
+SPOILER_RE = re.compile(r"(\|\|.+?\|\|)", re.DOTALL)
+URL_RE = re.compile(r"(https?://[^\s]+)", flags=re.IGNORECASE)
+
+# Exclude variation selectors from zalgo because they're actually invisible.
+VARIATION_SELECTORS = r"\uFE00-\uFE0F\U000E0100-\U000E01EF"
+INVISIBLE_RE = regex.compile(rf"[{VARIATION_SELECTORS}\p{{UNASSIGNED}}\p{{FORMAT}}\p{{CONTROL}}--\s]", regex.V1)
+ZALGO_RE = regex.compile(rf"[\p{{NONSPACING MARK}}\p{{ENCLOSING MARK}}--[{VARIATION_SELECTORS}]]", regex.V1)
+
+
+def clean_input(string: str) -> str:
+    """Remove zalgo and invisible characters from `string`."""
+    # For future consideration: remove characters in the Mc, Sk, and Lm categories too.
+    # Can be normalised with form C to merge char + combining char into a single char to avoid
+    # removing legit diacritics, but this would open up a way to bypass filters.
+    no_zalgo = ZALGO_RE.sub("", string)
+    return INVISIBLE_RE.sub("", no_zalgo)
+
+
+def expand_spoilers(text: str) -> str:
+    """Return a string containing all interpretations of a spoilered message."""
+    split_text = SPOILER_RE.split(text)
+    return ''.join(
+        split_text[0::2] + split_text[1::2] + split_text
+    )
+
+
+class FilterContent:
+    """
+    The content of a message as seen by the filters, normalised once and shared between all of them.
+
+    Each normalised form is computed the first time a filter asks for it and then kept, so filters needing the same
+    form share the work, and forms which no enabled filter needs are never computed. The view is read-only.
+    """
+
+    __slots__ = ("_raw", "_cleaned", "_expanded", "_folded", "_urls")
+
+    def __init__(self, raw: str):
+        self._raw = raw
+
+        self._cleaned: t.Optional[str] = None
+        self._expanded: t.Optional[str] = None
+        self._folded: t.Optional[str] = None
+        self._urls: t.Optional[tuple[str, ...]] = None
+
+    @classmethod
+    def of(cls, content: t.Union[str, "FilterContent"]) -> "FilterContent":
+        """Return `content` as a view, wrapping it in a new one if it's a plain string."""
+        return content if isinstance(content, cls) else cls(content)
+
+    @property
+    def raw(self) -> str:
+        """The content as it was sent."""
+        return self._raw
+
+    @property
+    def cleaned(self) -> str:
+        """The content without zalgo and invisible characters."""
+        if self._cleaned is None:
+            self._cleaned = clean_input(self._raw)
+        return self._cleaned
+
+    @property
+    def expanded(self) -> str:
+        """The cleaned content with all interpretations of its spoilers, if it has any."""
+        if self._expanded is None:
+            if SPOILER_RE.search(self._raw):
+                self._expanded = clean_input(expand_spoilers(self._raw))
+            else:
+                self._expanded = self.cleaned
+        return self._expanded
+
+    @property
+    def folded(self) -> str:
+        """The expanded content with compatibility characters, like fullwidth letters, folded with NFKC."""
+        if self._folded is None:
+            self._folded = unicodedata.normalize("NFKC", self.expanded)
+        return self._folded
+
+    @property
+    def without_backslashes(self) -> str:
+        """The cleaned content without backslashes, which are used to escape e.g. invites."""
+        return self.cleaned.replace("\\", "")
+
+    @property
+    def urls(self) -> tuple[str, ...]:
+        """All URLs in the cleaned content."""
+        if self._urls is None:
+            self._urls = tuple(match.group(1) for match in URL_RE.finditer(self.cleaned))
+        return self._urls
+
+    def __str__(self) -> str:
+        return self._raw
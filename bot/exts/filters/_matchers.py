@@ -0,0 +1,128 @@
+import functools
+import re
+import typing as t
+from collections import defaultdict
+
+import tldextract
+
+from bot.log import get_logger
+
+log = get_logger(__name__)
+
+# Patterns using these can't be wrapped in a group of a larger alternation without changing their meaning.
+BACKREFERENCE_RE = re.compile(r"\\[1-9]|\(\?P=")
+GLOBAL_FLAGS_RE = re.compile(r"^\(\?[aiLmsux]+\)")
+
+# Everything between the scheme, if any, and the path, query or fragment of a URL.
+URL_HOST_RE = re.compile(r"^(?:[a-z][a-z0-9+.\-]*://)?([^/?#]*)", re.IGNORECASE)
+# The same links tend to be spammed over and over, so the parsed hosts are worth remembering.
+DOMAIN_CACHE_SIZE = 4096
+
+
+class PatternMatcher:
+    """
+    Search text for many regular expressions at once.
+
+    The patterns are combined into a single compiled alternation in which every pattern is wrapped in its own named
+    group, so a single pass of the regex engine finds a match for any of them, and the name of the matched group tells
+    which pattern it was. Patterns which can't be combined safely, because they use backreferences or global inline
+    flags, are compiled on their own and tried afterwards. Invalid patterns are logged and skipped.
+
+    When several patterns match, the one matching earliest in the text is reported.
+    """
+
+    def __init__(self, patterns: t.Iterable[str], flags: int = re.IGNORECASE):
+        self.flags = flags
+
+        self._group_patterns: dict[str, str] = {}
+        self._separate: list[tuple[str, re.Pattern]] = []
+        self._combined: t.Optional[re.Pattern] = None
+
+        combinable = []
+        for pattern in patterns:
+            try:
+                compiled = re.compile(pattern, flags)
+            except re.error as e:
+                log.warning(f"Skipping invalid filter pattern {pattern!r}: {e}")
+                continue
+
+            if BACKREFERENCE_RE.search(pattern) or GLOBAL_FLAGS_RE.match(pattern):
+                self._separate.append((pattern, compiled))
+            else:
+                combinable.append((pattern, compiled))
+
+        if not combinable:
+            return
+
+        alternatives = []
+        for index, (pattern, _) in enumerate(combinable):
+            group_name = f"p{index}"
+            self._group_patterns[group_name] = pattern
+            alternatives.append(f"(?P<{group_name}>{pattern})")
+
+        try:
+            self._combined = re.compile("|".join(alternatives), flags)
+        except re.error as e:
+            # A pattern may still clash with the others, e.g. by reusing a group name. Fall back to matching each one.
+            log.warning(f"Could not combine {len(combinable)} filter patterns, matching them separately: {e}")
+            self._group_patterns.clear()
+            self._separate = combinable + self._separate
+
+    def search(self, text: str) -> t.Optional[tuple[str, re.Match]]:
+        """Return the first pattern found in `text` along with its match, or None if no pattern matches."""
+        if self._combined is not None and (match := self._combined.search(text)):
+            # The wrapping group is the outermost one, so it's always the last group to close.
+            return self._group_patterns[match.lastgroup], match
+
+        for pattern, compiled in self._separate:
+            if match := compiled.search(text):
+                return pattern, match
+
+        return None
+
+    def __len__(self) -> int:
+        return len(self._group_patterns) + len(self._separate)
+
+
+@functools.lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def _registered_domain_of_host(host: str) -> str:
+    """Return the registered domain of `host`, parsing each distinct host only once while it's in the cache."""
+    return tldextract.extract(host).registered_domain
+
+
+def registered_domain(url: str) -> str:
+    """Return the registered domain of `url`, e.g. `example.co.uk` for `https://www.example.co.uk/page`."""
+    return _registered_domain_of_host(URL_HOST_RE.match(url.lower()).group(1))
+
+
+class DomainIndex:
+    """
+    Find blacklisted domains in URLs without comparing each URL against every entry.
+
+    The entries are indexed by their registered domain, so a URL is parsed once and then only compared against the
+    entries sharing its registered domain. An entry matches a URL when they share a registered domain and the entry
+    appears in the URL, e.g. `evil.com` matches `https://www.evil.com/page` but not `https://notevil.com`.
+    """
+
+    def __init__(self, entries: t.Iterable[str]):
+        self._entries: defaultdict[str, list[str]] = defaultdict(list)
+        for entry in entries:
+            self._entries[registered_domain(entry)].append(entry)
+
+    def search(self, url: str) -> t.Optional[str]:
+        """Return the blacklisted entry matching `url`, or None if there is none."""
+        if not self._entries:
+            return None
+
+        candidates = self._entries.get(registered_domain(url))
+        if not candidates:
+            return None
+
+        url = url.lower()
+        for entry in candidates:
+            if entry.lower() in url:
+                return entry
+        return None
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
@@ -2,10 +2,8 @@ import asyncio
 from collections import defaultdict
 from collections.abc import Mapping
 from dataclasses import dataclass, field
-from datetime import timedelta
-from itertools import takewhile
-from operator import attrgetter, itemgetter
-from typing import Dict, Iterable, List, Set
+from operator import attrgetter
+from typing import Dict, Iterable, List, Set, Union
 
 import arrow
 from discord import Colour, Member, Message, NotFound, Object, TextChannel
@@ -21,7 +19,8 @@ from bot.exts.events.code_jams._channels import CATEGORY_NAME as JAM_CATEGORY_NA
 from bot.exts.moderation.modlog import ModLog
 from bot.log import get_logger
 from bot.utils import lock, scheduling
-from bot.utils.message_cache import MessageCache
+from bot.utils.message_snapshot import MessageSnapshot
+from bot.utils.message_window import SlidingWindows, WindowRule
 from bot.utils.messages import format_user, send_attachments
 
 log = get_logger(__name__)
@@ -40,6 +39,21 @@ RULE_FUNCTION_MAPPING = {
     'role_mentions': rules.apply_role_mentions,
 }
 
+# Rules without a measure only look at the number of messages in their window.
+RULE_MEASURE_MAPPING = {
+    'attachments': rules.measure_attachments,
+    'chars': rules.measure_chars,
+    'discord_emojis': rules.measure_discord_emojis,
+    'duplicates': rules.measure_duplicates,
+    'links': rules.measure_links,
+    'mentions': rules.measure_mentions,
+    'newlines': rules.measure_newlines,
+    'role_mentions': rules.measure_role_mentions,
+}
+
+# Rules which look at the messages of all authors together, rather than of each author separately.
+SHARED_WINDOW_RULES = {'burst_shared'}
+
 
 @dataclass
 class DeletionContext:
@@ -49,10 +63,15 @@ class DeletionContext:
     triggered_in: TextChannel
     channels: set[TextChannel] = field(default_factory=set)
     rules: Set[str] = field(default_factory=set)
-    messages: Dict[int, Message] = field(default_factory=dict)
+    messages: Dict[int, Union[Message, MessageSnapshot]] = field(default_factory=dict)
     attachments: List[List[str]] = field(default_factory=list)
 
-    async def add(self, rule_name: str, channels: Iterable[TextChannel], messages: Iterable[Message]) -> None:
+    async def add(
+        self,
+        rule_name: str,
+        channels: Iterable[TextChannel],
+        messages: Iterable[Union[Message, MessageSnapshot]],
+    ) -> None:
         """Adds new rule violation events to the deletion context."""
         self.rules.add(rule_name)
 
@@ -125,13 +144,18 @@ class AntiSpam(Cog):
 
         self.message_deletion_queue = dict()
 
-        # Fetch the rule configuration with the highest rule interval.
-        max_interval_config = max(
-            AntiSpamConfig.rules.values(),
-            key=itemgetter('interval')
+        self.windows = SlidingWindows(
+            {
+                rule_name: WindowRule(
+                    interval=rule_config['interval'],
+                    measure=RULE_MEASURE_MAPPING.get(rule_name),
+                    per_author=rule_name not in SHARED_WINDOW_RULES,
+                )
+                for rule_name, rule_config in AntiSpamConfig.rules.items()
+                if rule_name in RULE_FUNCTION_MAPPING
+            },
+            maxlen=AntiSpamConfig.cache_size,
         )
-        self.max_interval = max_interval_config['interval']
-        self.cache = MessageCache(AntiSpamConfig.cache_size, newest_first=True)
 
         scheduling.create_task(
             self.alert_on_validation_error(),
@@ -176,22 +200,17 @@ class AntiSpam(Cog):
         ):
             return
 
-        self.cache.append(message)
-
-        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=self.max_interval)
-        relevant_messages = list(takewhile(lambda msg: msg.created_at > earliest_relevant_at, self.cache))
+        # Add the message to the window of every rule, and expire the messages which fell out of their interval.
+        # Only a snapshot is kept, so the message itself can be freed once it leaves the bot's message cache.
+        self.windows.append(MessageSnapshot.from_message(message), arrow.utcnow().datetime)
 
         for rule_name in AntiSpamConfig.rules:
             rule_config = AntiSpamConfig.rules[rule_name]
             rule_function = RULE_FUNCTION_MAPPING[rule_name]
 
-            # Create a list of messages that were sent in the interval that the rule cares about.
-            latest_interesting_stamp = arrow.utcnow() - timedelta(seconds=rule_config['interval'])
-            messages_for_rule = list(
-                takewhile(lambda msg: msg.created_at > latest_interesting_stamp, relevant_messages)
-            )
-
-            result = await rule_function(message, messages_for_rule, rule_config)
+            # The window holds the messages sent in the interval that the rule cares about,
+            # along with running totals of whatever the rule measures in them.
+            result = await rule_function(message, self.windows.get(rule_name, message), rule_config)
 
             # If the rule returns `None`, that means the message didn't violate it.
             # If it doesn't, it returns a tuple in the form `(str, Iterable[discord.Member])`
@@ -247,7 +266,7 @@ class AntiSpam(Cog):
                 reason=reason
             )
 
-    async def maybe_delete_messages(self, messages: List[Message]) -> None:
+    async def maybe_delete_messages(self, messages: List[Union[Message, MessageSnapshot]]) -> None:
         """Cleans the messages if cleaning is configured."""
         if AntiSpamConfig.clean_offending:
             # If we have more than one message, we can use bulk delete.
@@ -296,8 +315,8 @@ class AntiSpam(Cog):
 
     @Cog.listener()
     async def on_message_edit(self, before: Message, after: Message) -> None:
-        """Updates the message in the cache, if it's cached."""
-        self.cache.update(after)
+        """Updates the message in the rule windows, if it's still in them."""
+        self.windows.update(MessageSnapshot.from_message(after))
 
 
 def validate_config(rules_: Mapping = AntiSpamConfig.rules) -> Dict[str, str]:
@@ -107,8 +107,8 @@ class FilterLists(Cog):
                 f":warning: Heads-up! The new filter `{content}` (`{comment}`) will automatically ban users."
             )
 
-        # Insert the item into the cache
-        self.bot.insert_item_into_filter_list_cache(item)
+        # Insert the item into the cache of every bot process
+        await self.bot.filter_list_store.insert(item)
         await ctx.message.add_reaction("✅")
 
     async def _delete_data(self, ctx: Context, allowed: bool, list_type: ValidFilterListType, content: str) -> None:
@@ -133,7 +133,7 @@ class FilterLists(Cog):
                 await self.bot.api_client.delete(
                     f"bot/filter-lists/{item['id']}"
                 )
-                del self.bot.filter_list_cache[f"{list_type}.{allowed}"][content]
+                await self.bot.filter_list_store.remove(list_type, allowed, content)
                 await ctx.message.add_reaction("✅")
             except ResponseCodeError as e:
                 log.debug(
@@ -1,5 +1,6 @@
 import asyncio
 import re
+import time
 import unicodedata
 from datetime import timedelta
 from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
@@ -7,8 +8,6 @@ from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
 import arrow
 import dateutil.parser
 import discord.errors
-import regex
-import tldextract
 from async_rediscache import RedisCache
 from botcore.regex import DISCORD_INVITE
 from dateutil.relativedelta import relativedelta
@@ -20,10 +19,14 @@ from bot.api import ResponseCodeError
 from bot.bot import Bot
 from bot.constants import Channels, Colours, Filter, Guild, Icons, URLs
 from bot.exts.events.code_jams._channels import CATEGORY_NAME as JAM_CATEGORY_NAME
+from bot.exts.filters._content import FilterContent, URL_RE, ZALGO_RE
+from bot.exts.filters._matchers import DomainIndex, PatternMatcher
 from bot.exts.moderation.modlog import ModLog
 from bot.log import get_logger
 from bot.utils import scheduling
+from bot.utils.caching import TTLCache
 from bot.utils.messages import format_user
+from bot.utils.schedule_journal import ScheduleJournal
 
 log = get_logger(__name__)
 
@@ -34,18 +37,15 @@ CODE_BLOCK_RE = re.compile(
     re.DOTALL | re.MULTILINE
 )
 EVERYONE_PING_RE = re.compile(rf"@everyone|<@&{Guild.id}>|@here")
-SPOILER_RE = re.compile(r"(\|\|.+?\|\|)", re.DOTALL)
-URL_RE = re.compile(r"(https?://[^\s]+)", flags=re.IGNORECASE)
-
-# Exclude variation selectors from zalgo because they're actually invisible.
-VARIATION_SELECTORS = r"\uFE00-\uFE0F\U000E0100-\U000E01EF"
-INVISIBLE_RE = regex.compile(rf"[{VARIATION_SELECTORS}\p{{UNASSIGNED}}\p{{FORMAT}}\p{{CONTROL}}--\s]", regex.V1)
-ZALGO_RE = regex.compile(rf"[\p{{NONSPACING MARK}}\p{{ENCLOSING MARK}}--[{VARIATION_SELECTORS}]]", regex.V1)
 
 # Other constants.
 DAYS_BETWEEN_ALERTS = 3
 OFFENSIVE_MSG_DELETE_TIME = timedelta(days=Filter.offensive_msg_delete_days)
 
+# Invite spam tends to repeat the same few invites, so their resolved data is kept for a while.
+INVITE_CACHE_SIZE = 1024
+INVITE_CACHE_TTL = timedelta(minutes=10)
+
 # Autoban
 LINK_PASSWORD = "https://support.discord.com/hc/en-us/articles/218410947-I-forgot-my-Password-Where-can-I-set-a-new-one"
 LINK_2FA = "https://support.discord.com/hc/en-us/articles/219576828-Setting-up-Two-Factor-Authentication"
@@ -78,12 +78,25 @@ class Filtering(Cog):
 
     # Redis cache mapping a user ID to the last timestamp a bad nickname alert was sent
     name_alerts = RedisCache()
+    # The offensive messages scheduled for deletion, recorded to schedule them again without waiting for the API.
+    schedule_journal = ScheduleJournal()
 
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.scheduler = scheduling.Scheduler(self.__class__.__name__)
+        self.scheduler = scheduling.Scheduler(self.__class__.__name__, lazy_tasks=True)
         self.name_lock = asyncio.Lock()
 
+        # Compiled filter token patterns, along with the version of the filter list they were built from.
+        self._token_matcher: Optional[PatternMatcher] = None
+        self._token_matcher_version: Optional[int] = None
+        # Blacklisted domains indexed by registered domain, along with the version of the filter list.
+        self._domain_index: Optional[DomainIndex] = None
+        self._domain_index_version: Optional[int] = None
+
+        # Resolved invite data keyed by invite code, and the lookups of invites currently being resolved.
+        self._invite_cache = TTLCache(max_size=INVITE_CACHE_SIZE, ttl=INVITE_CACHE_TTL.total_seconds())
+        self._invite_lookups: Dict[str, asyncio.Task] = {}
+
         staff_mistake_str = "If you believe this was a mistake, please let staff know!"
         self.filters = {
             "filter_zalgo": {
@@ -164,13 +177,27 @@ class Filtering(Cog):
         """Fetch one specific value from filter_list_cache."""
         return self.bot.filter_list_cache[f"{list_type.upper()}.{allowed}"][value]
 
-    @staticmethod
-    def _expand_spoilers(text: str) -> str:
-        """Return a string containing all interpretations of a spoilered message."""
-        split_text = SPOILER_RE.split(text)
-        return ''.join(
-            split_text[0::2] + split_text[1::2] + split_text
-        )
+    def _get_token_matcher(self) -> PatternMatcher:
+        """Return the compiled filter token patterns, rebuilding them if the filter list changed since last time."""
+        version = self.bot.filter_list_versions["FILTER_TOKEN.False"]
+        if self._token_matcher is None or version != self._token_matcher_version:
+            watchlist_patterns = self._get_filterlist_items('filter_token', allowed=False)
+            self._token_matcher = PatternMatcher(watchlist_patterns)
+            self._token_matcher_version = version
+            log.trace(f"Compiled {len(self._token_matcher)} filter token patterns.")
+
+        return self._token_matcher
+
+    def _get_domain_index(self) -> DomainIndex:
+        """Return the index of blacklisted domains, rebuilding it if the filter list changed since last time."""
+        version = self.bot.filter_list_versions["DOMAIN_NAME.False"]
+        if self._domain_index is None or version != self._domain_index_version:
+            domain_blacklist = self._get_filterlist_items("domain_name", allowed=False)
+            self._domain_index = DomainIndex(domain_blacklist)
+            self._domain_index_version = version
+            log.trace(f"Indexed {len(self._domain_index)} blacklisted domains.")
+
+        return self._domain_index
 
     @property
     def mod_log(self) -> ModLog:
@@ -205,7 +232,7 @@ class Filtering(Cog):
             delta = relativedelta(after.edited_at, before.created_at).microseconds
         else:
             delta = relativedelta(after.edited_at, before.edited_at).microseconds
-        await self._filter_message(after, delta)
+        await self._filter_message(after, delta, content_changed=before.content != after.content)
 
     def get_name_match(self, name: str) -> Optional[re.Match]:
         """Check bad words from passed string (name). Return the first match found."""
@@ -216,11 +243,11 @@ class Filtering(Cog):
         # in case we have filters for one but not the other.
         names_to_check = (name, normalised_name, cleaned_normalised_name)
 
-        watchlist_patterns = self._get_filterlist_items('filter_token', allowed=False)
-        for pattern in watchlist_patterns:
-            for name in names_to_check:
-                if match := re.search(pattern, name, flags=re.IGNORECASE):
-                    return match
+        matcher = self._get_token_matcher()
+        for name in names_to_check:
+            if result := matcher.search(name):
+                _, match = result
+                return match
         return None
 
     async def check_send_alert(self, member: Member) -> bool:
@@ -277,18 +304,13 @@ class Filtering(Cog):
         filter_triggered = False
         # Should we filter this message?
         if self._check_filter(msg):
+            content = FilterContent(result)
             for filter_name, _filter in self.filters.items():
                 # Is this specific filter enabled in the config?
                 # We also do not need to worry about filters that take the full message,
                 # since all we have is an arbitrary string.
                 if _filter["enabled"] and _filter["content_only"]:
-                    filter_result = await _filter["function"](result)
-                    reason = None
-
-                    if isinstance(filter_result, tuple):
-                        match, reason = filter_result
-                    else:
-                        match = filter_result
+                    match, reason = await self._run_filter(filter_name, _filter, content)
 
                     if match:
                         # If this is a filter (not a watchlist), we set the variable so we know
@@ -303,13 +325,26 @@ class Filtering(Cog):
 
         return filter_triggered
 
-    async def _filter_message(self, msg: Message, delta: Optional[int] = None) -> None:
-        """Filter the input message to see if it violates any of our rules, and then respond accordingly."""
+    async def _filter_message(
+        self, msg: Message, delta: Optional[int] = None, *, content_changed: bool = True
+    ) -> None:
+        """
+        Filter the input message to see if it violates any of our rules, and then respond accordingly.
+
+        The content is normalised once and the same view of it is shared by every filter that only needs the content.
+        Those filters are skipped when `content_changed` is False, i.e. when an edit only changed the embeds or
+        attachments of the message.
+        """
         # Should we filter this message?
         if self._check_filter(msg):
+            content = FilterContent(msg.content)
             for filter_name, _filter in self.filters.items():
                 # Is this specific filter enabled in the config?
                 if _filter["enabled"]:
+                    # The content has already been filtered if it hasn't changed since.
+                    if _filter["content_only"] and not content_changed:
+                        continue
+
                     # Double trigger check for the embeds filter
                     if filter_name == "watch_rich_embeds":
                         # If the edit delta is less than 0.001 seconds, then we're probably dealing
@@ -324,18 +359,8 @@ class Filtering(Cog):
                             continue
 
                     # Does the filter only need the message content or the full message?
-                    if _filter["content_only"]:
-                        payload = msg.content
-                    else:
-                        payload = msg
-
-                    result = await _filter["function"](payload)
-                    reason = None
-
-                    if isinstance(result, tuple):
-                        match, reason = result
-                    else:
-                        match = result
+                    payload = content if _filter["content_only"] else msg
+                    match, reason = await self._run_filter(filter_name, _filter, payload)
 
                     if match:
                         is_private = msg.channel.type is discord.ChannelType.private
@@ -404,6 +429,18 @@ class Filtering(Cog):
 
                         break  # We don't want multiple filters to trigger
 
+    async def _run_filter(
+        self, filter_name: str, _filter: Dict[str, Any], payload: Union[FilterContent, Message]
+    ) -> Tuple[FilterMatch, Optional[str]]:
+        """Run a single filter on `payload`, timing it, and return its match along with the reason, if any."""
+        start = time.perf_counter()
+        result = await _filter["function"](payload)
+        self.bot.stats.timing(f"filters.timings.{filter_name}", (time.perf_counter() - start) * 1000)
+
+        if isinstance(result, tuple):
+            return result
+        return result, None
+
     async def _send_log(
         self,
         filter_name: str,
@@ -503,55 +540,50 @@ class Filtering(Cog):
             and not msg.author.bot                          # Author not a bot
         )
 
-    async def _has_watch_regex_match(self, text: str) -> Tuple[Union[bool, re.Match], Optional[str]]:
+    async def _has_watch_regex_match(
+        self, text: Union[str, FilterContent]
+    ) -> Tuple[Union[bool, re.Match], Optional[str]]:
         """
         Return True if `text` matches any regex from `word_watchlist` or `token_watchlist` configs.
 
         `word_watchlist`'s patterns are placed between word boundaries while `token_watchlist` is
-        matched as-is. Spoilers are expanded, if any, and URLs are ignored.
+        matched as-is. Spoilers are expanded, if any, and the text is also checked with compatibility
+        characters folded, to catch e.g. fullwidth letters.
         Second return value is a reason written to database about blacklist entry (can be None).
         """
-        if SPOILER_RE.search(text):
-            text = self._expand_spoilers(text)
-
-        text = self.clean_input(text)
+        content = FilterContent.of(text)
 
-        watchlist_patterns = self._get_filterlist_items('filter_token', allowed=False)
-        for pattern in watchlist_patterns:
-            match = re.search(pattern, text, flags=re.IGNORECASE)
-            if match:
+        matcher = self._get_token_matcher()
+        # Folding usually changes nothing, in which case the same text isn't searched twice.
+        for candidate in dict.fromkeys((content.expanded, content.folded)):
+            if result := matcher.search(candidate):
+                pattern, match = result
                 return match, self._get_filterlist_value('filter_token', pattern, allowed=False)['comment']
 
         return False, None
 
-    async def _has_urls(self, text: str) -> Tuple[bool, Optional[str]]:
+    async def _has_urls(self, text: Union[str, FilterContent]) -> Tuple[bool, Optional[str]]:
         """
         Returns True if the text contains one of the blacklisted URLs from the config file.
 
         Second return value is a reason of URL blacklisting (can be None).
         """
-        text = self.clean_input(text)
-
-        domain_blacklist = self._get_filterlist_items("domain_name", allowed=False)
-        for match in URL_RE.finditer(text):
-            for url in domain_blacklist:
-                if url.lower() in match.group(1).lower():
-                    blacklisted_parsed = tldextract.extract(url.lower())
-                    url_parsed = tldextract.extract(match.group(1).lower())
-                    if blacklisted_parsed.registered_domain == url_parsed.registered_domain:
-                        return True, self._get_filterlist_value("domain_name", url, allowed=False)["comment"]
+        domain_index = self._get_domain_index()
+        for found_url in FilterContent.of(text).urls:
+            if url := domain_index.search(found_url):
+                return True, self._get_filterlist_value("domain_name", url, allowed=False)["comment"]
         return False, None
 
     @staticmethod
-    async def _has_zalgo(text: str) -> bool:
+    async def _has_zalgo(text: Union[str, FilterContent]) -> bool:
         """
         Returns True if the text contains zalgo characters.
 
         Zalgo range is \u0300 – \u036F and \u0489.
         """
-        return bool(ZALGO_RE.search(text))
+        return bool(ZALGO_RE.search(FilterContent.of(text).raw))
 
-    async def _has_invites(self, text: str) -> Union[dict, bool]:
+    async def _has_invites(self, text: Union[str, FilterContent]) -> Union[dict, bool]:
         """
         Checks if there's any invites in the text content that aren't in the guild whitelist.
 
@@ -560,22 +592,19 @@ class Filtering(Cog):
 
         Attempts to catch some of common ways to try to cheat the system.
         """
-        text = self.clean_input(text)
-
         # Remove backslashes to prevent escape character aroundfuckery like
         # discord\.gg/gdudes-pony-farm
-        text = text.replace("\\", "")
+        text = FilterContent.of(text).without_backslashes
 
-        invites = [m.group("invite") for m in DISCORD_INVITE.finditer(text)]
-        invite_data = dict()
-        for invite in invites:
-            if invite in invite_data:
-                continue
+        # Resolve each distinct invite once, all at the same time.
+        invites = list(dict.fromkeys(m.group("invite") for m in DISCORD_INVITE.finditer(text)))
+        responses = await asyncio.gather(*(self._resolve_invite(invite) for invite in invites))
 
-            response = await self.bot.http_session.get(
-                f"{URLs.discord_invite_api}/{invite}", params={"with_counts": "true"}
-            )
-            response = await response.json()
+        guild_invite_whitelist = self._get_filterlist_items("guild_invite", allowed=True)
+        guild_invite_blacklist = self._get_filterlist_items("guild_invite", allowed=False)
+
+        invite_data = dict()
+        for invite, response in zip(invites, responses):
             guild = response.get("guild")
             if guild is None:
                 # Lack of a "guild" key in the JSON response indicates either an group DM invite, an
@@ -584,8 +613,6 @@ class Filtering(Cog):
                 return True
 
             guild_id = guild.get("id")
-            guild_invite_whitelist = self._get_filterlist_items("guild_invite", allowed=True)
-            guild_invite_blacklist = self._get_filterlist_items("guild_invite", allowed=False)
 
             # Is this invite allowed?
             guild_partnered_or_verified = (
@@ -620,6 +647,35 @@ class Filtering(Cog):
 
         return invite_data if invite_data else False
 
+    async def _resolve_invite(self, invite: str) -> dict:
+        """
+        Return the API data of `invite`, which is cached for a while.
+
+        Concurrent lookups of the same invite share a single request.
+        """
+        if (cached := self._invite_cache.get(invite)) is not None:
+            return cached
+
+        if (lookup := self._invite_lookups.get(invite)) is None:
+            lookup = scheduling.create_task(self._fetch_invite(invite), name=f"Filtering.fetch_invite({invite})")
+            lookup.add_done_callback(lambda _: self._invite_lookups.pop(invite, None))
+            self._invite_lookups[invite] = lookup
+
+        # Shield the lookup so other messages waiting on it don't fail if this one's filtering gets cancelled.
+        return await asyncio.shield(lookup)
+
+    async def _fetch_invite(self, invite: str) -> dict:
+        """Fetch the data of `invite` from the Discord API and cache it, unless the request was unsuccessful."""
+        response = await self.bot.http_session.get(
+            f"{URLs.discord_invite_api}/{invite}", params={"with_counts": "true"}
+        )
+        data = await response.json()
+
+        # Unknown invites are cached too, as they get spammed just as much. Other errors, like rate limits, aren't.
+        if response.status in (200, 404):
+            self._invite_cache.set(invite, data)
+        return data
+
     @staticmethod
     async def _has_rich_embed(msg: Message) -> Union[bool, List[discord.Embed]]:
         """Determines if `msg` contains any rich embeds not auto-generated from a URL."""
@@ -640,8 +696,10 @@ class Filtering(Cog):
         return False
 
     @staticmethod
-    async def _has_everyone_ping(text: str) -> bool:
+    async def _has_everyone_ping(text: Union[str, FilterContent]) -> bool:
         """Determines if `msg` contains an @everyone or @here ping outside of a codeblock."""
+        text = FilterContent.of(text).raw
+
         # First pass to avoid running re.sub on every message
         if not EVERYONE_PING_RE.search(text):
             return False
@@ -664,15 +722,36 @@ class Filtering(Cog):
         """Delete an offensive message once its deletion date is reached."""
         delete_at = dateutil.parser.isoparse(msg['delete_date'])
         self.scheduler.schedule_at(delete_at, msg['id'], self.delete_offensive_msg(msg))
+        scheduling.create_task(self.schedule_journal.add(msg['id'], delete_at, dict(msg)))
 
     async def reschedule_offensive_msg_deletion(self) -> None:
-        """Get all the pending message deletion from the API and reschedule them."""
+        """
+        Reschedule the pending message deletions recorded in the schedule journal, then reconcile them with the API.
+
+        Overdue messages are only deleted once the API confirms their deletion is still pending.
+        """
         await self.bot.wait_until_ready()
-        response = await self.bot.api_client.get('bot/offensive-messages',)
 
         now = arrow.utcnow()
+        journal_items = await self.schedule_journal.items()
+        for item in journal_items:
+            if item.due > now and item.payload['id'] not in self.scheduler:
+                self.schedule_msg_delete(item.payload)
+
+        response = await self.bot.api_client.get('bot/offensive-messages',)
 
+        pending_ids = {msg['id'] for msg in response}
+        for item in journal_items:
+            if item.payload['id'] not in pending_ids:
+                if item.payload['id'] in self.scheduler:
+                    self.scheduler.cancel(item.payload['id'])
+                await self.schedule_journal.remove(item.payload['id'])
+
+        now = arrow.utcnow()
         for msg in response:
+            if msg['id'] in self.scheduler:
+                continue
+
             delete_at = dateutil.parser.isoparse(msg['delete_date'])
 
             if delete_at < now:
@@ -696,17 +775,9 @@ class Filtering(Cog):
             log.warning(f"Failed to delete message {msg['id']}: status {e.status}")
 
         await self.bot.api_client.delete(f'bot/offensive-messages/{msg["id"]}')
+        await self.schedule_journal.remove(msg['id'])
         log.info(f"Deleted the offensive message with id {msg['id']}.")
 
-    @staticmethod
-    def clean_input(string: str) -> str:
-        """Remove zalgo and invisible characters from `string`."""
-        # For future consideration: remove characters in the Mc, Sk, and Lm categories too.
-        # Can be normalised with form C to merge char + combining char into a single char to avoid
-        # removing legit diacritics, but this would open up a way to bypass filters.
-        no_zalgo = ZALGO_RE.sub("", string)
-        return INVISIBLE_RE.sub("", no_zalgo)
-
 
 def setup(bot: Bot) -> None:
     """Load the Filtering cog."""
@@ -64,7 +64,7 @@ class HelpChannels(commands.Cog):
 
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.scheduler = scheduling.Scheduler(self.__class__.__name__)
+        self.scheduler = scheduling.Scheduler(self.__class__.__name__, lazy_tasks=True)
 
         self.guild: discord.Guild = None
         self.cooldown_role: discord.Role = None
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 import asyncio
-import collections
+import heapq
+import itertools
 from collections import defaultdict
-from contextlib import suppress
-from operator import attrgetter
-from typing import Deque, Dict, List, NamedTuple, Optional, Union
+from concurrent.futures import Executor
+from typing import Callable, Collection, Dict, List, NamedTuple, Optional
 
 import discord
 from bs4 import BeautifulSoup
@@ -16,7 +16,8 @@ from bot.log import get_logger
 from bot.utils import scheduling
 
 from . import _cog, doc_cache
-from ._parsing import get_symbol_markdown
+from ._page_cache import PageCache
+from ._parsing import get_page_markdown, get_symbol_markdown
 from ._redis_cache import StaleItemCounter
 
 log = get_logger(__name__)
@@ -61,10 +62,64 @@ class QueueItem(NamedTuple):
     doc_item: _cog.DocItem
     soup: BeautifulSoup
 
-    def __eq__(self, other: Union[QueueItem, _cog.DocItem]):
-        if isinstance(other, _cog.DocItem):
-            return self.doc_item == other
-        return NamedTuple.__eq__(self, other)
+
+class ParseQueue:
+    """
+    The queue of items waiting to be parsed, which items can be moved to the front of.
+
+    Items are kept in a heap of `[priority, QueueItem]` entries, and each `DocItem` is mapped to its entry.
+    Items pushed to the back get increasing priorities, and items moved to the front decreasing negative ones,
+    so the item moved to the front last is popped first. Moving an item replaces the contents of its old entry
+    with None, and such removed entries are skipped when they reach the top of the heap.
+    This makes membership tests constant time, and pushing, popping and moving items logarithmic time.
+    """
+
+    def __init__(self):
+        self._heap: List[list] = []
+        self._entries: Dict[_cog.DocItem, list] = {}
+        self._counter = itertools.count(1)
+
+    def push(self, item: QueueItem) -> None:
+        """Add `item` to the back of the queue, unless an item with its `DocItem` is already queued."""
+        if item.doc_item not in self._entries:
+            self._push(next(self._counter), item)
+
+    def move_to_front(self, doc_item: _cog.DocItem) -> None:
+        """Move the queued item with `doc_item` to the front of the queue."""
+        entry = self._entries[doc_item]
+        item = entry[1]
+        entry[1] = None
+        self._push(-next(self._counter), item)
+
+    def pop(self) -> QueueItem:
+        """Remove and return the item at the front of the queue."""
+        while self._heap:
+            _, item = heapq.heappop(self._heap)
+            if item is not None:
+                del self._entries[item.doc_item]
+                return item
+        raise IndexError("pop from an empty parse queue")
+
+    def clear(self) -> None:
+        """Remove all items from the queue."""
+        self._heap.clear()
+        self._entries.clear()
+
+    def remove_packages(self, packages: Collection[str]) -> None:
+        """Remove the items of symbols from `packages` from the queue."""
+        for doc_item in [doc_item for doc_item in self._entries if doc_item.package in packages]:
+            self._entries.pop(doc_item)[1] = None
+
+    def _push(self, priority: int, item: QueueItem) -> None:
+        entry = [priority, item]
+        self._entries[item.doc_item] = entry
+        heapq.heappush(self._heap, entry)
+
+    def __contains__(self, doc_item: _cog.DocItem) -> bool:
+        return doc_item in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class ParseResultFuture(asyncio.Future):
@@ -84,17 +139,33 @@ class BatchParser:
     """
     Get the Markdown of all symbols on a page and send them to redis when a symbol is requested.
 
-    DocItems are added through the `add_item` method which adds them to the `_page_doc_items` dict.
+    The DocItems on a page are looked up through the `get_page_items` callable the parser is created with.
     `get_markdown` is used to fetch the Markdown; when this is used for the first time on a page,
     all of the symbols are queued to be parsed to avoid multiple web requests to the same page.
+
+    If a `page_executor`, usually a process pool, is given, the symbols of a page are not queued. Instead, the page's
+    HTML is sent to the executor once, and the Markdown of all of its symbols is returned in one batch,
+    with the requested symbol parsed first. This keeps the CPU-bound parsing from blocking the event loop.
+
+    Pages are fetched through the `page_cache` if one is given, so pages which weren't modified aren't downloaded again.
     """
 
-    def __init__(self):
-        self._queue: Deque[QueueItem] = collections.deque()
-        self._page_doc_items: Dict[str, List[_cog.DocItem]] = defaultdict(list)
+    def __init__(
+        self,
+        get_page_items: Callable[[_cog.DocItem], List[_cog.DocItem]],
+        page_executor: Optional[Executor] = None,
+        page_cache: Optional[PageCache] = None,
+    ):
+        self._queue = ParseQueue()
+        self._get_page_items = get_page_items
         self._item_futures: Dict[_cog.DocItem, ParseResultFuture] = defaultdict(ParseResultFuture)
         self._parse_task = None
 
+        self._page_executor = page_executor
+        # The tasks parsing pages in the page executor, mapped to the package of the page.
+        self._page_tasks: Dict[asyncio.Task, str] = {}
+        self._page_cache = page_cache
+
         self.stale_inventory_notifier = StaleInventoryNotifier()
 
     async def get_markdown(self, doc_item: _cog.DocItem) -> Optional[str]:
@@ -109,38 +180,54 @@ class BatchParser:
         if doc_item not in self._item_futures and doc_item not in self._queue:
             self._item_futures[doc_item].user_requested = True
 
-            async with bot.instance.http_session.get(doc_item.url, raise_for_status=True) as response:
-                soup = await bot.instance.loop.run_in_executor(
-                    None,
-                    BeautifulSoup,
-                    await response.text(encoding="utf8"),
-                    "lxml",
-                )
+            html = await self._fetch_page(doc_item.url)
 
-            self._queue.extendleft(QueueItem(item, soup) for item in self._page_doc_items[doc_item.url])
+            if self._page_executor is not None:
+                self._queue_page(doc_item, html)
+                return await self._item_futures[doc_item]
+
+            soup = await bot.instance.loop.run_in_executor(None, BeautifulSoup, html, "lxml")
+            for item in self._get_page_items(doc_item):
+                self._queue.push(QueueItem(item, soup))
             log.debug(f"Added items from {doc_item.url} to the parse queue.")
 
             if self._parse_task is None:
                 self._parse_task = scheduling.create_task(self._parse_queue(), name="Queue parse")
         else:
             self._item_futures[doc_item].user_requested = True
-        with suppress(ValueError):
-            # If the item is not in the queue then the item is already parsed or is being parsed
-            self._move_to_front(doc_item)
+        # If the item is not in the queue then the item is already parsed or is being parsed
+        if doc_item in self._queue:
+            self._queue.move_to_front(doc_item)
+            log.trace(f"Moved {doc_item} to the front of the queue.")
         return await self._item_futures[doc_item]
 
+    async def _fetch_page(self, url: str) -> str:
+        """Return the HTML of the page at `url`."""
+        if self._page_cache is not None:
+            return await self._page_cache.fetch(url)
+
+        async with bot.instance.http_session.get(url, raise_for_status=True) as response:
+            return await response.text(encoding="utf8")
+
     async def _parse_queue(self) -> None:
         """
         Parse all items from the queue, setting their result Markdown on the futures and sending them to redis.
 
+        The results of a page are buffered and sent to redis together when the parser moves on to another page,
+        or when the queue is empty.
         The coroutine will run as long as the queue is not empty, resetting `self._parse_task` to None when finished.
         """
         log.trace("Starting queue parsing.")
+        page_results: Dict[_cog.DocItem, Optional[str]] = {}
         try:
             while self._queue:
                 item, soup = self._queue.pop()
                 markdown = None
 
+                if page_results and item.url != next(iter(page_results)).url:
+                    await self._store_results(page_results)
+                    page_results = {}
+
                 if (future := self._item_futures[item]).done():
                     # Some items are present in the inventories multiple times under different symbol names,
                     # if we already parsed an equal item, we can just skip it.
@@ -148,9 +235,7 @@ class BatchParser:
 
                 try:
                     markdown = await bot.instance.loop.run_in_executor(None, get_symbol_markdown, soup, item)
-                    if markdown is not None:
-                        await doc_cache.set(item, markdown)
-                    else:
+                    if markdown is None:
                         # Don't wait for this coro as the parsing doesn't depend on anything it does.
                         scheduling.create_task(
                             self.stale_inventory_notifier.send_warning(item), name="Stale inventory warning"
@@ -158,37 +243,91 @@ class BatchParser:
                 except Exception:
                     log.exception(f"Unexpected error when handling {item}")
                 future.set_result(markdown)
-                del self._item_futures[item]
+                page_results[item] = markdown
                 await asyncio.sleep(0.1)
         finally:
+            if page_results:
+                await self._store_results(page_results)
             self._parse_task = None
             log.trace("Finished parsing queue.")
 
-    def _move_to_front(self, item: Union[QueueItem, _cog.DocItem]) -> None:
-        """Move `item` to the front of the parse queue."""
-        # The parse queue stores soups along with the doc symbols in QueueItem objects,
-        # in case we're moving a DocItem we have to get the associated QueueItem first and then move it.
-        item_index = self._queue.index(item)
-        queue_item = self._queue[item_index]
-        del self._queue[item_index]
+    async def _store_results(self, results: Dict[_cog.DocItem, Optional[str]]) -> None:
+        """
+        Send the Markdown of the parsed `results` to redis in one batch, and forget their futures.
 
-        self._queue.append(queue_item)
-        log.trace(f"Moved {item} to the front of the queue.")
+        The futures are kept until then, so the items are not fetched again while their results aren't in redis yet.
+        """
+        try:
+            if markdowns := {item: markdown for item, markdown in results.items() if markdown is not None}:
+                await doc_cache.set_many(markdowns)
+        except Exception:
+            log.exception(f"Unexpected error when sending the results from {next(iter(results)).url} to redis")
+        finally:
+            for item in results:
+                self._item_futures.pop(item, None)
+
+    def _queue_page(self, doc_item: _cog.DocItem, html: str) -> None:
+        """Send the page of `doc_item` to the page executor, to parse all of its items in one batch."""
+        # The requested item is parsed first, and items present multiple times under different names only once.
+        items = list(dict.fromkeys((doc_item, *self._get_page_items(doc_item))))
+        for item in items:
+            # Create the futures now, so requests for the other items wait for this batch instead of fetching the page.
+            self._item_futures[item]
+
+        task = scheduling.create_task(self._parse_page(html, items), name=f"Parse page {doc_item.url}")
+        self._page_tasks[task] = doc_item.package
+        task.add_done_callback(self._forget_page_task)
+        log.debug(f"Sent {len(items)} items from {doc_item.url} to be parsed.")
+
+    def _forget_page_task(self, task: asyncio.Task) -> None:
+        self._page_tasks.pop(task, None)
+
+    async def _parse_page(self, html: str, items: List[_cog.DocItem]) -> None:
+        """Parse `items` from the page `html` in the page executor, setting their results and sending them to redis."""
+        try:
+            results = await bot.instance.loop.run_in_executor(self._page_executor, get_page_markdown, html, items)
+        except Exception:
+            log.exception(f"Unexpected error when parsing the page {items[0].url}")
+            results = [None] * len(items)
+
+        page_results = {}
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                log.error(f"Unexpected error when handling {item}", exc_info=result)
+                result = None
+            elif result is None:
+                # Don't wait for this coro as the parsing doesn't depend on anything it does.
+                scheduling.create_task(
+                    self.stale_inventory_notifier.send_warning(item), name="Stale inventory warning"
+                )
+            self._item_futures[item].set_result(result)
+            page_results[item] = result
 
-    def add_item(self, doc_item: _cog.DocItem) -> None:
-        """Map a DocItem to its page so that the symbol will be parsed once the page is requested."""
-        self._page_doc_items[doc_item.url].append(doc_item)
+        await self._store_results(page_results)
 
-    async def clear(self) -> None:
+    async def clear(self, packages: Optional[Collection[str]] = None) -> None:
         """
-        Clear all internal symbol data.
+        Clear all internal symbol data, or only the data of the symbols from `packages` if it's given.
 
-        Wait for all user-requested symbols to be parsed before clearing the parser.
+        Wait for the user-requested symbols which are cleared to be parsed before clearing them.
         """
-        for future in filter(attrgetter("user_requested"), self._item_futures.values()):
-            await future
-        if self._parse_task is not None:
-            self._parse_task.cancel()
-        self._queue.clear()
-        self._page_doc_items.clear()
-        self._item_futures.clear()
+        for item, future in list(self._item_futures.items()):
+            if future.user_requested and (packages is None or item.package in packages):
+                await future
+
+        if packages is None:
+            if self._parse_task is not None:
+                self._parse_task.cancel()
+            for task in self._page_tasks:
+                task.cancel()
+            self._queue.clear()
+            self._item_futures.clear()
+            return
+
+        # Symbols of other packages keep being parsed.
+        for task, package in self._page_tasks.items():
+            if package in packages:
+                task.cancel()
+        self._queue.remove_packages(packages)
+        for item in [item for item in self._item_futures if item.package in packages]:
+            del self._item_futures[item]
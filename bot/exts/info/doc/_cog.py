@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import asyncio
-import sys
 import textwrap
-from collections import defaultdict
+import time
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import suppress
+from pathlib import Path
 from types import SimpleNamespace
-from typing import Dict, NamedTuple, Optional, Tuple, Union
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
 import aiohttp
 import discord
@@ -14,7 +15,7 @@ from discord.ext import commands
 
 from bot.api import ResponseCodeError
 from bot.bot import Bot
-from bot.constants import MODERATION_ROLES, RedirectOutput
+from bot.constants import Doc, MODERATION_ROLES, RedirectOutput
 from bot.converters import Inventory, PackageName, ValidURL, allowed_strings
 from bot.log import get_logger
 from bot.pagination import LinePaginator
@@ -23,26 +24,35 @@ from bot.utils.lock import SharedEvent, lock
 from bot.utils.messages import send_denial, wait_for_deletion
 from bot.utils.scheduling import Scheduler
 
-from . import NAMESPACE, PRIORITY_PACKAGES, _batch_parser, doc_cache
-from ._inventory_parser import InvalidHeaderError, InventoryDict, fetch_inventory
+from . import NAMESPACE, _batch_parser, _symbol_index, doc_cache
+from ._inventory_parser import InvalidHeaderError, InventoryDict
+from ._inventory_store import FetchedInventory, InventoryStore
+from ._page_cache import PageCache
 
 log = get_logger(__name__)
 
-# symbols with a group contained here will get the group prefixed on duplicates
-FORCE_PREFIX_GROUPS = (
-    "term",
-    "label",
-    "token",
-    "doc",
-    "pdbcommand",
-    "2to3fixer",
-)
 NOT_FOUND_DELETE_DELAY = RedirectOutput.delete_delay
 # Delay to wait before trying to reach a rescheduled inventory again, in minutes
 FETCH_RESCHEDULE_DELAY = SimpleNamespace(first=2, repeated=5)
 
 COMMAND_LOCK_SINGLETON = "inventory refresh"
 
+# How many similar symbol names are suggested when a symbol isn't found.
+SUGGESTION_LIMIT = 5
+# Minimum number of seconds between rebuilds of the symbol index while inventories are refreshed.
+INDEX_REBUILD_INTERVAL = 10
+
+# Where the symbol index is stored between restarts.
+SYMBOL_INDEX_PATH = Path(".cache", "doc", "symbols.idx")
+# Where copies of the fetched inventory files are stored.
+INVENTORY_STORE_PATH = Path(".cache", "doc", "inventories")
+# Where compressed copies of the fetched documentation pages are stored.
+PAGE_CACHE_PATH = Path(".cache", "doc", "pages")
+
+# The name, base URL, inventory and inventory digest of a package added to the symbol index.
+# Packages without an inventory, e.g. because it didn't change, keep the symbols they have in the current index.
+PackageSource = Tuple[str, str, Optional[InventoryDict], str]
+
 
 class DocItem(NamedTuple):
     """Holds inventory symbol information."""
@@ -63,20 +73,25 @@ class DocCog(commands.Cog):
     """A set of commands for querying & displaying documentation."""
 
     def __init__(self, bot: Bot):
-        # Contains URLs to documentation home pages.
-        # Used to calculate inventory diffs on refreshes and to display all currently stored inventories.
-        self.base_urls = {}
         self.bot = bot
-        self.doc_symbols: Dict[str, DocItem] = {}  # Maps symbol names to objects containing their metadata.
-        self.item_fetcher = _batch_parser.BatchParser()
-        # Maps a conflicting symbol name to a list of the new, disambiguated names created from conflicts with the name.
-        self.renamed_symbols = defaultdict(list)
+        # The symbols of all inventories. The index from the last run is used until the inventories are refreshed.
+        self.symbol_index = _symbol_index.SymbolIndex.open(SYMBOL_INDEX_PATH) or _symbol_index.SymbolIndex.empty()
+        # Documentation pages are parsed in worker processes if any are configured.
+        self.parse_executor = ProcessPoolExecutor(Doc.parse_processes) if Doc.parse_processes > 0 else None
+        page_cache = PageCache(PAGE_CACHE_PATH, Doc.page_cache_size) if Doc.page_cache_size > 0 else None
+        self.item_fetcher = _batch_parser.BatchParser(self.get_page_items, self.parse_executor, page_cache)
+        self.inventory_store = InventoryStore(INVENTORY_STORE_PATH)
 
         self.inventory_scheduler = Scheduler(self.__class__.__name__)
 
         self.refresh_event = asyncio.Event()
         self.refresh_event.set()
         self.symbol_get_event = SharedEvent()
+        # Held while a new symbol index is built, so concurrent updates don't drop each other's packages.
+        self._index_lock = asyncio.Lock()
+        # Packages waiting to be added by `update_single`, and the task which adds them in one rebuild.
+        self._queued_packages: Dict[str, PackageSource] = {}
+        self._queued_update: Optional[asyncio.Task] = None
 
         self.init_refresh_task = scheduling.create_task(
             self.init_refresh_inventory(),
@@ -84,69 +99,114 @@ class DocCog(commands.Cog):
             event_loop=self.bot.loop,
         )
 
+    @property
+    def base_urls(self) -> Dict[str, str]:
+        """
+        The URLs to the documentation home pages of all packages.
+
+        Used to calculate inventory diffs on refreshes and to display all currently stored inventories.
+        """
+        return self.symbol_index.base_urls
+
+    @property
+    def renamed_symbols(self) -> Dict[str, List[str]]:
+        """Maps a conflicting symbol name to a list of the new, disambiguated names created from conflicts with it."""
+        return self.symbol_index.renamed_symbols
+
     @lock(NAMESPACE, COMMAND_LOCK_SINGLETON, raise_error=True)
     async def init_refresh_inventory(self) -> None:
         """Refresh documentation inventory on cog initialization."""
-        await self.bot.wait_until_guild_available()
-        await self.refresh_inventories()
+        if not self.symbol_index:
+            # Without a stored index there's nothing to look up yet, so lookups wait for the first packages.
+            self.refresh_event.clear()
+        try:
+            await self.bot.wait_until_guild_available()
+            await self.refresh_inventories()
+        finally:
+            self.refresh_event.set()
+
+    def get_page_items(self, doc_item: DocItem) -> List[DocItem]:
+        """Get the items of all symbols on the same page as `doc_item`."""
+        return self.symbol_index.page_items(doc_item)
 
-    def update_single(self, package_name: str, base_url: str, inventory: InventoryDict) -> None:
+    async def update_single(
+        self,
+        package_name: str,
+        base_url: str,
+        inventory: InventoryDict,
+        digest: Optional[str] = None,
+    ) -> None:
         """
-        Build the inventory for a single package.
+        Add a single package to the symbol index, replacing its symbols if it's already present.
 
         Where:
             * `package_name` is the package name to use in logs and when qualifying symbols
             * `base_url` is the root documentation URL for the specified package, used to build
                 absolute paths that link to specific symbols
-            * `package` is the content of a intersphinx inventory.
+            * `inventory` is the content of a intersphinx inventory.
+            * `digest` identifies the version of the inventory, a digest of `inventory` is used if it's not given
+
+        Packages updated while the index is being rebuilt are added together with the next rebuild.
         """
-        self.base_urls[package_name] = base_url
-
-        for group, items in inventory.items():
-            for symbol_name, relative_doc_url in items:
-
-                # e.g. get 'class' from 'py:class'
-                group_name = group.split(":")[1]
-                symbol_name = self.ensure_unique_symbol_name(
-                    package_name,
-                    group_name,
-                    symbol_name,
-                )
-
-                relative_url_path, _, symbol_id = relative_doc_url.partition("#")
-                # Intern fields that have shared content so we're not storing unique strings for every object
-                doc_item = DocItem(
-                    package_name,
-                    sys.intern(group_name),
-                    base_url,
-                    sys.intern(relative_url_path),
-                    symbol_id,
-                )
-                self.doc_symbols[symbol_name] = doc_item
-                self.item_fetcher.add_item(doc_item)
+        new_package = (package_name, base_url, inventory, digest or _symbol_index.inventory_digest(inventory))
+        self._queued_packages[package_name] = new_package
+        if self._queued_update is None:
+            self._queued_update = scheduling.create_task(self._add_queued_packages(), name="Doc queued package update")
+        # Other callers wait for the same rebuild, so it isn't cancelled along with one of them.
+        await asyncio.shield(self._queued_update)
 
         log.trace(f"Fetched inventory for {package_name}.")
 
+    async def _add_queued_packages(self) -> None:
+        """Add all packages queued by `update_single` to the symbol index with a single rebuild."""
+        async with self._index_lock:
+            queued_packages = self._queued_packages
+            self._queued_packages = {}
+            self._queued_update = None
+
+            packages = [
+                queued_packages.pop(name, None) or (name, url, None, self.symbol_index.digests[name])
+                for name, url in self.base_urls.items()
+            ]
+            packages.extend(queued_packages.values())
+            await self._replace_index(packages)
+
     async def update_or_reschedule_inventory(
         self,
         api_package_name: str,
         base_url: str,
         inventory_url: str,
     ) -> None:
+        """Add a package to the symbol index, or reschedule this method if its remote inventory is unreachable."""
+        fetched = await self.fetch_or_reschedule_inventory(api_package_name, base_url, inventory_url)
+        if fetched is not None and fetched.inventory is not None:
+            if not base_url:
+                base_url = self.base_url_from_inventory_url(inventory_url)
+            await self.update_single(api_package_name, base_url, fetched.inventory, fetched.digest)
+
+    async def fetch_or_reschedule_inventory(
+        self,
+        api_package_name: str,
+        base_url: str,
+        inventory_url: str,
+    ) -> Optional[FetchedInventory]:
         """
-        Update the cog's inventories, or reschedule this method to execute again if the remote inventory is unreachable.
+        Fetch the inventory of a package, or schedule the package to be updated again if the inventory is unreachable.
+
+        The inventory is only parsed if it changed since the symbol index was built, otherwise only its digest
+        is returned. None is returned if the inventory couldn't be fetched.
 
         The first attempt is rescheduled to execute in `FETCH_RESCHEDULE_DELAY.first` minutes, the subsequent attempts
         in `FETCH_RESCHEDULE_DELAY.repeated` minutes.
         """
         try:
-            package = await fetch_inventory(inventory_url)
+            fetched = await self.inventory_store.fetch(inventory_url, self.symbol_index.digests.get(api_package_name))
         except InvalidHeaderError as e:
             # Do not reschedule if the header is invalid, as the request went through but the contents are invalid.
             log.warning(f"Invalid inventory header at {inventory_url}. Reason: {e}")
-            return
+            return None
 
-        if not package:
+        if not fetched:
             if api_package_name in self.inventory_scheduler:
                 self.inventory_scheduler.cancel(api_package_name)
                 delay = FETCH_RESCHEDULE_DELAY.repeated
@@ -158,97 +218,169 @@ class DocCog(commands.Cog):
                 api_package_name,
                 self.update_or_reschedule_inventory(api_package_name, base_url, inventory_url),
             )
-        else:
+            return None
+
+        return fetched
+
+    async def refresh_inventories(self) -> None:
+        """
+        Refresh internal documentation inventories.
+
+        Inventories are fetched concurrently, at most `Doc.refresh_concurrency` at a time, and the current symbols stay
+        available meanwhile. They're requested conditionally and only parsed if they changed since the symbol index
+        was built. Packages are swapped into the index as their inventories become ready, so lookups of symbols from
+        refreshed packages don't wait for slow inventories. The first ready packages are swapped in right away, after
+        which the index is rebuilt at most once every `INDEX_REBUILD_INTERVAL` seconds, with all packages which became
+        ready meanwhile. The index isn't rebuilt at all if no package was added, removed or moved, and no inventory
+        changed.
+        """
+        log.debug("Refreshing documentation inventory...")
+        self.inventory_scheduler.cancel_all()
+
+        api_packages = await self.bot.api_client.get("bot/documentation-links")
+        # The packages the index is built from, in the order of the API. Until their inventories are fetched,
+        # packages keep the symbols they have in the current index, and new packages are left out.
+        packages: Dict[str, Optional[PackageSource]] = {}
+        for api_package in api_packages:
+            name = api_package["package"]
+            base_url = api_package["base_url"] or self.base_url_from_inventory_url(api_package["inventory_url"])
+            if name in self.base_urls:
+                packages[name] = (name, base_url, None, self.symbol_index.digests[name])
+            else:
+                packages[name] = None
+
+        semaphore = asyncio.Semaphore(Doc.refresh_concurrency)
+
+        async def fetch(name: str, base_url: str, inventory_url: str) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                fetched = await self.fetch_or_reschedule_inventory(name, base_url, inventory_url)
+                elapsed = (time.perf_counter() - start) * 1000
+
+            if fetched is None:
+                self.bot.stats.timing(f"doc_inventories.{name}.fetch", elapsed)
+                if name not in self.inventory_scheduler:
+                    # Packages which won't be fetched again are dropped, the others keep their symbols until they are.
+                    packages[name] = None
+                return
+
+            self.bot.stats.timing(f"doc_inventories.{name}.fetch", elapsed - fetched.parse_time)
+            self.bot.stats.timing(f"doc_inventories.{name}.parse", fetched.parse_time)
             if not base_url:
                 base_url = self.base_url_from_inventory_url(inventory_url)
-            self.update_single(api_package_name, base_url, package)
+            # Unchanged inventories aren't parsed, and keep the symbols they have in the current index.
+            packages[name] = (name, base_url, fetched.inventory, fetched.digest)
 
-    def ensure_unique_symbol_name(self, package_name: str, group_name: str, symbol_name: str) -> str:
-        """
-        Ensure `symbol_name` doesn't overwrite an another symbol in `doc_symbols`.
+        pending = {
+            asyncio.create_task(
+                fetch(api_package["package"], api_package["base_url"], api_package["inventory_url"]),
+                name=f"Doc inventory fetch {api_package['package']}",
+            )
+            for api_package in api_packages
+        }
+        loop = asyncio.get_running_loop()
+        next_swap = loop.time()
+        ready = False
+        try:
+            while pending:
+                timeout = max(next_swap - loop.time(), 0) if ready else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+                ready = ready or bool(done)
+
+                if ready and pending and loop.time() >= next_swap:
+                    # Also drops packages which were removed from the API, when the first package is swapped in.
+                    await self._swap_in_packages(packages)
+                    ready = False
+                    next_swap = loop.time() + INDEX_REBUILD_INTERVAL
+
+            await self._swap_in_packages(packages)
+        finally:
+            for task in pending:
+                task.cancel()
+        log.debug("Finished inventory refresh.")
 
-        For conflicts, rename either the current symbol or the existing symbol with which it conflicts.
-        Store the new name in `renamed_symbols` and return the name to use for the symbol.
+    async def _swap_in_packages(self, packages: Dict[str, Optional[PackageSource]]) -> None:
+        """
+        Rebuild the symbol index from `packages` if they differ from the packages of the current index.
 
-        If the existing symbol was renamed or there was no conflict, the returned name is equivalent to `symbol_name`.
+        The inventories of packages which were swapped in are replaced with None, as their symbols are then kept
+        in the index.
         """
-        if (item := self.doc_symbols.get(symbol_name)) is None:
-            return symbol_name  # There's no conflict so it's fine to simply use the given symbol name.
-
-        def rename(prefix: str, *, rename_extant: bool = False) -> str:
-            new_name = f"{prefix}.{symbol_name}"
-            if new_name in self.doc_symbols:
-                # If there's still a conflict, qualify the name further.
-                if rename_extant:
-                    new_name = f"{item.package}.{item.group}.{symbol_name}"
-                else:
-                    new_name = f"{package_name}.{group_name}.{symbol_name}"
+        async with self._index_lock:
+            sources = [package for package in packages.values() if package is not None]
+            current = [(name, url, self.symbol_index.digests[name]) for name, url in self.base_urls.items()]
+            if current == [(name, base_url, digest) for name, base_url, _, digest in sources]:
+                return
 
-            self.renamed_symbols[symbol_name].append(new_name)
+            changed = sum(inventory is not None for _, _, inventory, _ in sources)
+            log.debug(f"Rebuilding the symbol index with {changed} changed inventories.")
+            start = time.perf_counter()
+            await self._replace_index(sources)
+            self.bot.stats.timing("doc_inventories.index_rebuild", (time.perf_counter() - start) * 1000)
 
-            if rename_extant:
-                # Instead of renaming the current symbol, rename the symbol with which it conflicts.
-                self.doc_symbols[new_name] = self.doc_symbols[symbol_name]
-                return symbol_name
-            else:
-                return new_name
+            for name, base_url, inventory, digest in sources:
+                if inventory is not None:
+                    packages[name] = (name, base_url, None, digest)
 
-        # When there's a conflict, and the package names of the items differ, use the package name as a prefix.
-        if package_name != item.package:
-            if package_name in PRIORITY_PACKAGES:
-                return rename(item.package, rename_extant=True)
-            else:
-                return rename(package_name)
+    async def _replace_index(self, packages: List[PackageSource]) -> None:
+        """
+        Build a new symbol index from `packages` and swap it in for the current one.
 
-        # If the symbol's group is a non-priority group from FORCE_PREFIX_GROUPS,
-        # add it as a prefix to disambiguate the symbols.
-        elif group_name in FORCE_PREFIX_GROUPS:
-            if item.group in FORCE_PREFIX_GROUPS:
-                needs_moving = FORCE_PREFIX_GROUPS.index(group_name) < FORCE_PREFIX_GROUPS.index(item.group)
-            else:
-                needs_moving = False
-            return rename(item.group if needs_moving else group_name, rename_extant=needs_moving)
+        The index is built and written in an executor. Lookups are only paused while the indices are swapped,
+        and only the parsed and cached symbols of packages which changed are cleared.
+        """
+        old_index = self.symbol_index
+        changed_packages = {
+            name for name, base_url, inventory, _ in packages
+            if inventory is not None or old_index.base_urls.get(name) != base_url
+        }
+        changed_packages.update(old_index.base_urls.keys() - {name for name, *_ in packages})
+
+        def build() -> _symbol_index.SymbolIndex:
+            kept_entries = old_index.package_entries() if any(package[2] is None for package in packages) else {}
+            builder = _symbol_index.SymbolIndexBuilder()
+            for name, base_url, inventory, digest in packages:
+                if inventory is None:
+                    builder.add_package(name, base_url, kept_entries.get(name, ()), digest)
+                else:
+                    builder.add_package(name, base_url, _symbol_index.inventory_entries(inventory), digest)
+            return _symbol_index.SymbolIndex.write(builder, SYMBOL_INDEX_PATH)
 
-        # If the above conditions didn't pass, either the existing symbol has its group in FORCE_PREFIX_GROUPS,
-        # or deciding which item to rename would be arbitrary, so we rename the existing symbol.
-        else:
-            return rename(item.group, rename_extant=True)
+        index = await self.bot.loop.run_in_executor(None, build)
 
-    async def refresh_inventories(self) -> None:
-        """Refresh internal documentation inventories."""
         self.refresh_event.clear()
         await self.symbol_get_event.wait()
-        log.debug("Refreshing documentation inventory...")
-        self.inventory_scheduler.cancel_all()
-
-        self.base_urls.clear()
-        self.doc_symbols.clear()
-        self.renamed_symbols.clear()
-        await self.item_fetcher.clear()
-
-        coros = [
-            self.update_or_reschedule_inventory(
-                package["package"], package["base_url"], package["inventory_url"]
-            ) for package in await self.bot.api_client.get("bot/documentation-links")
-        ]
-        await asyncio.gather(*coros)
-        log.debug("Finished inventory refresh.")
-        self.refresh_event.set()
+        try:
+            await self.item_fetcher.clear(changed_packages)
+            self.symbol_index = index
+            old_index.close()
+            doc_cache.clear_local_cache(changed_packages)
+        finally:
+            self.refresh_event.set()
+        log.debug(f"Loaded a new symbol index with {len(index)} symbols from {len(packages)} packages.")
 
     def get_symbol_item(self, symbol_name: str) -> Tuple[str, Optional[DocItem]]:
         """
-        Get the `DocItem` and the symbol name used to fetch it from the `doc_symbols` dict.
+        Get the `DocItem` and the symbol name used to fetch it from the symbol index.
 
         If the doc item is not found directly from the passed in name and the name contains a space,
         the first word of the name will be attempted to be used to get the item.
         """
-        doc_item = self.doc_symbols.get(symbol_name)
+        doc_item = self.symbol_index.get(symbol_name)
         if doc_item is None and " " in symbol_name:
             symbol_name = symbol_name.split(" ", maxsplit=1)[0]
-            doc_item = self.doc_symbols.get(symbol_name)
+            doc_item = self.symbol_index.get(symbol_name)
 
         return symbol_name, doc_item
 
+    def get_suggestions(self, symbol_name: str) -> List[str]:
+        """Return the names of symbols starting with or similar to `symbol_name`, the most relevant first."""
+        if not symbol_name or symbol_name in self.symbol_index:
+            return []
+        return self.symbol_index.search(symbol_name, SUGGESTION_LIMIT)
+
     async def get_symbol_markdown(self, doc_item: DocItem) -> str:
         """
         Get the Markdown from the symbol `doc_item` refers to.
@@ -350,7 +482,10 @@ class DocCog(commands.Cog):
                 doc_embed = await self.create_symbol_embed(symbol)
 
             if doc_embed is None:
-                error_message = await send_denial(ctx, "No documentation found for the requested symbol.")
+                message = "No documentation found for the requested symbol."
+                if suggestions := self.get_suggestions(symbol):
+                    message += "\nDid you mean: " + ", ".join(f"`{name}`" for name in suggestions)
+                error_message = await send_denial(ctx, message)
                 await wait_for_deletion(error_message, (ctx.author.id,), timeout=NOT_FOUND_DELETE_DELAY)
 
                 # Make sure that we won't cause a ghost-ping by deleting the message
@@ -413,7 +548,7 @@ class DocCog(commands.Cog):
 
         if not base_url:
             base_url = self.base_url_from_inventory_url(inventory_url)
-        self.update_single(package_name, base_url, inventory_dict)
+        await self.update_single(package_name, base_url, inventory_dict)
         await ctx.send(f"Added the package `{package_name}` to the database and updated the inventories.")
 
     @docs_group.command(name="deletedoc", aliases=("removedoc", "rm", "d"))
@@ -470,7 +605,11 @@ class DocCog(commands.Cog):
             await ctx.send("No keys matching the package found.")
 
     def cog_unload(self) -> None:
-        """Clear scheduled inventories, queued symbols and cleanup task on cog unload."""
+        """Clear scheduled inventories, queued symbols and cleanup task, and stop the parse workers on cog unload."""
         self.inventory_scheduler.cancel_all()
         self.init_refresh_task.cancel()
         scheduling.create_task(self.item_fetcher.clear(), name="DocCog.item_fetcher unload clear")
+        self.symbol_index.close()
+        if self.parse_executor is not None:
+            # Pages which are already queued are still parsed, as their symbols may be waited for.
+            self.parse_executor.shutdown(wait=False)
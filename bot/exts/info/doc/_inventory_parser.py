@@ -1,7 +1,7 @@
 import re
 import zlib
 from collections import defaultdict
-from typing import AsyncIterator, DefaultDict, List, Optional, Tuple
+from typing import AsyncIterator, Awaitable, Callable, DefaultDict, List, Optional, Tuple, TypeVar, Union
 
 import aiohttp
 
@@ -11,21 +11,57 @@ from bot.log import get_logger
 log = get_logger(__name__)
 
 FAILED_REQUEST_ATTEMPTS = 3
+FETCH_TIMEOUT = aiohttp.ClientTimeout(sock_connect=5, sock_read=5)
 _V2_LINE_RE = re.compile(r'(?x)(.+?)\s+(\S*:\S*)\s+(-?\d+)\s+?(\S*)\s+(.*)')
 
 InventoryDict = DefaultDict[str, List[Tuple[str, str]]]
 
+T = TypeVar("T")
+
 
 class InvalidHeaderError(Exception):
     """Raised when an inventory file has an invalid header."""
 
 
+class BufferReader:
+    """Provides the parts of `aiohttp.StreamReader` used by the loaders for an inventory which was already read."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self._position = 0
+
+    async def readline(self) -> bytes:
+        """Read the next line, including its line break."""
+        end = self._data.find(b"\n", self._position)
+        end = len(self._data) if end == -1 else end + 1
+        line = self._data[self._position:end]
+        self._position = end
+        return line
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        """Yield the rest of the data in chunks of `n` bytes."""
+        while self._position < len(self._data):
+            yield self._data[self._position:self._position + n]
+            self._position += n
+
+    def __aiter__(self) -> "BufferReader":
+        return self
+
+    async def __anext__(self) -> bytes:
+        if line := await self.readline():
+            return line
+        raise StopAsyncIteration
+
+
+InventoryStream = Union[aiohttp.StreamReader, BufferReader]
+
+
 class ZlibStreamReader:
     """Class used for decoding zlib data of a stream line by line."""
 
     READ_CHUNK_SIZE = 16 * 1024
 
-    def __init__(self, stream: aiohttp.StreamReader) -> None:
+    def __init__(self, stream: InventoryStream) -> None:
         self.stream = stream
 
     async def _read_compressed_chunks(self) -> AsyncIterator[bytes]:
@@ -38,17 +74,22 @@ class ZlibStreamReader:
 
     async def __aiter__(self) -> AsyncIterator[str]:
         """Yield lines of decompressed text."""
-        buf = b''
+        buf = bytearray()
         async for chunk in self._read_compressed_chunks():
             buf += chunk
-            pos = buf.find(b'\n')
-            while pos != -1:
-                yield buf[:pos].decode()
-                buf = buf[pos + 1:]
-                pos = buf.find(b'\n')
+            end = buf.rfind(b"\n")
+            if end == -1:
+                continue
 
+            # Decode all complete lines in the buffer at once, only keeping the incomplete last line in it.
+            with memoryview(buf) as view:
+                lines = str(view[:end], "utf-8").split("\n")
+            del buf[:end + 1]
+            for line in lines:
+                yield line
 
-async def _load_v1(stream: aiohttp.StreamReader) -> InventoryDict:
+
+async def _load_v1(stream: InventoryStream) -> InventoryDict:
     invdata = defaultdict(list)
 
     async for line in stream:
@@ -64,12 +105,23 @@ async def _load_v1(stream: aiohttp.StreamReader) -> InventoryDict:
     return invdata
 
 
-async def _load_v2(stream: aiohttp.StreamReader) -> InventoryDict:
+def _parse_v2_line(line: str) -> Tuple[str, str, str]:
+    """Return the name, type and location of the symbol on a line of a version 2 inventory."""
+    fields = line.split(" ", 4)
+    # Sphinx separates the fields with single spaces, so only names with whitespace need the regex.
+    if len(fields) == 5 and ":" in fields[1] and fields[2].removeprefix("-").isdecimal():
+        name, type_, _prio, location, _dispname = fields
+    else:
+        m = _V2_LINE_RE.match(line.rstrip())
+        name, type_, _prio, location, _dispname = m.groups()  # ignore the parsed items we don't need
+    return name, type_, location
+
+
+async def _load_v2(stream: InventoryStream) -> InventoryDict:
     invdata = defaultdict(list)
 
     async for line in ZlibStreamReader(stream):
-        m = _V2_LINE_RE.match(line.rstrip())
-        name, type_, _prio, location, _dispname = m.groups()  # ignore the parsed items we don't need
+        name, type_, location = _parse_v2_line(line)
         if location.endswith("$"):
             location = location[:-1] + name
 
@@ -77,44 +129,50 @@ async def _load_v2(stream: aiohttp.StreamReader) -> InventoryDict:
     return invdata
 
 
-async def _fetch_inventory(url: str) -> InventoryDict:
-    """Fetch, parse and return an intersphinx inventory file from an url."""
-    timeout = aiohttp.ClientTimeout(sock_connect=5, sock_read=5)
-    async with bot.instance.http_session.get(url, timeout=timeout, raise_for_status=True) as response:
-        stream = response.content
+async def _load_inventory(stream: InventoryStream) -> InventoryDict:
+    """Parse and return an intersphinx inventory file read from `stream`."""
+    inventory_header = (await stream.readline()).decode().rstrip()
+    try:
+        inventory_version = int(inventory_header[-1:])
+    except ValueError:
+        raise InvalidHeaderError("Unable to convert inventory version header.")
 
-        inventory_header = (await stream.readline()).decode().rstrip()
-        try:
-            inventory_version = int(inventory_header[-1:])
-        except ValueError:
-            raise InvalidHeaderError("Unable to convert inventory version header.")
+    has_project_header = (await stream.readline()).startswith(b"# Project")
+    has_version_header = (await stream.readline()).startswith(b"# Version")
+    if not (has_project_header and has_version_header):
+        raise InvalidHeaderError("Inventory missing project or version header.")
 
-        has_project_header = (await stream.readline()).startswith(b"# Project")
-        has_version_header = (await stream.readline()).startswith(b"# Version")
-        if not (has_project_header and has_version_header):
-            raise InvalidHeaderError("Inventory missing project or version header.")
+    if inventory_version == 1:
+        return await _load_v1(stream)
 
-        if inventory_version == 1:
-            return await _load_v1(stream)
+    elif inventory_version == 2:
+        if b"zlib" not in await stream.readline():
+            raise InvalidHeaderError("'zlib' not found in header of compressed inventory.")
+        return await _load_v2(stream)
 
-        elif inventory_version == 2:
-            if b"zlib" not in await stream.readline():
-                raise InvalidHeaderError("'zlib' not found in header of compressed inventory.")
-            return await _load_v2(stream)
+    raise InvalidHeaderError("Incompatible inventory version.")
 
-        raise InvalidHeaderError("Incompatible inventory version.")
 
+async def parse_inventory(data: bytes) -> InventoryDict:
+    """Parse and return the intersphinx inventory file `data`."""
+    return await _load_inventory(BufferReader(data))
 
-async def fetch_inventory(url: str) -> Optional[InventoryDict]:
+
+async def _fetch_inventory(url: str) -> InventoryDict:
+    """Fetch, parse and return an intersphinx inventory file from an url."""
+    async with bot.instance.http_session.get(url, timeout=FETCH_TIMEOUT, raise_for_status=True) as response:
+        return await _load_inventory(response.content)
+
+
+async def retry_fetch(url: str, fetch: Callable[[], Awaitable[T]]) -> Optional[T]:
     """
-    Get an inventory dict from `url`, retrying `FAILED_REQUEST_ATTEMPTS` times on errors.
+    Return the result of `fetch`, retrying `FAILED_REQUEST_ATTEMPTS` times on errors.
 
-    `url` should point at a valid sphinx objects.inv inventory file, which will be parsed into the
-    inventory dict in the format of {"domain:role": [("symbol_name", "relative_url_to_symbol"), ...], ...}
+    `url` is the URL `fetch` requests, used in logs. None is returned if all attempts failed.
     """
     for attempt in range(1, FAILED_REQUEST_ATTEMPTS+1):
         try:
-            inventory = await _fetch_inventory(url)
+            result = await fetch()
         except aiohttp.ClientConnectorError:
             log.warning(
                 f"Failed to connect to inventory url at {url}; "
@@ -133,6 +191,16 @@ async def fetch_inventory(url: str) -> Optional[InventoryDict]:
                 f"trying again ({attempt}/{FAILED_REQUEST_ATTEMPTS})."
             )
         else:
-            return inventory
+            return result
 
     return None
+
+
+async def fetch_inventory(url: str) -> Optional[InventoryDict]:
+    """
+    Get an inventory dict from `url`, retrying `FAILED_REQUEST_ATTEMPTS` times on errors.
+
+    `url` should point at a valid sphinx objects.inv inventory file, which will be parsed into the
+    inventory dict in the format of {"domain:role": [("symbol_name", "relative_url_to_symbol"), ...], ...}
+    """
+    return await retry_fetch(url, lambda: _fetch_inventory(url))
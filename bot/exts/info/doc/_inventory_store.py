@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+import bot
+from bot.log import get_logger
+
+from ._inventory_parser import FETCH_TIMEOUT, InventoryDict, parse_inventory, retry_fetch
+
+log = get_logger(__name__)
+
+
+class FetchedInventory(NamedTuple):
+    """The result of fetching an inventory through the `InventoryStore`."""
+
+    digest: str  # Hash of the inventory file
+    inventory: Optional[InventoryDict]  # The parsed inventory, None if its digest is the one the caller already had
+    parse_time: float = 0.0  # Time spent parsing the inventory, in milliseconds
+
+
+class StoredInventory(NamedTuple):
+    """The validators and digest of the stored copy of an inventory file."""
+
+    digest: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+def inventory_file_digest(data: bytes) -> str:
+    """Return the digest of the inventory file `data`."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class InventoryStore:
+    """
+    Local copies of inventory files, used to fetch inventories conditionally.
+
+    The files are stored under their digests, and each inventory URL is mapped to the digest of the file last fetched
+    from it along with the `ETag` and `Last-Modified` validators it was served with. Requests for a stored inventory
+    send the validators, and a `304 Not Modified` response is served from the local copy.
+    When the file turns out to be the one the caller already has, it isn't parsed at all.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._entries_path = directory / "inventories.json"
+        self._entries = self._load_entries()
+
+    def _load_entries(self) -> Dict[str, StoredInventory]:
+        """Load the stored inventory of every URL, skipping those whose file is gone."""
+        try:
+            entries = json.loads(self._entries_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return {
+            url: StoredInventory(*entry)
+            for url, entry in entries.items()
+            if self._file_path(entry[0]).exists()
+        }
+
+    def _save_entries(self) -> None:
+        """Write the stored inventory of every URL to disk, replacing the previous entries."""
+        temporary_path = self._entries_path.with_suffix(".tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_text(json.dumps(self._entries), encoding="utf-8")
+            os.replace(temporary_path, self._entries_path)
+        except OSError as e:
+            log.warning(f"Could not store the inventory store entries: {e}")
+
+    def _file_path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.inv"
+
+    async def fetch(self, url: str, known_digest: Optional[str] = None) -> Optional[FetchedInventory]:
+        """
+        Fetch the inventory at `url`, retrying `FAILED_REQUEST_ATTEMPTS` times on errors.
+
+        If the digest of the inventory file is `known_digest`, the file isn't parsed and no inventory is returned.
+        None is returned if the inventory couldn't be fetched.
+        """
+        return await retry_fetch(url, lambda: self._fetch(url, known_digest))
+
+    async def _fetch(self, url: str, known_digest: Optional[str]) -> FetchedInventory:
+        stored = self._entries.get(url)
+        headers = {}
+        if stored is not None:
+            if stored.etag:
+                headers["If-None-Match"] = stored.etag
+            if stored.last_modified:
+                headers["If-Modified-Since"] = stored.last_modified
+
+        async with bot.instance.http_session.get(
+            url, headers=headers, timeout=FETCH_TIMEOUT, raise_for_status=True
+        ) as response:
+            if stored is not None and response.status == 304:
+                data = None
+                digest = stored.digest
+            else:
+                data = await response.read()
+                digest = inventory_file_digest(data)
+            etag = response.headers.get("ETag", stored and stored.etag)
+            last_modified = response.headers.get("Last-Modified", stored and stored.last_modified)
+
+        log.trace(f"Fetched inventory from {url}, {'not ' if data is None else ''}modified.")
+        parse_start = time.perf_counter()
+        if digest == known_digest:
+            inventory = None
+        elif data is None:
+            # Parse the local copy, e.g. when the caller didn't have the inventory yet.
+            try:
+                data = await bot.instance.loop.run_in_executor(None, self._file_path(digest).read_bytes)
+            except OSError:
+                # Request the whole file again on the next attempt.
+                del self._entries[url]
+                raise
+            inventory = await parse_inventory(data)
+        else:
+            # Invalid inventories raise here and are never stored.
+            inventory = await parse_inventory(data)
+        parse_time = (time.perf_counter() - parse_start) * 1000 if inventory is not None else 0.0
+
+        if stored is None or (data is not None and digest != stored.digest):
+            if await bot.instance.loop.run_in_executor(None, self._store_file, digest, data):
+                self._entries[url] = StoredInventory(digest, etag, last_modified)
+            else:
+                self._entries.pop(url, None)
+        else:
+            self._entries[url] = StoredInventory(digest, etag, last_modified)
+
+        if stored is not None and all(entry.digest != stored.digest for entry in self._entries.values()):
+            self._file_path(stored.digest).unlink(missing_ok=True)
+        self._save_entries()
+
+        return FetchedInventory(digest, inventory, parse_time)
+
+    def _store_file(self, digest: str, data: bytes) -> bool:
+        """Store the inventory file `data` under `digest`, returning whether it was stored."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file_path(digest).write_bytes(data)
+        except OSError as e:
+            log.warning(f"Could not store the inventory file {digest}: {e}")
+            return False
+        return True
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import zlib
+from contextlib import suppress
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import bot
+from bot.log import get_logger
+
+log = get_logger(__name__)
+
+# Cached pages are stored as a line of JSON with the page's URL and validators, followed by the compressed HTML.
+PAGE_SUFFIX = ".html.z"
+
+
+class CachedPage(NamedTuple):
+    """A documentation page stored by the `PageCache`, along with the validators it was served with."""
+
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    html: str
+
+
+def page_file_name(url: str) -> str:
+    """Return the name of the file the page at `url` is stored in."""
+    return hashlib.blake2b(url.encode(), digest_size=16).hexdigest() + PAGE_SUFFIX
+
+
+class PageCache:
+    """
+    Compressed copies of documentation pages, used to fetch pages conditionally.
+
+    Every page is stored in its own file named after its URL, together with the `ETag` and `Last-Modified` validators
+    it was served with. Requests for a stored page send the validators, and a `304 Not Modified` response is served
+    from the local copy, so pages whose symbols expired from redis or were cleared by a refresh aren't downloaded again.
+
+    As all state is kept in the files, several bot processes can share the same directory. The modification time of a
+    file is updated whenever its page is used, and the least recently used pages are deleted when the size of the
+    directory grows past `max_size` bytes.
+    """
+
+    def __init__(self, directory: Path, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+        self._size = sum(size for _, size, _ in self._stored_pages())
+
+    def _stored_pages(self) -> List[Tuple[float, int, str]]:
+        """Return the modification time, size and path of every stored page."""
+        pages = []
+        try:
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(PAGE_SUFFIX):
+                    continue
+                # Pages may be deleted by other processes while they're listed.
+                with suppress(FileNotFoundError):
+                    stat = entry.stat()
+                    pages.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log.warning(f"Could not list the stored pages: {e}")
+        return pages
+
+    async def fetch(self, url: str) -> str:
+        """Return the HTML of the page at `url`, revalidating the stored copy if there is one."""
+        loop = bot.instance.loop
+        cached = await loop.run_in_executor(None, self._read, url)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        async with bot.instance.http_session.get(url, headers=headers, raise_for_status=True) as response:
+            if cached is not None and response.status == 304:
+                log.trace(f"Using the stored copy of {url}, not modified.")
+                bot.instance.stats.incr("doc_page_cache.hits")
+                await loop.run_in_executor(None, self._touch, url)
+                return cached.html
+
+            html = await response.text(encoding="utf8")
+            page = CachedPage(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), html)
+
+        bot.instance.stats.incr("doc_page_cache.misses")
+        if page.etag or page.last_modified:
+            await loop.run_in_executor(None, self._store, page)
+        return html
+
+    def _read(self, url: str) -> Optional[CachedPage]:
+        """Read the stored copy of the page at `url`, returning None if there's none or it can't be read."""
+        path = self.directory / page_file_name(url)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+
+        try:
+            header, compressed = data.split(b"\n", maxsplit=1)
+            page = CachedPage(**json.loads(header), html=zlib.decompress(compressed).decode("utf8"))
+        except (ValueError, TypeError, zlib.error) as e:
+            log.warning(f"Deleting the invalid stored copy of {url}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        # Files named the same for different URLs are practically impossible, but wouldn't be the right page.
+        return page if page.url == url else None
+
+    def _touch(self, url: str) -> None:
+        """Mark the stored copy of the page at `url` as recently used."""
+        with suppress(OSError):
+            os.utime(self.directory / page_file_name(url))
+
+    def _store(self, page: CachedPage) -> None:
+        """Store `page`, deleting the least recently used pages if the cache grows too large."""
+        header = json.dumps({"url": page.url, "etag": page.etag, "last_modified": page.last_modified}).encode()
+        data = b"\n".join((header, zlib.compress(page.html.encode("utf8"))))
+        path = self.directory / page_file_name(page.url)
+        # Other processes may write the same page at the same time.
+        temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            try:
+                previous_size = path.stat().st_size
+            except FileNotFoundError:
+                previous_size = 0
+            temporary_path.write_bytes(data)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            log.warning(f"Could not store the page {page.url}: {e}")
+            return
+
+        self._size += len(data) - previous_size
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete the least recently used pages until the stored pages fit into `max_size` bytes."""
+        # The size is recounted as other processes may have stored or deleted pages.
+        pages = sorted(self._stored_pages())
+        self._size = sum(size for _, size, _ in pages)
+        evicted = 0
+        for _, size, path in pages:
+            if self._size <= self.max_size:
+                break
+            try:
+                Path(path).unlink(missing_ok=True)
+            except OSError as e:
+                log.warning(f"Could not delete the stored page {path}: {e}")
+                continue
+            self._size -= size
+            evicted += 1
+        log.debug(f"Deleted {evicted} least recently used pages from the page cache.")
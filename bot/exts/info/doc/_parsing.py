@@ -234,6 +234,23 @@ def _create_markdown(signatures: Optional[List[str]], description: Iterable[Tag]
         return description
 
 
+def get_page_markdown(html: str, items: List[DocItem]) -> List[Union[str, None, Exception]]:
+    """
+    Parse the page `html` once and return the Markdown of each of `items`, which are all on the page.
+
+    Used to parse whole pages in a separate process. The result for an item is None if it isn't on the page,
+    or the exception raised while parsing it.
+    """
+    soup = BeautifulSoup(html, "lxml")
+    results = []
+    for item in items:
+        try:
+            results.append(get_symbol_markdown(soup, item))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
 def get_symbol_markdown(soup: BeautifulSoup, symbol_data: DocItem) -> Optional[str]:
     """
     Return parsed Markdown of the passed item using the passed in soup, truncated to fit within a discord message.
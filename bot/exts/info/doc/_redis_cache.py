@@ -1,54 +1,113 @@
 from __future__ import annotations
 
 import datetime
-from typing import Optional, TYPE_CHECKING
+from collections import defaultdict
+from typing import Collection, Dict, Optional, TYPE_CHECKING
 
 from async_rediscache.types.base import RedisObject, namespace_lock
 
+import bot
+from bot.utils.caching import TTLCache
+
 if TYPE_CHECKING:
     from ._cog import DocItem
 
 WEEK_SECONDS = datetime.timedelta(weeks=1).total_seconds()
 
+# How many of the most recently requested symbols are kept in memory in front of redis.
+LOCAL_CACHE_SIZE = 1024
+# Bounds how long a symbol deleted from redis by another process can still be served from memory.
+LOCAL_CACHE_TTL = datetime.timedelta(hours=1).total_seconds()
+
 
 class DocRedisCache(RedisObject):
-    """Interface for redis functionality needed by the Doc cog."""
+    """
+    Interface for redis functionality needed by the Doc cog.
+
+    The Markdown of the most recently requested symbols is also kept in an in-process LRU cache,
+    so popular symbols don't need a round-trip to redis.
+    """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._set_expires = set()
+        self._local_cache = TTLCache(max_size=LOCAL_CACHE_SIZE, ttl=LOCAL_CACHE_TTL)
 
-    @namespace_lock
     async def set(self, item: DocItem, value: str) -> None:
         """
         Set the Markdown `value` for the symbol `item`.
 
         All keys from a single page are stored together, expiring a week after the first set.
         """
-        redis_key = f"{self.namespace}:{item_key(item)}"
-        needs_expire = False
+        await self.set_many({item: value})
 
-        with await self._get_pool_connection() as connection:
-            if redis_key not in self._set_expires:
-                # An expire is only set if the key didn't exist before.
-                # If this is the first time setting values for this key check if it exists and add it to
-                # `_set_expires` to prevent redundant checks for subsequent uses with items from the same page.
-                self._set_expires.add(redis_key)
-                needs_expire = not await connection.exists(redis_key)
+    @namespace_lock
+    async def set_many(self, items: Dict[DocItem, str]) -> None:
+        """
+        Set the Markdown values of multiple symbols at once, `items` maps the symbols to their values.
 
-            await connection.hset(redis_key, item.symbol_id, value)
-            if needs_expire:
-                await connection.expire(redis_key, WEEK_SECONDS)
+        The symbols of each page are written with a single HSET, and the pages are written in one pipeline.
+        Like with `set`, the key of a page expires a week after values were first set for it.
+        """
+        pages = defaultdict(dict)
+        for item, value in items.items():
+            pages[f"{self.namespace}:{item_key(item)}"][item.symbol_id] = value
+
+        with await self._get_pool_connection() as connection:
+            # An expire is only set if the key didn't exist before.
+            # Keys checked once are added to `_set_expires` to prevent redundant checks for subsequent pages' items.
+            new_keys = [redis_key for redis_key in pages if redis_key not in self._set_expires]
+            self._set_expires.update(new_keys)
+            if new_keys:
+                pipeline = connection.pipeline()
+                exists = [pipeline.exists(redis_key) for redis_key in new_keys]
+                await pipeline.execute()
+                needs_expire = {redis_key for redis_key, exist in zip(new_keys, exists) if not await exist}
+            else:
+                needs_expire = set()
+
+            pipeline = connection.pipeline()
+            for redis_key, values in pages.items():
+                pipeline.hmset_dict(redis_key, values)
+                if redis_key in needs_expire:
+                    pipeline.expire(redis_key, WEEK_SECONDS)
+            await pipeline.execute()
 
-    @namespace_lock
     async def get(self, item: DocItem) -> Optional[str]:
         """Return the Markdown content of the symbol `item` if it exists."""
+        local_key = (item_key(item), item.symbol_id)
+        if (markdown := self._local_cache.get(local_key)) is not None:
+            bot.instance.stats.incr("doc_cache.local_hits")
+            return markdown
+
+        bot.instance.stats.incr("doc_cache.local_misses")
+        markdown = await self._get(item)
+        if markdown is not None:
+            # Only symbols which are requested are kept, parsing a page sets all of its symbols.
+            self._local_cache.set(local_key, markdown)
+        return markdown
+
+    @namespace_lock
+    async def _get(self, item: DocItem) -> Optional[str]:
+        """Return the Markdown content of the symbol `item` from redis if it exists."""
         with await self._get_pool_connection() as connection:
             return await connection.hget(f"{self.namespace}:{item_key(item)}", item.symbol_id, encoding="utf8")
 
+    def clear_local_cache(self, packages: Optional[Collection[str]] = None) -> None:
+        """Clear the symbols kept in memory, or only the symbols of `packages`, so they're read from redis again."""
+        if packages is None:
+            self._local_cache.clear()
+            return
+
+        for key in self._local_cache:
+            page_key, _ = key
+            if page_key.split(":", maxsplit=1)[0] in packages:
+                self._local_cache.delete(key)
+
     @namespace_lock
     async def delete(self, package: str) -> bool:
         """Remove all values for `package`; return True if at least one key was deleted, False otherwise."""
+        self.clear_local_cache()
         with await self._get_pool_connection() as connection:
             package_keys = [
                 package_key async for package_key in connection.iscan(match=f"{self.namespace}:{package}:*")
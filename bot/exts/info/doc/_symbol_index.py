@@ -0,0 +1,559 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import DefaultDict, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+from rapidfuzz import fuzz, process
+
+from bot.log import get_logger
+
+from . import PRIORITY_PACKAGES, _cog
+from ._inventory_parser import InventoryDict
+
+log = get_logger(__name__)
+
+# symbols with a group contained here will get the group prefixed on duplicates
+FORCE_PREFIX_GROUPS = (
+    "term",
+    "label",
+    "token",
+    "doc",
+    "pdbcommand",
+    "2to3fixer",
+)
+
+MAGIC = b"DSYM"
+FORMAT_VERSION = 2
+# Magic, format version, symbol, page and trigram counts, and the offsets of the records, pages, page members,
+# trigrams, trigram postings, metadata and strings sections, followed by the length of the metadata.
+HEADER = struct.Struct("<4sIIII8Q")
+# Name, original name, relative URL path and symbol ID, each as an offset and length into the strings section,
+# followed by the indices of the package and the group, and the position of the symbol in its package's inventory.
+RECORD = struct.Struct("<8IHHI")
+NAME = struct.Struct("<II")
+# Package index, relative URL path as an offset and length, and the first index and count of the page's members.
+PAGE = struct.Struct("<H4I")
+MEMBER = struct.Struct("<I")
+# Three bytes of a lowercased symbol name, and the first index and count of the trigram's postings,
+# which are the indices of the records whose names contain the trigram.
+TRIGRAM = struct.Struct("<3sII")
+POSTING = struct.Struct("<I")
+
+# Trigrams contained in more names than this are skipped when searching, unless no rarer trigram matched,
+# as counting them would take long while telling little about how similar the names are.
+MAX_TRIGRAM_POSTINGS = 5000
+# How many of the names sharing the most trigrams with the query are ranked by their similarity.
+MAX_FUZZY_CANDIDATES = 200
+# The minimum similarity, out of 100, of a name suggested for a query.
+FUZZY_SCORE_CUTOFF = 60
+
+# A symbol as read from an inventory: its name, group, relative URL path and symbol ID.
+SymbolEntry = Tuple[str, str, str, str]
+
+
+def inventory_entries(inventory: InventoryDict) -> Iterator[SymbolEntry]:
+    """Yield the symbols of `inventory` in the order they appear in it."""
+    for group, items in inventory.items():
+        # e.g. get 'class' from 'py:class'
+        group_name = group.split(":")[1]
+        for symbol_name, relative_doc_url in items:
+            relative_url_path, _, symbol_id = relative_doc_url.partition("#")
+            yield symbol_name, group_name, relative_url_path, symbol_id
+
+
+def name_trigrams(name: str) -> Set[bytes]:
+    """Return the trigrams of the lowercased UTF-8 encoded `name`."""
+    encoded = name.lower().encode()
+    return {encoded[index:index + 3] for index in range(len(encoded) - 2)}
+
+
+def inventory_digest(inventory: InventoryDict) -> str:
+    """Return a digest of the contents of `inventory`, used to tell whether it changed since the index was built."""
+    digest = hashlib.blake2b(digest_size=16)
+    for group, items in inventory.items():
+        for symbol_name, relative_doc_url in items:
+            digest.update(f"{group}\0{symbol_name}\0{relative_doc_url}\n".encode())
+    return digest.hexdigest()
+
+
+class SymbolClaim(NamedTuple):
+    """A symbol of an added package, claiming the name it has in its package's inventory."""
+
+    package: str
+    group: str
+    relative_url_path: str
+    symbol_id: str
+    position: int  # Position of the symbol in its package's inventory
+
+
+class ResolvedSymbols(NamedTuple):
+    """The added symbols under unique names."""
+
+    claims: Dict[str, SymbolClaim]  # The symbols under their unique names
+    renamed_symbols: Dict[str, List[str]]  # The new names of renamed symbols under their inventory names
+    original_names: Dict[str, str]  # The inventory names of the symbols under their unique names
+
+
+def claim_priority(claim: SymbolClaim) -> Tuple[int, int, str, int]:
+    """
+    Return the sort key of `claim` among claims of the same name, the claim sorted first keeps the name.
+
+    Symbols from `PRIORITY_PACKAGES` come first, followed by symbols whose groups aren't in `FORCE_PREFIX_GROUPS`,
+    and then by the order of their groups in it. Remaining ties are broken by the package name and the position
+    of the symbols in their inventory, so the result doesn't depend on the order the packages were added in.
+    """
+    if claim.package in PRIORITY_PACKAGES:
+        package_priority = PRIORITY_PACKAGES.index(claim.package)
+    else:
+        package_priority = len(PRIORITY_PACKAGES)
+    group_priority = FORCE_PREFIX_GROUPS.index(claim.group) + 1 if claim.group in FORCE_PREFIX_GROUPS else 0
+    return package_priority, group_priority, claim.package, claim.position
+
+
+class SymbolIndexBuilder:
+    """
+    Collect the symbols of inventories and serialise them into a `SymbolIndex`.
+
+    Conflicting symbol names are resolved in one pass once all packages were added. For every name, the symbol
+    sorted first by `claim_priority` keeps the name, and the others are prefixed with their package name,
+    or with their group if they're from the same package as that symbol. Names which are still taken after that
+    are qualified with both the package and the group. The result only depends on the added symbols,
+    not on the order in which the packages were added.
+    """
+
+    def __init__(self):
+        self.base_urls: Dict[str, str] = {}
+        self.digests: Dict[str, str] = {}
+        # Maps the names of symbols in their inventories to the symbols claiming them.
+        self._claims: DefaultDict[str, List[SymbolClaim]] = defaultdict(list)
+        self._resolved: Optional[ResolvedSymbols] = None
+
+    def add_package(self, package_name: str, base_url: str, entries: Iterable[SymbolEntry], digest: str) -> None:
+        """Add the symbols `entries` of the package `package_name`, whose inventory has the digest `digest`."""
+        if package_name in self.base_urls:
+            raise ValueError(f"the package {package_name} was already added")
+        self.base_urls[package_name] = base_url
+        self.digests[package_name] = digest
+        self._resolved = None
+
+        for position, (symbol_name, group_name, relative_url_path, symbol_id) in enumerate(entries):
+            self._claims[symbol_name].append(
+                SymbolClaim(package_name, group_name, relative_url_path, symbol_id, position)
+            )
+
+    @property
+    def symbols(self) -> Dict[str, _cog.DocItem]:
+        """The items of all added symbols, under their unique names."""
+        return {
+            name: _cog.DocItem(
+                claim.package, claim.group, self.base_urls[claim.package], claim.relative_url_path, claim.symbol_id
+            )
+            for name, claim in self._resolve().claims.items()
+        }
+
+    @property
+    def renamed_symbols(self) -> Dict[str, List[str]]:
+        """Maps a conflicting symbol name to a list of the new, disambiguated names created from conflicts with it."""
+        return self._resolve().renamed_symbols
+
+    def _resolve(self) -> ResolvedSymbols:
+        """Give every added symbol a unique name, reusing the result until another package is added."""
+        if self._resolved is not None:
+            return self._resolved
+
+        # Every name from an inventory is kept by one of its symbols, so new names must not take any of them.
+        claims: Dict[str, SymbolClaim] = {}
+        renamed_symbols: Dict[str, List[str]] = {}
+        original_names: Dict[str, str] = {}
+        conflicts = []
+        for symbol_name, name_claims in self._claims.items():
+            if len(name_claims) > 1:
+                name_claims = sorted(name_claims, key=claim_priority)
+                conflicts.append((symbol_name, name_claims))
+            claims[symbol_name] = name_claims[0]
+            original_names[symbol_name] = symbol_name
+
+        for symbol_name, (kept, *others) in sorted(conflicts):
+            for claim in others:
+                prefix = claim.package if claim.package != kept.package else claim.group
+                new_name = f"{prefix}.{symbol_name}"
+                if new_name in claims:
+                    # If there's still a conflict, qualify the name further.
+                    new_name = f"{claim.package}.{claim.group}.{symbol_name}"
+                    if new_name in claims:
+                        log.trace(f"Skipping {claim}, a duplicate of the symbol {new_name}.")
+                        continue
+
+                claims[new_name] = claim
+                original_names[new_name] = symbol_name
+                renamed_symbols.setdefault(symbol_name, []).append(new_name)
+
+        self._resolved = ResolvedSymbols(claims, renamed_symbols, original_names)
+        return self._resolved
+
+    def build(self) -> bytes:
+        """Serialise the collected symbols into the binary format read by `SymbolIndex`."""
+        strings = bytearray()
+        string_offsets: Dict[str, Tuple[int, int]] = {}
+
+        def add_string(string: str) -> Tuple[int, int]:
+            if (location := string_offsets.get(string)) is None:
+                encoded = string.encode()
+                location = string_offsets[string] = (len(strings), len(encoded))
+                strings.extend(encoded)
+            return location
+
+        claims, renamed_symbols, original_names = self._resolve()
+        package_indices = {package: index for index, package in enumerate(self.base_urls)}
+        groups = sorted({claim.group for claim in claims.values()})
+        group_indices = {group: index for index, group in enumerate(groups)}
+
+        names = sorted(claims, key=str.encode)
+        records = bytearray()
+        pages: DefaultDict[Tuple[int, str], List[int]] = defaultdict(list)
+        trigrams: DefaultDict[bytes, List[int]] = defaultdict(list)
+        for record_index, name in enumerate(names):
+            claim = claims[name]
+            package_index = package_indices[claim.package]
+            records.extend(RECORD.pack(
+                *add_string(name),
+                *add_string(original_names[name]),
+                *add_string(claim.relative_url_path),
+                *add_string(claim.symbol_id),
+                package_index,
+                group_indices[claim.group],
+                claim.position,
+            ))
+            pages[(package_index, claim.relative_url_path)].append(record_index)
+            for trigram in name_trigrams(name):
+                trigrams[trigram].append(record_index)
+
+        page_table = bytearray()
+        members = bytearray()
+        member_count = 0
+        for package_index, relative_url_path in sorted(pages, key=lambda page: (page[0], page[1].encode())):
+            page_members = pages[package_index, relative_url_path]
+            page_table.extend(PAGE.pack(package_index, *add_string(relative_url_path), member_count, len(page_members)))
+            for record_index in page_members:
+                members.extend(MEMBER.pack(record_index))
+            member_count += len(page_members)
+
+        trigram_table = bytearray()
+        postings = bytearray()
+        posting_count = 0
+        for trigram in sorted(trigrams):
+            trigram_postings = trigrams[trigram]
+            trigram_table.extend(TRIGRAM.pack(trigram, posting_count, len(trigram_postings)))
+            postings.extend(struct.pack(f"<{len(trigram_postings)}I", *trigram_postings))
+            posting_count += len(trigram_postings)
+
+        metadata = json.dumps({
+            "packages": [
+                {"name": package, "base_url": base_url, "digest": self.digests[package]}
+                for package, base_url in self.base_urls.items()
+            ],
+            "groups": groups,
+            "renamed_symbols": renamed_symbols,
+        }).encode()
+
+        records_offset = HEADER.size
+        pages_offset = records_offset + len(records)
+        members_offset = pages_offset + len(page_table)
+        trigrams_offset = members_offset + len(members)
+        postings_offset = trigrams_offset + len(trigram_table)
+        metadata_offset = postings_offset + len(postings)
+        strings_offset = metadata_offset + len(metadata)
+        header = HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            len(names),
+            len(pages),
+            len(trigrams),
+            records_offset,
+            pages_offset,
+            members_offset,
+            trigrams_offset,
+            postings_offset,
+            metadata_offset,
+            strings_offset,
+            len(metadata),
+        )
+        return b"".join((header, records, page_table, members, trigram_table, postings, metadata, strings))
+
+
+class SymbolIndex:
+    """
+    A read-only table of documentation symbols, usually memory-mapped from a file written by `SymbolIndexBuilder`.
+
+    The records of the symbols are fixed-width and sorted by symbol name, and all strings are stored once in a shared
+    string table which the records point into. Looking up a symbol is a binary search over the records, and a `DocItem`
+    is only created for the symbol which was found, so no Python objects are kept around for the symbols themselves.
+    A separate table, sorted by page, lists the symbols found on each documentation page,
+    and another one lists the symbols containing each trigram of the lowercased names, to search for similar names.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]):
+        self._buffer = buffer
+
+        (
+            magic,
+            version,
+            self._symbol_count,
+            self._page_count,
+            self._trigram_count,
+            self._records_offset,
+            self._pages_offset,
+            self._members_offset,
+            self._trigrams_offset,
+            self._postings_offset,
+            metadata_offset,
+            self._strings_offset,
+            metadata_length,
+        ) = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("the buffer doesn't contain a symbol index of a supported version")
+
+        metadata = json.loads(buffer[metadata_offset:metadata_offset + metadata_length])
+        self._packages: List[str] = [package["name"] for package in metadata["packages"]]
+        self._package_indices = {package: index for index, package in enumerate(self._packages)}
+        self._groups: List[str] = metadata["groups"]
+
+        self.base_urls: Dict[str, str] = {package["name"]: package["base_url"] for package in metadata["packages"]}
+        self.digests: Dict[str, str] = {package["name"]: package["digest"] for package in metadata["packages"]}
+        self.renamed_symbols: Dict[str, List[str]] = metadata["renamed_symbols"]
+
+    @classmethod
+    def empty(cls) -> SymbolIndex:
+        """Return an index without any symbols."""
+        return cls(SymbolIndexBuilder().build())
+
+    @classmethod
+    def open(cls, path: Path) -> Optional[SymbolIndex]:
+        """Memory-map the index stored at `path`, returning None if it doesn't exist or can't be read."""
+        try:
+            with path.open("rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            log.debug(f"Could not open the symbol index at {path}: {e}")
+            return None
+
+        try:
+            return cls(buffer)
+        except (ValueError, struct.error) as e:
+            log.warning(f"Ignoring the invalid symbol index at {path}: {e}")
+            buffer.close()
+            return None
+
+    @classmethod
+    def write(cls, builder: SymbolIndexBuilder, path: Path) -> SymbolIndex:
+        """
+        Build the index from `builder`, store it at `path` and memory-map it.
+
+        If the index can't be stored, e.g. because the directory is read-only, it's kept in memory instead.
+        """
+        data = builder.build()
+        temporary_path = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_bytes(data)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            log.warning(f"Could not store the symbol index at {path}, keeping it in memory: {e}")
+            return cls(data)
+
+        return cls.open(path) or cls(data)
+
+    def close(self) -> None:
+        """Release the memory map of the index, if it has one."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def get(self, symbol_name: str) -> Optional[_cog.DocItem]:
+        """Return the `DocItem` of the symbol named `symbol_name`, or None if there's no such symbol."""
+        index = self._find(symbol_name.encode())
+        return self._item(index) if index is not None else None
+
+    def page_items(self, doc_item: _cog.DocItem) -> List[_cog.DocItem]:
+        """Return the items of all symbols on the same page as `doc_item`."""
+        package_index = self._package_indices.get(doc_item.package)
+        if package_index is None:
+            return []
+
+        key = (package_index, doc_item.relative_url_path.encode())
+        low, high = 0, self._page_count
+        while low < high:
+            middle = (low + high) // 2
+            page_package, path_offset, path_length, first_member, member_count = PAGE.unpack_from(
+                self._buffer, self._pages_offset + middle * PAGE.size
+            )
+            page_key = (page_package, self._bytes(path_offset, path_length))
+            if page_key < key:
+                low = middle + 1
+            elif page_key > key:
+                high = middle
+            else:
+                return [
+                    self._item(MEMBER.unpack_from(self._buffer, self._members_offset + member * MEMBER.size)[0])
+                    for member in range(first_member, first_member + member_count)
+                ]
+        return []
+
+    def search(self, query: str, limit: int = 5) -> List[str]:
+        """
+        Return up to `limit` names of symbols similar to `query`, the most relevant first.
+
+        Names starting with `query` come first, followed by the names most similar to it.
+        """
+        names = self.complete(query, limit)
+        if len(names) < limit:
+            names.extend(name for name in self._fuzzy(query, limit + len(names)) if name not in names)
+        return names[:limit]
+
+    def complete(self, prefix: str, limit: int = 5) -> List[str]:
+        """Return up to `limit` names starting with `prefix`, in the order of the index, skipping `prefix` itself."""
+        encoded_prefix = prefix.encode()
+        names = []
+        index = self._lower_bound(encoded_prefix)
+        while index < self._symbol_count and len(names) < limit:
+            name = self._record_name(index)
+            if not name.startswith(encoded_prefix):
+                break
+            if name != encoded_prefix:
+                names.append(name.decode())
+            index += 1
+        return names
+
+    def _fuzzy(self, query: str, limit: int) -> List[str]:
+        """
+        Return up to `limit` names similar to `query`, the most similar first.
+
+        Only the names sharing the most trigrams with `query` are compared to it,
+        so a search doesn't have to go through every symbol in the index.
+        """
+        postings = []
+        for trigram in name_trigrams(query):
+            found = self._trigram_postings(trigram)
+            if found is not None:
+                postings.append(found)
+        if not postings:
+            return []
+
+        rare_postings = [found for found in postings if found[1] <= MAX_TRIGRAM_POSTINGS]
+        if rare_postings:
+            postings = rare_postings
+        else:
+            # Only common trigrams matched, count the rarest of them to bound the work.
+            postings = [min(postings, key=lambda found: found[1])]
+
+        shared_trigrams = Counter()
+        for first_posting, posting_count in postings:
+            start = self._postings_offset + first_posting * POSTING.size
+            shared_trigrams.update(
+                record_index for record_index, in POSTING.iter_unpack(
+                    self._buffer[start:start + posting_count * POSTING.size]
+                )
+            )
+
+        candidates = [
+            self._record_name(index).decode() for index, _ in shared_trigrams.most_common(MAX_FUZZY_CANDIDATES)
+        ]
+        matches = process.extract(
+            query.lower(),
+            candidates,
+            scorer=fuzz.ratio,
+            processor=str.lower,
+            limit=limit,
+            score_cutoff=FUZZY_SCORE_CUTOFF,
+        )
+        return [name for name, _, _ in matches]
+
+    def package_entries(self) -> Dict[str, List[SymbolEntry]]:
+        """Return the symbols of every package as they were in its inventory, to add them to a new index."""
+        positioned_entries: List[List[Tuple[int, SymbolEntry]]] = [[] for _ in self._packages]
+        for index in range(self._symbol_count):
+            (
+                _, _, original_offset, original_length, path_offset, path_length, id_offset, id_length,
+                package_index, group_index, position
+            ) = RECORD.unpack_from(self._buffer, self._records_offset + index * RECORD.size)
+            positioned_entries[package_index].append((position, (
+                self._string(original_offset, original_length),
+                self._groups[group_index],
+                self._string(path_offset, path_length),
+                self._string(id_offset, id_length),
+            )))
+
+        entries = {}
+        for package, package_entries in zip(self._packages, positioned_entries):
+            package_entries.sort(key=lambda entry: entry[0])
+            entries[package] = [entry for _, entry in package_entries]
+        return entries
+
+    def _find(self, name: bytes) -> Optional[int]:
+        """Return the index of the record of the symbol named `name`, or None if there's no such record."""
+        index = self._lower_bound(name)
+        if index < self._symbol_count and self._record_name(index) == name:
+            return index
+        return None
+
+    def _lower_bound(self, name: bytes) -> int:
+        """Return the index of the first record whose name isn't sorted before `name`."""
+        low, high = 0, self._symbol_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._record_name(middle) < name:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _record_name(self, index: int) -> bytes:
+        return self._bytes(*NAME.unpack_from(self._buffer, self._records_offset + index * RECORD.size))
+
+    def _trigram_postings(self, trigram: bytes) -> Optional[Tuple[int, int]]:
+        """Return the first posting and posting count of `trigram`, or None if no name contains it."""
+        low, high = 0, self._trigram_count
+        while low < high:
+            middle = (low + high) // 2
+            table_trigram, first_posting, posting_count = TRIGRAM.unpack_from(
+                self._buffer, self._trigrams_offset + middle * TRIGRAM.size
+            )
+            if table_trigram < trigram:
+                low = middle + 1
+            elif table_trigram > trigram:
+                high = middle
+            else:
+                return first_posting, posting_count
+        return None
+
+    def _item(self, index: int) -> _cog.DocItem:
+        """Create the `DocItem` of the record at `index`."""
+        (
+            _, _, _, _, path_offset, path_length, id_offset, id_length, package_index, group_index, _
+        ) = RECORD.unpack_from(self._buffer, self._records_offset + index * RECORD.size)
+        package = self._packages[package_index]
+        return _cog.DocItem(
+            package,
+            self._groups[group_index],
+            self.base_urls[package],
+            self._string(path_offset, path_length),
+            self._string(id_offset, id_length),
+        )
+
+    def _bytes(self, offset: int, length: int) -> bytes:
+        start = self._strings_offset + offset
+        return self._buffer[start:start + length]
+
+    def _string(self, offset: int, length: int) -> str:
+        return self._bytes(offset, length).decode()
+
+    def __contains__(self, symbol_name: str) -> bool:
+        return self._find(symbol_name.encode()) is not None
+
+    def __len__(self) -> int:
+        return self._symbol_count
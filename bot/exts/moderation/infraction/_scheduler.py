@@ -1,3 +1,4 @@
+import asyncio
 import textwrap
 import typing as t
 from abc import abstractmethod
@@ -18,6 +19,7 @@ from bot.exts.moderation.modlog import ModLog
 from bot.log import get_logger
 from bot.utils import messages, scheduling, time
 from bot.utils.channel import is_mod_channel
+from bot.utils.schedule_journal import ScheduleJournal
 
 log = get_logger(__name__)
 
@@ -27,12 +29,17 @@ class InfractionScheduler:
 
     def __init__(self, bot: Bot, supported_infractions: t.Container[str]):
         self.bot = bot
-        self.scheduler = scheduling.Scheduler(self.__class__.__name__)
+        self.scheduler = scheduling.Scheduler(self.__class__.__name__, lazy_tasks=True)
+        # The scheduled expirations, recorded to schedule them again without waiting for the API after a restart.
+        self.schedule_journal = ScheduleJournal(namespace=f"{self.__class__.__name__}.schedule_journal")
 
-        scheduling.create_task(self.reschedule_infractions(supported_infractions), event_loop=self.bot.loop)
+        self._sweep_task = scheduling.create_task(
+            self._sweep_infractions(supported_infractions), event_loop=self.bot.loop
+        )
 
     def cog_unload(self) -> None:
         """Cancel scheduled tasks."""
+        self._sweep_task.cancel()
         self.scheduler.cancel_all()
 
     @property
@@ -40,21 +47,47 @@ class InfractionScheduler:
         """Get the currently loaded ModLog cog instance."""
         return self.bot.get_cog("ModLog")
 
+    async def _sweep_infractions(self, supported_infractions: t.Container[str]) -> None:
+        """Reschedule the infractions expiring within the scheduling window, and repeat it every sweep interval."""
+        while True:
+            try:
+                await self.reschedule_infractions(supported_infractions)
+            except Exception:
+                log.exception(f"Failed to reschedule the infractions of {self.__class__.__name__}.")
+            await asyncio.sleep(constants.InfractionScheduling.sweep_interval)
+
     async def reschedule_infractions(self, supported_infractions: t.Container[str]) -> None:
-        """Schedule expiration for previous infractions."""
+        """
+        Schedule expiration for previous infractions which expire within the scheduling window.
+
+        The expirations recorded in the schedule journal are scheduled first, then reconciled with the API.
+        Overdue infractions are only deactivated once the API confirms they're still active.
+        Infractions expiring later are scheduled by later sweeps, as they enter the window.
+        """
         await self.bot.wait_until_guild_available()
 
         log.trace(f"Rescheduling infractions for {self.__class__.__name__}.")
 
-        infractions = await self.bot.api_client.get(
-            "bot/infractions",
-            params={
-                "active": "true",
-                "ordering": "expires_at",
-                "permanent": "false",
-                "types": ",".join(supported_infractions),
-            },
-        )
+        now = arrow.utcnow()
+        horizon = now.shift(seconds=constants.InfractionScheduling.window)
+        journal_items = await self.schedule_journal.items(until=horizon.datetime)
+        journaled = {item.payload["id"]: item.payload for item in journal_items if item.due > now}
+        for infraction in journaled.values():
+            if infraction["id"] not in self.scheduler:
+                self.schedule_expiration(infraction)
+
+        infractions = await self._fetch_expiring_infractions(supported_infractions, horizon)
+
+        active_ids = {infraction["id"] for infraction in infractions}
+        for item in journal_items:
+            if item.payload["id"] not in active_ids:
+                log.trace(f"Cancelling the expiration of infraction #{item.payload['id']}, it's no longer active.")
+                self.cancel_expiration(item.payload["id"])
+
+        for infraction in infractions:
+            if infraction["id"] in journaled and infraction != journaled[infraction["id"]]:
+                # The infraction was edited while the bot was offline.
+                self.cancel_expiration(infraction["id"])
 
         to_schedule = [i for i in infractions if i["id"] not in self.scheduler]
 
@@ -62,18 +95,34 @@ class InfractionScheduler:
             log.trace("Scheduling %r", infraction)
             self.schedule_expiration(infraction)
 
-        # Call ourselves again when the last infraction would expire. This will be the "oldest" infraction we've seen
-        # from the database so far, and new ones are scheduled as part of application.
-        # We make sure to fire this
-        if to_schedule:
-            next_reschedule_point = max(
-                dateutil.parser.isoparse(infr["expires_at"]) for infr in to_schedule
-            )
-            log.trace("Will reschedule remaining infractions at %s", next_reschedule_point)
-
-            self.scheduler.schedule_at(next_reschedule_point, -1, self.reschedule_infractions(supported_infractions))
+        log.trace(f"Done rescheduling, {len(to_schedule)} infractions expiring before {horizon} were scheduled.")
 
-        log.trace("Done rescheduling")
+    async def _fetch_expiring_infractions(
+        self,
+        supported_infractions: t.Container[str],
+        horizon: arrow.Arrow
+    ) -> t.List[_utils.Infraction]:
+        """Return the active infractions of the supported types which expire before `horizon`, page by page."""
+        params = {
+            "active": "true",
+            "ordering": "expires_at",
+            "permanent": "false",
+            "types": ",".join(supported_infractions),
+            "expires_before": horizon.isoformat(),
+            "limit": constants.InfractionScheduling.page_size,
+        }
+        infractions = []
+        while True:
+            # Infractions deactivated while paging shift the following pages and may be skipped;
+            # they're picked up by the next sweep.
+            page = await self.bot.api_client.get("bot/infractions", params={**params, "offset": len(infractions)})
+            infractions.extend(page)
+            # The endpoint returns a plain list, so a short page is the last one.
+            if len(page) < params["limit"]:
+                break
+
+        # Pages overlap if infractions were applied while paging.
+        return list({infraction["id"]: infraction for infraction in infractions}.values())
 
     async def reapply_infraction(
         self,
@@ -456,7 +505,7 @@ class InfractionScheduler:
 
         # Cancel the expiration task.
         if infraction["expires_at"] is not None:
-            self.scheduler.cancel(infraction["id"])
+            self.cancel_expiration(infraction["id"])
 
         # Send a log message to the mod log.
         if send_log:
@@ -504,3 +553,10 @@ class InfractionScheduler:
         """
         expiry = dateutil.parser.isoparse(infraction["expires_at"])
         self.scheduler.schedule_at(expiry, infraction["id"], self.deactivate_infraction(infraction))
+        scheduling.create_task(self.schedule_journal.add(infraction["id"], expiry, infraction))
+
+    def cancel_expiration(self, infraction_id: int) -> None:
+        """Cancel the scheduled expiration of the infraction `infraction_id` and remove it from the schedule journal."""
+        if infraction_id in self.scheduler:
+            self.scheduler.cancel(infraction_id)
+        scheduling.create_task(self.schedule_journal.remove(infraction_id))
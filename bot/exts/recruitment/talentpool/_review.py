@@ -48,7 +48,7 @@ class Reviewer:
     def __init__(self, name: str, bot: Bot, pool: 'TalentPool'):
         self.bot = bot
         self._pool = pool
-        self._review_scheduler = Scheduler(name)
+        self._review_scheduler = Scheduler(name, lazy_tasks=True)
 
     def __contains__(self, user_id: int) -> bool:
         """Return True if the user with ID user_id is scheduled for review, False otherwise."""
@@ -18,6 +18,7 @@ from bot.utils.checks import has_any_role_check, has_no_roles_check
 from bot.utils.lock import lock_arg
 from bot.utils.members import get_or_fetch_member
 from bot.utils.messages import send_denial
+from bot.utils.schedule_journal import ScheduleJournal
 from bot.utils.scheduling import Scheduler
 
 log = get_logger(__name__)
@@ -33,9 +34,12 @@ ReminderMention = t.Union[UnambiguousUser, discord.Role]
 class Reminders(Cog):
     """Provide in-channel reminder functionality."""
 
+    # The scheduled reminders, recorded to schedule them again without waiting for the API after a restart.
+    schedule_journal = ScheduleJournal()
+
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.scheduler = Scheduler(self.__class__.__name__)
+        self.scheduler = Scheduler(self.__class__.__name__, lazy_tasks=True)
 
         scheduling.create_task(self.reschedule_reminders(), event_loop=self.bot.loop)
 
@@ -44,27 +48,54 @@ class Reminders(Cog):
         self.scheduler.cancel_all()
 
     async def reschedule_reminders(self) -> None:
-        """Get all current reminders from the API and reschedule them."""
+        """
+        Reschedule the reminders recorded in the schedule journal, then reconcile them with the API.
+
+        Reminders which were deleted or edited while the bot was offline are cancelled or rescheduled,
+        and reminders missing from the journal are scheduled.
+        """
         await self.bot.wait_until_guild_available()
+
+        now = datetime.now(timezone.utc)
+        journal_items = await self.schedule_journal.items()
+        # Overdue reminders are only sent once the API confirms they weren't deleted while the bot was offline.
+        journaled = {item.payload["id"]: item.payload for item in journal_items if item.due > now}
+        for reminder in journaled.values():
+            await self._reschedule_or_send(reminder)
+
         response = await self.bot.api_client.get(
             'bot/reminders',
             params={'active': 'true'}
         )
 
-        now = datetime.now(timezone.utc)
+        active_ids = {reminder["id"] for reminder in response}
+        for reminder_id in {item.payload["id"] for item in journal_items} - active_ids:
+            log.trace(f"Cancelling reminder #{reminder_id}, it's no longer active.")
+            if reminder_id in self.scheduler:
+                self.scheduler.cancel(reminder_id)
+            await self.schedule_journal.remove(reminder_id)
 
         for reminder in response:
-            is_valid, *_ = self.ensure_valid_reminder(reminder)
-            if not is_valid:
-                continue
+            if reminder["id"] not in journaled:
+                if reminder["id"] not in self.scheduler:
+                    await self._reschedule_or_send(reminder)
+            elif reminder != journaled[reminder["id"]] and reminder["id"] in self.scheduler:
+                # Reminders which were sent in the meantime aren't scheduled again.
+                await self._reschedule_reminder(reminder)
+
+    async def _reschedule_or_send(self, reminder: dict) -> None:
+        """Schedule `reminder`, or send it right away if it's overdue."""
+        is_valid, *_ = self.ensure_valid_reminder(reminder)
+        if not is_valid:
+            return
 
-            remind_at = isoparse(reminder['expiration'])
+        remind_at = isoparse(reminder['expiration'])
 
-            # If the reminder is already overdue ...
-            if remind_at < now:
-                await self.send_reminder(reminder, remind_at)
-            else:
-                self.schedule_reminder(reminder)
+        # If the reminder is already overdue ...
+        if remind_at < datetime.now(timezone.utc):
+            await self.send_reminder(reminder, remind_at)
+        else:
+            self.schedule_reminder(reminder)
 
     def ensure_valid_reminder(self, reminder: dict) -> t.Tuple[bool, discord.User, discord.TextChannel]:
         """Ensure reminder author and channel can be fetched otherwise delete the reminder."""
@@ -78,6 +109,7 @@ class Reminders(Cog):
                 f"User {reminder['author']}={user}, Channel {reminder['channel_id']}={channel}."
             )
             scheduling.create_task(self.bot.api_client.delete(f"bot/reminders/{reminder['id']}"))
+            scheduling.create_task(self.schedule_journal.remove(reminder["id"]))
 
         return is_valid, user, channel
 
@@ -145,6 +177,7 @@ class Reminders(Cog):
         """A coroutine which sends the reminder once the time is reached, and cancels the running task."""
         reminder_datetime = isoparse(reminder['expiration'])
         self.scheduler.schedule_at(reminder_datetime, reminder["id"], self.send_reminder(reminder))
+        scheduling.create_task(self.schedule_journal.add(reminder["id"], reminder_datetime, reminder))
 
     async def _edit_reminder(self, reminder_id: int, payload: dict) -> dict:
         """
@@ -210,6 +243,7 @@ class Reminders(Cog):
 
         log.debug(f"Deleting reminder #{reminder['id']} (the user has been reminded).")
         await self.bot.api_client.delete(f"bot/reminders/{reminder['id']}")
+        await self.schedule_journal.remove(reminder["id"])
 
     @group(name="remind", aliases=("reminder", "reminders", "remindme"), invoke_without_command=True)
     async def remind_group(
@@ -461,6 +495,7 @@ class Reminders(Cog):
 
         await self.bot.api_client.delete(f"bot/reminders/{id_}")
         self.scheduler.cancel(id_)
+        await self.schedule_journal.remove(id_)
 
         await self._send_confirmation(
             ctx,
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import typing as t
+
+from bot.log import get_logger
+from bot.utils import scheduling
+
+if t.TYPE_CHECKING:
+    from bot.bot import Bot
+
+log = get_logger(__name__)
+
+# How many of the most recent changes are kept for processes catching up. Processes further behind load the snapshot.
+CHANGE_LOG_SIZE = 1000
+# How long to wait before subscribing again after losing the connection to the changes channel.
+RESUBSCRIBE_DELAY = 5
+
+# Applies a single change to the shared snapshot atomically: bumps the version, updates the snapshot, records the
+# change in the log, trims the log and publishes the change to the other processes.
+# KEYS: version, items, log. ARGV: action, item ID, item JSON, change JSON, log size, channel.
+WRITE_CHANGE_SCRIPT = """
+local version = redis.call("INCR", KEYS[1])
+if ARGV[1] == "insert" then
+    redis.call("HSET", KEYS[2], ARGV[2], ARGV[3])
+else
+    redis.call("HDEL", KEYS[2], ARGV[2])
+end
+local entry = version .. " " .. ARGV[4]
+redis.call("ZADD", KEYS[3], version, entry)
+redis.call("ZREMRANGEBYRANK", KEYS[3], 0, -tonumber(ARGV[5]) - 1)
+redis.call("PUBLISH", ARGV[6], entry)
+return version
+"""
+
+
+class FilterListStore:
+    """
+    A versioned copy of the site's filter lists, shared through Redis by every bot process.
+
+    Redis holds a snapshot of all items along with its version, and a log of the most recent changes, each tagged with
+    the version it produced. Every change is also published on a pub/sub channel. A process starting up loads the
+    snapshot from Redis instead of fetching the lists from the site, which is only done when there's no snapshot yet or
+    when the lists are explicitly synced. Afterwards, each published change is applied to the local
+    `Bot.filter_list_cache` as it arrives, so the filters only rebuild what they derived from the lists which changed.
+    A process which missed some changes replays them from the log, or reloads the snapshot if they're no longer there.
+    """
+
+    def __init__(self, bot: "Bot"):
+        self.bot = bot
+        # The version of the snapshot the local cache reflects.
+        self.version = 0
+
+        self._lock = asyncio.Lock()
+        self._listener: t.Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def _namespace(self) -> str:
+        return f"{self.bot.redis_session.global_namespace}.{self.__class__.__name__}"
+
+    @property
+    def _version_key(self) -> str:
+        return f"{self._namespace}.version"
+
+    @property
+    def _items_key(self) -> str:
+        return f"{self._namespace}.items"
+
+    @property
+    def _log_key(self) -> str:
+        return f"{self._namespace}.log"
+
+    @property
+    def _channel(self) -> str:
+        return f"{self._namespace}.changes"
+
+    async def load(self) -> None:
+        """Load the filter lists, from the shared snapshot if there is one, and start following changes."""
+        if await self.bot.redis_session.pool.exists(self._version_key):
+            async with self._lock:
+                await self._load_snapshot()
+            log.info(f"Loaded version {self.version} of the filter lists from Redis.")
+        else:
+            await self.reload()
+
+        if self._listener is None:
+            self._listener = scheduling.create_task(self._listen(), name="FilterListStore.listen")
+
+    async def reload(self) -> None:
+        """Fetch all filter lists from the site, replace the shared snapshot with them, and notify other processes."""
+        items = await self.bot.api_client.get("bot/filter-lists")
+        pool = self.bot.redis_session.pool
+
+        transaction = pool.multi_exec()
+        transaction.delete(self._items_key, self._log_key)
+        if items:
+            transaction.hmset_dict(self._items_key, {str(item["id"]): json.dumps(item) for item in items})
+        new_version = transaction.incr(self._version_key)
+        await transaction.execute()
+        version = await new_version
+
+        await pool.publish(self._channel, f"{version} {json.dumps({'action': 'reload'})}")
+
+        async with self._lock:
+            self.version = version
+            self.bot.replace_filter_list_cache(items)
+        log.info(f"Loaded version {version} of the filter lists from the site.")
+
+    async def insert(self, item: dict) -> None:
+        """Add `item`, as returned by the site, to the filter lists of every process."""
+        await self._write({"action": "insert", "item": item}, item["id"], json.dumps(item))
+
+    async def remove(self, type_: str, allowed: bool, content: str) -> None:
+        """Remove the item of the given type and content from the filter lists of every process."""
+        item = self.bot.filter_list_cache[f"{type_}.{allowed}"][content]
+        change = {"action": "remove", "item": {"type": type_, "allowed": allowed, "content": content}}
+        await self._write(change, item["id"])
+
+    async def close(self) -> None:
+        """Stop following changes made by other processes."""
+        self._closed = True
+        if self._listener is None:
+            return
+
+        self._listener.cancel()
+        self._listener = None
+        if not self.bot.redis_session.closed:
+            await self.bot.redis_session.pool.unsubscribe(self._channel)
+
+    async def _write(self, change: dict, item_id: int, item_json: str = "") -> None:
+        """Apply `change` to the shared snapshot, then to the local cache."""
+        version = await self.bot.redis_session.pool.eval(
+            WRITE_CHANGE_SCRIPT,
+            keys=[self._version_key, self._items_key, self._log_key],
+            args=[change["action"], str(item_id), item_json, json.dumps(change), CHANGE_LOG_SIZE, self._channel],
+        )
+
+        async with self._lock:
+            if version == self.version + 1:
+                self._apply(version, change)
+            elif version > self.version:
+                # Another process changed the lists in the meantime, and its change hasn't been received yet.
+                await self._catch_up()
+
+    async def _listen(self) -> None:
+        """Apply the changes published by other processes, subscribing again if the connection is lost."""
+        while not self._closed:
+            try:
+                channel, = await self.bot.redis_session.pool.subscribe(self._channel)
+
+                # Changes made while this process wasn't subscribed would otherwise be missed.
+                async with self._lock:
+                    await self._catch_up()
+
+                while await channel.wait_message():
+                    await self._handle(await channel.get(encoding="utf-8"))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Lost the subscription to filter list changes, subscribing again shortly.")
+
+            if not self._closed:
+                await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    async def _handle(self, message: str) -> None:
+        """Apply a change published on the changes channel, catching up first if any were missed."""
+        version, change = message.split(" ", 1)
+        version = int(version)
+        change = json.loads(change)
+
+        async with self._lock:
+            if version <= self.version:
+                # Changes made by this process are received too, but they've already been applied.
+                return
+
+            if version == self.version + 1 and change["action"] != "reload":
+                self._apply(version, change)
+            else:
+                await self._catch_up()
+
+    async def _catch_up(self) -> None:
+        """Apply the changes missed since the local version, or load the snapshot if they're gone from the log."""
+        pool = self.bot.redis_session.pool
+        entries = await pool.zrangebyscore(self._log_key, min=self.version + 1, withscores=True, encoding="utf-8")
+
+        if entries and int(entries[0][1]) == self.version + 1:
+            for entry, version in entries:
+                self._apply(int(version), json.loads(entry.split(" ", 1)[1]))
+            log.debug(f"Caught up with {len(entries)} filter list changes to version {self.version}.")
+            return
+
+        if not entries and int(await pool.get(self._version_key) or 0) == self.version:
+            # Nothing was missed.
+            return
+
+        await self._load_snapshot()
+        log.debug(f"Reloaded the filter lists snapshot at version {self.version}.")
+
+    async def _load_snapshot(self) -> None:
+        """Replace the local cache with the shared snapshot."""
+        transaction = self.bot.redis_session.pool.multi_exec()
+        items = transaction.hgetall(self._items_key, encoding="utf-8")
+        version = transaction.get(self._version_key)
+        await transaction.execute()
+
+        self.version = int(await version or 0)
+        self.bot.replace_filter_list_cache([json.loads(item) for item in (await items).values()])
+
+    def _apply(self, version: int, change: dict) -> None:
+        """Apply a single change to the local cache, bringing it to `version`."""
+        item = change["item"]
+        if change["action"] == "insert":
+            self.bot.insert_item_into_filter_list_cache(item)
+        else:
+            self.bot.remove_item_from_filter_list_cache(item["type"], item["allowed"], item["content"])
+        self.version = version
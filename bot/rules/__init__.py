@@ -1,12 +1,12 @@
 # flake8: noqa
 
-from .attachments import apply as apply_attachments
+from .attachments import apply as apply_attachments, measure as measure_attachments
 from .burst import apply as apply_burst
 from .burst_shared import apply as apply_burst_shared
-from .chars import apply as apply_chars
-from .discord_emojis import apply as apply_discord_emojis
-from .duplicates import apply as apply_duplicates
-from .links import apply as apply_links
-from .mentions import apply as apply_mentions
-from .newlines import apply as apply_newlines
-from .role_mentions import apply as apply_role_mentions
+from .chars import apply as apply_chars, measure as measure_chars
+from .discord_emojis import apply as apply_discord_emojis, measure as measure_discord_emojis
+from .duplicates import apply as apply_duplicates, measure as measure_duplicates
+from .links import apply as apply_links, measure as measure_links
+from .mentions import apply as apply_mentions, measure as measure_mentions
+from .newlines import apply as apply_newlines, measure as measure_newlines
+from .role_mentions import apply as apply_role_mentions, measure as measure_role_mentions
@@ -1,23 +1,25 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from discord import Member, Message
 
+from bot.utils.message_features import MessageFeatures
+from bot.utils.message_window import MessageWindow, as_window
+
+
+def measure(features: MessageFeatures) -> Dict[str, int]:
+    """Count the attachments of a message."""
+    return {"attachments": features.attachments}
+
 
 async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
+    last_message: Message, recent_messages: Union[MessageWindow, List[Message]], config: Dict[str, int]
 ) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
     """Detects total attachments exceeding the limit sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if (
-            msg.author == last_message.author
-            and len(msg.attachments) > 0
-        )
-    )
-    total_recent_attachments = sum(len(msg.attachments) for msg in relevant_messages)
+    window = as_window(recent_messages, measure, author=last_message.author)
+    total_recent_attachments = window.totals["attachments"]
 
     if total_recent_attachments > config['max']:
+        relevant_messages = tuple(msg for msg in window if len(msg.attachments) > 0)
         return (
             f"sent {total_recent_attachments} attachments in {config['interval']}s",
             (last_message.author,),
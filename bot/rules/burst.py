@@ -1,23 +1,21 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from discord import Member, Message
 
+from bot.utils.message_window import MessageWindow, as_window
+
 
 async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
+    last_message: Message, recent_messages: Union[MessageWindow, List[Message]], config: Dict[str, int]
 ) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
     """Detects repeated messages sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if msg.author == last_message.author
-    )
-    total_relevant = len(relevant_messages)
+    window = as_window(recent_messages, author=last_message.author)
+    total_relevant = len(window)
 
     if total_relevant > config['max']:
         return (
             f"sent {total_relevant} messages in {config['interval']}s",
             (last_message.author,),
-            relevant_messages
+            tuple(window)
         )
     return None
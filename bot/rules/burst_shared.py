@@ -1,18 +1,22 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from discord import Member, Message
 
+from bot.utils.message_window import MessageWindow, as_window
+
 
 async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
+    last_message: Message, recent_messages: Union[MessageWindow, List[Message]], config: Dict[str, int]
 ) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
     """Detects repeated messages sent by multiple users."""
-    total_recent = len(recent_messages)
+    window = as_window(recent_messages)
+    total_recent = len(window)
 
     if total_recent > config['max']:
+        relevant_messages = list(window)
         return (
             f"sent {total_recent} messages in {config['interval']}s",
-            set(msg.author for msg in recent_messages),
-            recent_messages
+            set(msg.author for msg in relevant_messages),
+            relevant_messages
         )
     return None
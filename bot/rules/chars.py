@@ -1,24 +1,27 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from discord import Member, Message
 
+from bot.utils.message_features import MessageFeatures
+from bot.utils.message_window import MessageWindow, as_window
+
+
+def measure(features: MessageFeatures) -> Dict[str, int]:
+    """Count the characters in the content of a message."""
+    return {"chars": features.chars}
+
 
 async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
+    last_message: Message, recent_messages: Union[MessageWindow, List[Message]], config: Dict[str, int]
 ) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
     """Detects total message char count exceeding the limit sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if msg.author == last_message.author
-    )
-
-    total_recent_chars = sum(len(msg.content) for msg in relevant_messages)
+    window = as_window(recent_messages, measure, author=last_message.author)
+    total_recent_chars = window.totals["chars"]
 
     if total_recent_chars > config['max']:
         return (
             f"sent {total_recent_chars} characters in {config['interval']}s",
             (last_message.author,),
-            relevant_messages
+            tuple(window)
         )
     return None
@@ -1,25 +1,25 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
 
 from discord import Member, Message
 
+from bot.utils.message_features import MessageFeatures
+from bot.utils.message_window import MessageWindow, as_window
+
+
+def measure(features: MessageFeatures) -> Dict[Hashable, int]:
+    """Count the content of a message, so the window keeps a tally of each distinct non-empty content."""
+    return {("content", features.content_hash): 1} if features.chars else {}
+
 
 async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
+    last_message: Message, recent_messages: Union[MessageWindow, List[Message]], config: Dict[str, int]
 ) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
     """Detects duplicated messages sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if (
-            msg.author == last_message.author
-            and msg.content == last_message.content
-            and msg.content
-        )
-    )
-
-    total_duplicated = len(relevant_messages)
+    window = as_window(recent_messages, measure, author=last_message.author)
+    total_duplicated = window.totals["content", hash(last_message.content)] if last_message.content else 0
 
     if total_duplicated > config['max']:
+        relevant_messages = tuple(msg for msg in window if msg.content == last_message.content)
         return (
             f"sent {total_duplicated} duplicated messages in {config['interval']}s",
             (last_message.author,),
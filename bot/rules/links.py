@@ -1,28 +1,23 @@
-import re
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from discord import Member, Message
 
-LINK_RE = re.compile(r"(https?://[^\s]+)")
+from bot.utils.message_features import MessageFeatures
+from bot.utils.message_window import MessageWindow, as_window
+
+
+def measure(features: MessageFeatures) -> Dict[str, int]:
+    """Count the links in a message, and whether it has any links at all."""
+    return {"links": features.links, "messages_with_links": int(features.links > 0)}
 
 
 async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
+    last_message: Message, recent_messages: Union[MessageWindow, List[Message]], config: Dict[str, int]
 ) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
     """Detects total links exceeding the limit sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if msg.author == last_message.author
-    )
-    total_links = 0
-    messages_with_links = 0
-
-    for msg in relevant_messages:
-        total_matches = len(LINK_RE.findall(msg.content))
-        if total_matches:
-            messages_with_links += 1
-            total_links += total_matches
+    window = as_window(recent_messages, measure, author=last_message.author)
+    total_links = window.totals["links"]
+    messages_with_links = window.totals["messages_with_links"]
 
     # Only apply the filter if we found more than one message with
     # links to prevent wrongfully firing the rule on users posting
@@ -31,6 +26,6 @@ async def apply(
         return (
             f"sent {total_links} links in {config['interval']}s",
             (last_message.author,),
-            relevant_messages
+            tuple(window)
         )
     return None
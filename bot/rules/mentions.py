@@ -1,28 +1,27 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from discord import Member, Message
 
+from bot.utils.message_features import MessageFeatures
+from bot.utils.message_window import MessageWindow, as_window
+
+
+def measure(features: MessageFeatures) -> Dict[str, int]:
+    """Count the users mentioned in a message, ignoring bots."""
+    return {"mentions": features.mentions}
+
 
 async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
+    last_message: Message, recent_messages: Union[MessageWindow, List[Message]], config: Dict[str, int]
 ) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
     """Detects total mentions exceeding the limit sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if msg.author == last_message.author
-    )
-
-    total_recent_mentions = sum(
-        not user.bot
-        for msg in relevant_messages
-        for user in msg.mentions
-    )
+    window = as_window(recent_messages, measure, author=last_message.author)
+    total_recent_mentions = window.totals["mentions"]
 
     if total_recent_mentions > config['max']:
         return (
             f"sent {total_recent_mentions} mentions in {config['interval']}s",
             (last_message.author,),
-            relevant_messages
+            tuple(window)
         )
     return None
@@ -1,45 +1,48 @@
-import re
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
 
 from discord import Member, Message
 
+from bot.utils.message_features import MessageFeatures
+from bot.utils.message_window import MessageWindow, as_window
+
+
+def measure(features: MessageFeatures) -> Dict[Hashable, int]:
+    """
+    Count the newlines in a message, and record the size of its largest group of consecutive newlines.
+
+    The largest group is recorded under a `("consecutive", size)` key, so the window totals hold a tally of the
+    largest group sizes of all its messages.
+    """
+    if not features.newlines:
+        return {}
+    return {"newlines": features.newlines, ("consecutive", features.max_newline_group): 1}
+
 
 async def apply(
-    last_message: Message, recent_messages: List[Message], config: Dict[str, int]
+    last_message: Message, recent_messages: Union[MessageWindow, List[Message]], config: Dict[str, int]
 ) -> Optional[Tuple[str, Iterable[Member], Iterable[Message]]]:
     """Detects total newlines exceeding the set limit sent by a single user."""
-    relevant_messages = tuple(
-        msg
-        for msg in recent_messages
-        if msg.author == last_message.author
-    )
-
-    # Identify groups of newline characters and get group & total counts
-    exp = r"(\n+)"
-    newline_counts = []
-    for msg in relevant_messages:
-        newline_counts += [len(group) for group in re.findall(exp, msg.content)]
-    total_recent_newlines = sum(newline_counts)
-
-    # Get maximum newline group size
-    if newline_counts:
-        max_newline_group = max(newline_counts)
-    else:
-        # If no newlines are found, newline_counts will be an empty list, which will error out max()
-        max_newline_group = 0
+    window = as_window(recent_messages, measure, author=last_message.author)
+    total_recent_newlines = window.totals["newlines"]
 
     # Check first for total newlines, if this passes then check for large groupings
     if total_recent_newlines > config['max']:
         return (
             f"sent {total_recent_newlines} newlines in {config['interval']}s",
             (last_message.author,),
-            relevant_messages
+            tuple(window)
         )
-    elif max_newline_group > config['max_consecutive']:
+
+    # Get maximum newline group size. The totals hold at most one key per distinct group size.
+    max_newline_group = max(
+        (key[1] for key in window.totals if isinstance(key, tuple) and key[0] == "consecutive"),
+        default=0
+    )
+    if max_newline_group > config['max_consecutive']:
         return (
             f"sent {max_newline_group} consecutive newlines in {config['interval']}s",
             (last_message.author,),
-            relevant_messages
+            tuple(window)
         )
 
     return None
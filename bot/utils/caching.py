@@ -1,6 +1,10 @@
 import functools
+import time
 from collections import OrderedDict
-from typing import Any, Callable
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+# Sentinel for telling missing keys apart from cached None values.
+_MISSING = object()
 
 
 class AsyncCache:
@@ -39,3 +43,57 @@ class AsyncCache:
     def clear(self) -> None:
         """Clear cache instance."""
         self._cache.clear()
+
+
+class TTLCache:
+    """
+    LRU cache whose entries also expire a fixed amount of time after they were set.
+
+    Once the cache exceeds the maximum size, the least recently used key is deleted. Expired entries are treated as
+    missing and are removed when they are next looked up.
+    """
+
+    def __init__(self, max_size: int = 128, ttl: float = 60):
+        self._cache: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the value for `key` if it is cached and hasn't expired, otherwise `default`."""
+        try:
+            expires_at, value = self._cache[key]
+        except KeyError:
+            return default
+
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            return default
+
+        self._cache.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Cache `value` for `key`, evicting the least recently used key if the cache is full."""
+        self._cache[key] = (time.monotonic() + self._ttl, value)
+        self._cache.move_to_end(key)
+
+        if len(self._cache) > self._max_size:
+            self._cache.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove `key` from the cache, if it is cached."""
+        self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        """Clear cache instance."""
+        self._cache.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterate over a snapshot of the cached keys, including expired ones which weren't removed yet."""
+        return iter(list(self._cache))
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -0,0 +1,121 @@
+import re
+import typing as t
+
+from discord import Message
+from emoji import demojize
+
+LINK_RE = re.compile(r"(https?://[^\s]+)")
+NEWLINE_GROUP_RE = re.compile(r"(\n+)")
+DISCORD_EMOJI_RE = re.compile(r"<:\w+:\d+>|:\w+:")
+CODE_BLOCK_RE = re.compile(r"```.*?```", flags=re.DOTALL)
+
+
+class MessageFeatures:
+    """
+    The features of a message which the antispam rules measure, extracted from it at most once.
+
+    Each feature is computed from the message the first time it is read and then kept, so a message which stays in the
+    antispam windows is parsed once no matter how many rules look at it or how often. Features that no enabled rule
+    reads are never computed.
+    """
+
+    __slots__ = (
+        "message",
+        "_chars",
+        "_content_hash",
+        "_attachments",
+        "_links",
+        "_newlines",
+        "_max_newline_group",
+        "_emojis",
+        "_mentions",
+        "_role_mentions",
+    )
+
+    def __init__(self, message: Message):
+        self.message = message
+
+        self._chars: t.Optional[int] = None
+        self._content_hash: t.Optional[int] = None
+        self._attachments: t.Optional[int] = None
+        self._links: t.Optional[int] = None
+        self._newlines: t.Optional[int] = None
+        self._max_newline_group: t.Optional[int] = None
+        self._emojis: t.Optional[int] = None
+        self._mentions: t.Optional[int] = None
+        self._role_mentions: t.Optional[int] = None
+
+    @property
+    def chars(self) -> int:
+        """The length of the message content."""
+        if self._chars is None:
+            self._chars = len(self.message.content)
+        return self._chars
+
+    @property
+    def content_hash(self) -> int:
+        """A hash of the message content, for cheaply comparing contents."""
+        if self._content_hash is None:
+            self._content_hash = hash(self.message.content)
+        return self._content_hash
+
+    @property
+    def attachments(self) -> int:
+        """The number of attachments of the message."""
+        if self._attachments is None:
+            self._attachments = len(self.message.attachments)
+        return self._attachments
+
+    @property
+    def links(self) -> int:
+        """The number of links in the message content."""
+        if self._links is None:
+            self._links = len(LINK_RE.findall(self.message.content))
+        return self._links
+
+    @property
+    def newlines(self) -> int:
+        """The total number of newlines in the message content."""
+        if self._newlines is None:
+            self._count_newlines()
+        return self._newlines
+
+    @property
+    def max_newline_group(self) -> int:
+        """The size of the largest group of consecutive newlines in the message content."""
+        if self._max_newline_group is None:
+            self._count_newlines()
+        return self._max_newline_group
+
+    @property
+    def emojis(self) -> int:
+        """The number of Discord and Unicode emojis in the message content, ignoring code blocks."""
+        if self._emojis is None:
+            # Get rid of code blocks in the message before searching for emojis.
+            # Convert Unicode emojis to :emoji: format to get their count.
+            content = demojize(CODE_BLOCK_RE.sub("", self.message.content))
+            self._emojis = len(DISCORD_EMOJI_RE.findall(content))
+        return self._emojis
+
+    @property
+    def mentions(self) -> int:
+        """The number of users mentioned in the message, ignoring bots."""
+        if self._mentions is None:
+            self._mentions = sum(not user.bot for user in self.message.mentions)
+        return self._mentions
+
+    @property
+    def role_mentions(self) -> int:
+        """The number of roles mentioned in the message."""
+        if self._role_mentions is None:
+            self._role_mentions = len(self.message.role_mentions)
+        return self._role_mentions
+
+    def _count_newlines(self) -> None:
+        """Identify groups of newline characters and set the total and largest group counts."""
+        newline_counts = [len(group) for group in NEWLINE_GROUP_RE.findall(self.message.content)]
+        self._newlines = sum(newline_counts)
+        self._max_newline_group = max(newline_counts, default=0)
+
+    def __repr__(self) -> str:
+        return f"<MessageFeatures message={self.message.id}>"
@@ -0,0 +1,84 @@
+import re
+import typing as t
+from datetime import datetime
+
+import discord
+from discord.utils import escape_mentions, snowflake_time
+
+# User, role and channel mentions, the way `discord.Message.clean_content` finds them.
+MENTION_RE = re.compile(r"<(@[!&]?|#)([0-9]{15,20})>")
+
+
+class MessageSnapshot(t.NamedTuple):
+    """
+    An immutable copy of the parts of a message which the filters, the antispam rules and the mod log read.
+
+    Holding on to a `discord.Message` keeps its whole state alive, including its components, reactions, stickers,
+    interaction and referenced message. A snapshot only keeps the fields below. The author, channel and mentioned users
+    and roles are references to the objects already held by the guild, so they don't cost anything extra.
+
+    Snapshots can be used in place of messages wherever only these fields are read. For anything else, such as deleting
+    the message, `to_partial_message` re-hydrates a `discord.PartialMessage` from the channel and ID.
+    """
+
+    id: int
+    channel: discord.abc.Messageable
+    author: t.Union[discord.Member, discord.User]
+    content: str
+    attachments: tuple[discord.Attachment, ...] = ()
+    embeds: tuple[discord.Embed, ...] = ()
+    mentions: tuple[t.Union[discord.Member, discord.User], ...] = ()
+    role_mentions: tuple[discord.Role, ...] = ()
+
+    @classmethod
+    def from_message(cls, message: discord.Message) -> "MessageSnapshot":
+        """Take a snapshot of `message`."""
+        return cls(
+            id=message.id,
+            channel=message.channel,
+            author=message.author,
+            content=message.content,
+            attachments=tuple(message.attachments),
+            embeds=tuple(message.embeds),
+            mentions=tuple(message.mentions),
+            role_mentions=tuple(message.role_mentions),
+        )
+
+    @property
+    def created_at(self) -> datetime:
+        """The time the message was sent, in UTC."""
+        return snowflake_time(self.id)
+
+    @property
+    def guild(self) -> t.Optional[discord.Guild]:
+        """The guild the message was sent in, or None if it was sent in a DM."""
+        return getattr(self.channel, "guild", None)
+
+    @property
+    def clean_content(self) -> str:
+        """The content with mentions shown the way the client shows them, like `discord.Message.clean_content`."""
+        return escape_mentions(MENTION_RE.sub(self._resolve_mention, self.content))
+
+    def to_partial_message(self) -> discord.PartialMessage:
+        """Return a partial message, which can be used to act on the message, e.g. to delete it."""
+        return self.channel.get_partial_message(self.id)
+
+    async def delete(self, *, delay: t.Optional[float] = None) -> None:
+        """Delete the message, after `delay` seconds if given."""
+        await self.to_partial_message().delete(delay=delay)
+
+    def _resolve_mention(self, match: re.Match) -> str:
+        """Return how the client shows the mention in `match`."""
+        kind, id_ = match[1], int(match[2])
+        guild = self.guild
+
+        if kind == "#":
+            channel = guild and guild.get_channel_or_thread(id_)
+            return f"#{channel.name}" if channel else "#deleted-channel"
+
+        if kind == "@&":
+            role = (guild and guild.get_role(id_)) or discord.utils.get(self.role_mentions, id=id_)
+            return f"@{role.name}" if role else "@deleted-role"
+
+        member = (guild and guild.get_member(id_)) or discord.utils.get(self.mentions, id=id_)
+        return f"@{member.display_name}" if member else "@deleted-user"
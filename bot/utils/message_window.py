@@ -0,0 +1,214 @@
+import typing as t
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timedelta
+
+from discord import Message
+
+from bot.utils.message_features import MessageFeatures
+
+Measure = t.Callable[[MessageFeatures], t.Mapping[t.Hashable, int]]
+
+
+class MessageWindow:
+    """
+    A time-ordered window of messages which keeps running totals of per-message measurements.
+
+    Every message is measured once by `measure` when it enters the window, and the measurement is added to `totals`.
+    Measures read the message's `MessageFeatures`, which are kept alongside it and can be shared with other windows.
+    When the message leaves the window its measurement is subtracted again, so reading an aggregate never requires
+    going over the messages themselves. `totals` is therefore a multiset of everything `measure` returned for the
+    messages currently in the window; keys whose count drops to zero are removed.
+
+    Messages are added to the end of the window and expire from the beginning, like a collections.deque. Iterating over
+    the window yields the newest message first, to match the order of the antispam message cache.
+    """
+
+    def __init__(self, measure: t.Optional[Measure] = None, maxlen: t.Optional[int] = None):
+        if maxlen is not None and maxlen <= 0:
+            raise ValueError("maxlen must be positive")
+        self.maxlen = maxlen
+        self.totals: Counter = Counter()
+
+        self._measure = measure
+        self._entries: deque[tuple[MessageFeatures, t.Mapping[t.Hashable, int]]] = deque()
+
+    @classmethod
+    def from_messages(
+        cls, messages: t.Iterable[Message], measure: t.Optional[Measure] = None
+    ) -> "MessageWindow":
+        """Create a window from `messages`, which should be ordered newest first."""
+        window = cls(measure)
+        for message in reversed(list(messages)):
+            window.append(message)
+        return window
+
+    @property
+    def oldest(self) -> t.Optional[Message]:
+        """The message which will be the next to expire, or None if the window is empty."""
+        return self._entries[0][0].message if self._entries else None
+
+    def append(self, message: Message, features: t.Optional[MessageFeatures] = None) -> None:
+        """
+        Add `message` as the newest message in the window, evicting the oldest one if the window is full.
+
+        `features` may be given to share the features of the message with other windows. Otherwise, they're extracted
+        for this window alone.
+        """
+        if self.maxlen is not None and len(self._entries) >= self.maxlen:
+            self.popleft()
+
+        if features is None:
+            features = MessageFeatures(message)
+        measurement = self._measure(features) if self._measure else {}
+        self._entries.append((features, measurement))
+        self.totals.update(measurement)
+
+    def popleft(self) -> Message:
+        """Remove the oldest message from the window and return it."""
+        features, measurement = self._entries.popleft()
+        self._subtract(measurement)
+        return features.message
+
+    def update(self, message: Message, features: t.Optional[MessageFeatures] = None) -> bool:
+        """
+        Replace the cached message with the same ID as `message` and re-measure it.
+
+        Return True if the given message had a matching ID in the window.
+        """
+        for index, (cached, measurement) in enumerate(self._entries):
+            if cached.message.id == message.id:
+                if features is None:
+                    features = MessageFeatures(message)
+                self._subtract(measurement)
+                new_measurement = self._measure(features) if self._measure else {}
+                self._entries[index] = (features, new_measurement)
+                self.totals.update(new_measurement)
+                return True
+        return False
+
+    def _subtract(self, measurement: t.Mapping[t.Hashable, int]) -> None:
+        """Remove `measurement` from the running totals, dropping keys which are no longer counted."""
+        for key, count in measurement.items():
+            remaining = self.totals[key] - count
+            if remaining > 0:
+                self.totals[key] = remaining
+            else:
+                self.totals.pop(key, None)
+
+    def __iter__(self) -> t.Iterator[Message]:
+        for features, _ in reversed(self._entries):
+            yield features.message
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def as_window(
+    messages: t.Union[MessageWindow, t.Iterable[Message]],
+    measure: t.Optional[Measure] = None,
+    *,
+    author: t.Optional[t.Any] = None,
+) -> MessageWindow:
+    """
+    Return `messages` as a window measured by `measure`.
+
+    A window is returned as-is, since it has already been scoped and measured by its owner. Any other iterable of
+    messages, ordered newest first, is wrapped in a new window, keeping only the messages sent by `author` if given.
+    """
+    if isinstance(messages, MessageWindow):
+        return messages
+    if author is not None:
+        messages = [msg for msg in messages if msg.author == author]
+    return MessageWindow.from_messages(messages, measure)
+
+
+class WindowRule(t.NamedTuple):
+    """How messages are windowed for a single antispam rule."""
+
+    interval: int
+    measure: t.Optional[Measure] = None
+    per_author: bool = True
+
+
+class SlidingWindows:
+    """
+    A set of incrementally maintained message windows, one per rule and author.
+
+    Every incoming message is appended to the window of each rule, and expires out of it once it is older than the
+    rule's interval. The message's features are extracted once and shared by all of its windows. Expiry is tracked in
+    a single queue per rule ordered by arrival, so the work done per message is proportional to the number of rules
+    and the number of messages expiring, rather than to the size of the windows. Windows are dropped as soon as they
+    become empty so quiet authors do not accumulate state.
+
+    Rules with `per_author` set to False share a single window between all authors.
+    """
+
+    def __init__(self, rules: t.Mapping[str, WindowRule], maxlen: t.Optional[int] = None):
+        self.rules = rules
+        self.maxlen = maxlen
+
+        self._windows: dict[tuple[str, t.Optional[int]], MessageWindow] = {}
+        # Per rule: (created_at, window key, message ID) in the order the messages entered the windows.
+        self._expiry: defaultdict[str, deque[tuple[datetime, t.Optional[int], int]]] = defaultdict(deque)
+
+    def append(self, message: Message, now: datetime) -> None:
+        """Add `message` to the windows of every rule, then expire messages which are no longer recent at `now`."""
+        features = MessageFeatures(message)
+        for name, rule in self.rules.items():
+            key = self._key(rule, message)
+            window = self._windows.get((name, key))
+            if window is None:
+                window = self._windows[(name, key)] = MessageWindow(rule.measure, self.maxlen)
+
+            window.append(message, features)
+            self._expiry[name].append((message.created_at, key, message.id))
+
+        self.expire(now)
+
+    def expire(self, now: datetime) -> None:
+        """Remove all messages which were sent longer than their rule's interval before `now`."""
+        for name, rule in self.rules.items():
+            cutoff = now - timedelta(seconds=rule.interval)
+            queue = self._expiry[name]
+
+            while queue and queue[0][0] <= cutoff:
+                _, key, message_id = queue.popleft()
+                window = self._windows.get((name, key))
+                if window is None:
+                    continue
+
+                # The message may have already been evicted if the window hit its size limit.
+                if window.oldest.id == message_id:
+                    window.popleft()
+                if not window:
+                    del self._windows[(name, key)]
+
+    def get(self, rule_name: str, message: Message) -> MessageWindow:
+        """Return the window of `rule_name` which `message` belongs to."""
+        rule = self.rules[rule_name]
+        window = self._windows.get((rule_name, self._key(rule, message)))
+        return window if window is not None else MessageWindow(rule.measure)
+
+    def update(self, message: Message) -> bool:
+        """
+        Update a windowed message with new contents, adjusting the running totals of its windows.
+
+        Return True if the given message was in any window.
+        """
+        features = MessageFeatures(message)
+        updated = False
+        for name, rule in self.rules.items():
+            window = self._windows.get((name, self._key(rule, message)))
+            if window is not None:
+                updated |= window.update(message, features)
+        return updated
+
+    def clear(self) -> None:
+        """Remove all messages from all windows."""
+        self._windows.clear()
+        self._expiry.clear()
+
+    @staticmethod
+    def _key(rule: WindowRule, message: Message) -> t.Optional[int]:
+        """Return the key of the window `message` belongs to for `rule`."""
+        return message.author.id if rule.per_author else None
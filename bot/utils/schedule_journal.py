@@ -0,0 +1,85 @@
+import json
+import typing as t
+from datetime import datetime, timezone
+
+from async_rediscache.types.base import RedisKeyType, RedisObject, namespace_lock
+
+from bot.log import get_logger
+
+log = get_logger(__name__)
+
+
+class JournalItem(t.NamedTuple):
+    """An item recorded in a `ScheduleJournal`."""
+
+    due: datetime
+    payload: dict
+
+
+def _timestamp(due: datetime) -> float:
+    """Return the POSIX timestamp of `due`, treating naïve datetimes as UTC like the `Scheduler` does."""
+    if due.tzinfo is None:
+        due = due.replace(tzinfo=timezone.utc)
+    return due.timestamp()
+
+
+class ScheduleJournal(RedisObject):
+    """
+    A persistent record of the items a cog has scheduled, so they can be scheduled again quickly after a restart.
+
+    Each item is stored under its ID in the hash `<namespace>:items`, as the JSON payload the cog needs to schedule
+    it again, and its ID is added to the sorted set `<namespace>:due`, scored by the timestamp it's due at.
+    Cogs add items when they schedule them and remove them when they're done or cancelled. On startup, the pending
+    items are read back with a single range scan, instead of waiting for the API to return the whole active set.
+
+    The journal only mirrors the API, which stays the source of truth. Once the active items are fetched from the
+    API, cogs cancel and remove the recorded items which are no longer active and schedule the ones missing.
+    """
+
+    @property
+    def _due_key(self) -> str:
+        return f"{self.namespace}:due"
+
+    @property
+    def _items_key(self) -> str:
+        return f"{self.namespace}:items"
+
+    @namespace_lock
+    async def add(self, item_id: RedisKeyType, due: datetime, payload: dict) -> None:
+        """Record the item `item_id` due at `due`, replacing the item previously recorded under the ID."""
+        with await self._get_pool_connection() as connection:
+            transaction = connection.multi_exec()
+            transaction.zadd(self._due_key, _timestamp(due), str(item_id))
+            transaction.hset(self._items_key, str(item_id), json.dumps(payload))
+            await transaction.execute()
+
+    @namespace_lock
+    async def remove(self, item_id: RedisKeyType) -> None:
+        """Remove the item `item_id`, if it's recorded."""
+        with await self._get_pool_connection() as connection:
+            transaction = connection.multi_exec()
+            transaction.zrem(self._due_key, str(item_id))
+            transaction.hdel(self._items_key, str(item_id))
+            await transaction.execute()
+
+    @namespace_lock
+    async def items(self, until: t.Optional[datetime] = None) -> t.List[JournalItem]:
+        """Return the recorded items due until `until`, or all of them if it's not given, ordered by their due time."""
+        max_score = _timestamp(until) if until is not None else float("inf")
+        with await self._get_pool_connection() as connection:
+            due_items = await connection.zrangebyscore(
+                self._due_key, max=max_score, withscores=True, encoding="utf-8"
+            )
+            if not due_items:
+                return []
+            payloads = await connection.hmget(
+                self._items_key, *(item_id for item_id, _ in due_items), encoding="utf-8"
+            )
+
+        items = []
+        for (item_id, timestamp), payload in zip(due_items, payloads):
+            if payload is None:
+                log.warning(f"Skipping the item {item_id!r} of {self.namespace}, its payload is missing.")
+                continue
+            items.append(JournalItem(datetime.fromtimestamp(timestamp, timezone.utc), json.loads(payload)))
+        return items
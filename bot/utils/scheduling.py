@@ -1,6 +1,8 @@
 import asyncio
 import contextlib
+import heapq
 import inspect
+import itertools
 import typing as t
 from datetime import datetime
 from functools import partial
@@ -25,17 +27,30 @@ class Scheduler:
     given ID is currently scheduled.
 
     Any exception raised in a scheduled task is logged when the task is done.
+
+    By default, every coroutine scheduled in the future gets a Task which sleeps until the coroutine is due.
+    With `lazy_tasks`, the coroutines are instead kept in a heap ordered by their due time, with a single timer
+    for the earliest one, and their Tasks are only created once they're due. This avoids keeping an idle Task
+    around for each of them, which matters for schedulers holding many coroutines due far in the future.
     """
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, *, lazy_tasks: bool = False):
         self.name = name
+        self.lazy_tasks = lazy_tasks
 
         self._log = get_logger(f"{__name__}.{name}")
         self._scheduled_tasks: t.Dict[t.Hashable, asyncio.Task] = {}
 
+        # Coroutines waiting to be due with `lazy_tasks`, and a heap of their due times.
+        # Heap entries of cancelled or rescheduled IDs are skipped when they're popped.
+        self._pending: t.Dict[t.Hashable, _PendingCoroutine] = {}
+        self._pending_heap: t.List[t.Tuple[float, int, t.Hashable]] = []
+        self._pending_counter = itertools.count()
+        self._timer: t.Optional[asyncio.TimerHandle] = None
+
     def __contains__(self, task_id: t.Hashable) -> bool:
         """Return True if a task with the given `task_id` is currently scheduled."""
-        return task_id in self._scheduled_tasks
+        return task_id in self._scheduled_tasks or task_id in self._pending
 
     def schedule(self, task_id: t.Hashable, coroutine: t.Coroutine) -> None:
         """
@@ -49,7 +64,7 @@ class Scheduler:
         msg = f"Cannot schedule an already started coroutine for #{task_id}"
         assert inspect.getcoroutinestate(coroutine) == "CORO_CREATED", msg
 
-        if task_id in self._scheduled_tasks:
+        if task_id in self:
             self._log.debug(f"Did not schedule task #{task_id}; task was already scheduled.")
             coroutine.close()
             return
@@ -75,9 +90,9 @@ class Scheduler:
         now_datetime = datetime.now(time.tzinfo) if time.tzinfo else datetime.utcnow()
         delay = (time - now_datetime).total_seconds()
         if delay > 0:
-            coroutine = self._await_later(delay, task_id, coroutine)
-
-        self.schedule(task_id, coroutine)
+            self.schedule_later(delay, task_id, coroutine)
+        else:
+            self.schedule(task_id, coroutine)
 
     def schedule_later(self, delay: t.Union[int, float], task_id: t.Hashable, coroutine: t.Coroutine) -> None:
         """
@@ -86,12 +101,41 @@ class Scheduler:
         If a task with `task_id` already exists, close `coroutine` instead of scheduling it. This
         prevents unawaited coroutine warnings. Don't pass a coroutine that'll be re-used elsewhere.
         """
-        self.schedule(task_id, self._await_later(delay, task_id, coroutine))
+        if not self.lazy_tasks:
+            self.schedule(task_id, self._await_later(delay, task_id, coroutine))
+            return
+
+        self._log.trace(f"Scheduling task #{task_id} in {delay} seconds...")
+
+        msg = f"Cannot schedule an already started coroutine for #{task_id}"
+        assert inspect.getcoroutinestate(coroutine) == "CORO_CREATED", msg
+
+        if task_id in self:
+            self._log.debug(f"Did not schedule task #{task_id}; task was already scheduled.")
+            coroutine.close()
+            return
+
+        loop = asyncio.get_running_loop()
+        pending = _PendingCoroutine(loop.time() + delay, next(self._pending_counter), coroutine)
+        self._pending[task_id] = pending
+        heapq.heappush(self._pending_heap, (pending.due, pending.sequence, task_id))
+        if self._timer is None or pending.due < self._timer.when():
+            self._set_timer(loop)
+        self._log.debug(f"Scheduled task #{task_id} to be created in {delay} seconds.")
 
     def cancel(self, task_id: t.Hashable) -> None:
         """Unschedule the task identified by `task_id`. Log a warning if the task doesn't exist."""
         self._log.trace(f"Cancelling task #{task_id}...")
 
+        if (pending := self._pending.pop(task_id, None)) is not None:
+            pending.coroutine.close()
+            self._log.debug(f"Unscheduled pending task #{task_id}.")
+            if len(self._pending_heap) > 2 * len(self._pending) + 64:
+                # Drop the entries of cancelled coroutines, so cancelling many of them doesn't grow the heap.
+                self._pending_heap = [entry for entry in self._pending_heap if self._is_pending(entry)]
+                heapq.heapify(self._pending_heap)
+            return
+
         try:
             task = self._scheduled_tasks.pop(task_id)
         except KeyError:
@@ -105,14 +149,48 @@ class Scheduler:
         """Unschedule all known tasks."""
         self._log.debug("Unscheduling all tasks")
 
-        for task_id in self._scheduled_tasks.copy():
+        for task_id in [*self._scheduled_tasks, *self._pending]:
             self.cancel(task_id)
 
+    def _is_pending(self, heap_entry: t.Tuple[float, int, t.Hashable]) -> bool:
+        """Return True if `heap_entry` belongs to a coroutine which is still pending."""
+        _, sequence, task_id = heap_entry
+        pending = self._pending.get(task_id)
+        return pending is not None and pending.sequence == sequence
+
+    def _set_timer(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Set the timer to the due time of the earliest pending coroutine, or remove it if there's none."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending_heap and not self._is_pending(self._pending_heap[0]):
+            heapq.heappop(self._pending_heap)
+        if self._pending_heap:
+            self._timer = loop.call_at(self._pending_heap[0][0], self._start_due_tasks, loop)
+
+    def _start_due_tasks(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Create the Tasks of all pending coroutines which are due, then set the timer for the next one."""
+        self._timer = None
+        now = loop.time()
+        while self._pending_heap and self._pending_heap[0][0] <= now:
+            heap_entry = heapq.heappop(self._pending_heap)
+            if not self._is_pending(heap_entry):
+                continue
+
+            task_id = heap_entry[2]
+            coroutine = self._pending.pop(task_id).coroutine
+            self._log.trace(f"Task #{task_id} is due, creating it.")
+            self.schedule(task_id, self._await_later(0, task_id, coroutine))
+
+        self._set_timer(loop)
+
     async def _await_later(self, delay: t.Union[int, float], task_id: t.Hashable, coroutine: t.Coroutine) -> None:
         """Await `coroutine` after the given `delay` number of seconds."""
         try:
-            self._log.trace(f"Waiting {delay} seconds before awaiting coroutine for #{task_id}.")
-            await asyncio.sleep(delay)
+            if delay > 0:
+                self._log.trace(f"Waiting {delay} seconds before awaiting coroutine for #{task_id}.")
+                await asyncio.sleep(delay)
 
             # Use asyncio.shield to prevent the coroutine from cancelling itself.
             self._log.trace(f"Done waiting for #{task_id}; now awaiting the coroutine.")
@@ -164,6 +242,14 @@ class Scheduler:
                 self._log.error(f"Error in task #{task_id} {id(done_task)}!", exc_info=exception)
 
 
+class _PendingCoroutine(t.NamedTuple):
+    """A coroutine waiting to be due in a `Scheduler` with `lazy_tasks`."""
+
+    due: float  # Event loop time at which the coroutine is due
+    sequence: int  # Tells entries of a rescheduled ID apart, and keeps coroutines due at the same time in order
+    coroutine: t.Coroutine
+
+
 def create_task(
     coro: t.Awaitable,
     *,
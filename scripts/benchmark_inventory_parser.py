@@ -0,0 +1,104 @@
+"""
+Benchmark parsing intersphinx inventories against the previous line splitting and regex parsing.
+
+Usage, from the root of the repository:
+    python -m scripts.benchmark_inventory_parser [URL or path to objects.inv ...]
+
+The Python, Django and discord.py inventories are used if none are given.
+The bot's configuration has to be available, as the bot package is imported.
+"""
+
+import asyncio
+import re
+import sys
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from statistics import median
+from typing import AsyncIterator, Awaitable, Callable, List
+
+import aiohttp
+
+from bot.exts.info.doc import _inventory_parser
+from bot.exts.info.doc._inventory_parser import BufferReader, InventoryDict, parse_inventory
+
+DEFAULT_INVENTORIES = (
+    "https://docs.python.org/3/objects.inv",
+    "https://docs.djangoproject.com/en/stable/_objects/",
+    "https://discordpy.readthedocs.io/en/latest/objects.inv",
+)
+RUNS = 10
+
+_V2_LINE_RE = re.compile(r'(?x)(.+?)\s+(\S*:\S*)\s+(-?\d+)\s+?(\S*)\s+(.*)')
+
+
+async def _previous_lines(stream: BufferReader) -> AsyncIterator[str]:
+    """Yield the decompressed lines of `stream` the way the previous `ZlibStreamReader` did."""
+    decompressor = zlib.decompressobj()
+    buf = b''
+    async for compressed in stream.iter_chunked(_inventory_parser.ZlibStreamReader.READ_CHUNK_SIZE):
+        buf += decompressor.decompress(compressed)
+        pos = buf.find(b'\n')
+        while pos != -1:
+            yield buf[:pos].decode()
+            buf = buf[pos + 1:]
+            pos = buf.find(b'\n')
+
+
+async def previous_parse_inventory(data: bytes) -> InventoryDict:
+    """Parse a version 2 inventory the way the parser did before the fast path."""
+    stream = BufferReader(data)
+    for _ in range(4):
+        await stream.readline()
+
+    invdata = defaultdict(list)
+    async for line in _previous_lines(stream):
+        name, type_, _prio, location, _dispname = _V2_LINE_RE.match(line.rstrip()).groups()
+        if location.endswith("$"):
+            location = location[:-1] + name
+        invdata[type_].append((name, location))
+    return invdata
+
+
+async def load(source: str, session: aiohttp.ClientSession) -> bytes:
+    """Read the inventory at `source`, a URL or a path."""
+    if "://" not in source:
+        return Path(source).read_bytes()
+    async with session.get(source, raise_for_status=True) as response:
+        return await response.read()
+
+
+async def time_parser(parser: Callable[[bytes], Awaitable[InventoryDict]], data: bytes) -> float:
+    """Return the median time `parser` takes to parse `data`, in milliseconds."""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await parser(data)
+        timings.append((time.perf_counter() - start) * 1000)
+    return median(timings)
+
+
+async def main(sources: List[str]) -> None:
+    """Parse every inventory in `sources` with both parsers and print their timings."""
+    async with aiohttp.ClientSession() as session:
+        inventories = {source: await load(source, session) for source in sources}
+
+    print(f"{'inventory':<60} {'symbols':>8} {'previous':>10} {'current':>10} {'speedup':>8}")
+    for source, data in inventories.items():
+        if not data.startswith(b"# Sphinx inventory version 2"):
+            print(f"{source:<60} skipped, not a version 2 inventory")
+            continue
+
+        inventory = await parse_inventory(data)
+        if inventory != await previous_parse_inventory(data):
+            raise RuntimeError(f"The parsers disagree on {source}.")
+
+        previous = await time_parser(previous_parse_inventory, data)
+        current = await time_parser(parse_inventory, data)
+        symbols = sum(map(len, inventory.values()))
+        print(f"{source:<60} {symbols:>8} {previous:>8.1f}ms {current:>8.1f}ms {previous / current:>7.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:] or list(DEFAULT_INVENTORIES)))
@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from unittest import mock
 
@@ -188,6 +189,105 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(actual_diff, expected_diff)
 
+    async def test_next_page_requested_while_diffing(self):
+        """The next page of users should be requested before the current page is diffed."""
+        pages = {
+            1: {"count": 2, "next_page_no": 2, "previous_page_no": None, "results": [fake_user()]},
+            2: {"count": 2, "next_page_no": None, "previous_page_no": 1, "results": [fake_user(id=63)]},
+        }
+        self.bot.api_client.get.side_effect = lambda endpoint, params: pages[params["page"]]
+        guild = self.get_guild(fake_user(), fake_user(id=63))
+        requests_while_diffing = []
+
+        def get_member(user_id):
+            requests_while_diffing.append(self.bot.api_client.get.call_count)
+            return self.get_mock_member(fake_user(id=user_id))
+
+        guild.get_member.side_effect = get_member
+        actual_diff = await UserSyncer._get_diff(guild)
+
+        self.assertEqual(actual_diff, ([], [], None))
+        self.assertEqual(requests_while_diffing, [2, 2])
+
+    async def test_prefetched_page_cancelled_when_diffing_fails(self):
+        """The request for the next page should be cancelled if diffing the current page raises."""
+        pages = {
+            1: {"count": 2, "next_page_no": 2, "previous_page_no": None, "results": [fake_user()]},
+            2: {"count": 2, "next_page_no": None, "previous_page_no": 1, "results": [fake_user(id=63)]},
+        }
+        self.bot.api_client.get.side_effect = lambda endpoint, params: pages[params["page"]]
+        guild = self.get_guild(fake_user())
+        guild.get_member.side_effect = RuntimeError
+
+        tasks = []
+
+        def create_task(coro, **kwargs):
+            tasks.append(asyncio.create_task(coro, **kwargs))
+            return tasks[-1]
+
+        with mock.patch("bot.exts.backend.sync._syncers.scheduling.create_task", side_effect=create_task):
+            with self.assertRaises(RuntimeError):
+                await UserSyncer._get_diff(guild)
+
+        first_page, next_page = tasks
+        with self.assertRaises(asyncio.CancelledError):
+            await next_page
+
+    async def test_uncached_users_not_fetched_from_chunked_guild(self):
+        """Users missing from the cache of a chunked guild aren't in it, so they shouldn't be fetched."""
+        self.bot.api_client.get.return_value = {
+            "count": 1,
+            "next_page_no": None,
+            "previous_page_no": None,
+            "results": [fake_user(id=63)]
+        }
+        guild = self.get_guild()
+        guild.chunked = True
+        guild.get_member.return_value = None
+
+        actual_diff = await UserSyncer._get_diff(guild)
+
+        self.assertEqual(actual_diff, ([], [{"id": 63, "in_guild": False}], None))
+        guild.chunk.assert_not_awaited()
+        guild.fetch_member.assert_not_awaited()
+
+    @mock.patch("bot.exts.backend.sync._syncers.FETCH_CONCURRENCY", 2)
+    async def test_missing_members_fetched_concurrently(self):
+        """If the guild can't be chunked, missing members should be fetched with bounded concurrency."""
+        db_users = [fake_user(id=user_id, name="old") for user_id in range(1, 6)]
+        self.bot.api_client.get.return_value = {
+            "count": 5,
+            "next_page_no": None,
+            "previous_page_no": None,
+            "results": db_users
+        }
+        guild = self.get_guild()
+        guild.chunked = False
+        guild.get_member.return_value = None
+        running_fetches = 0
+        max_running_fetches = 0
+
+        async def fetch_member(user_id):
+            nonlocal running_fetches, max_running_fetches
+            running_fetches += 1
+            max_running_fetches = max(max_running_fetches, running_fetches)
+            await asyncio.sleep(0)
+            running_fetches -= 1
+            if user_id % 2:
+                raise NotFound(mock.Mock(status=404), "Not found")
+            return self.get_mock_member(fake_user(id=user_id, name="new"))
+
+        guild.fetch_member.side_effect = fetch_member
+        actual_diff = await UserSyncer._get_diff(guild)
+
+        guild.chunk.assert_awaited_once()
+        self.assertEqual(max_running_fetches, 2)
+        expected_updated = [
+            {"id": user_id, "in_guild": False} if user_id % 2 else {"id": user_id, "name": "new"}
+            for user_id in range(1, 6)
+        ]
+        self.assertEqual(actual_diff, ([], expected_updated, None))
+
 
 class UserSyncerSyncTests(unittest.IsolatedAsyncioTestCase):
     """Tests for the API requests that sync users."""
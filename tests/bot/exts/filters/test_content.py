@@ -0,0 +1,43 @@
+import unittest
+
+from bot.exts.filters._content import FilterContent
+
+
+class FilterContentTests(unittest.TestCase):
+    """Tests for the FilterContent class in the `bot.exts.filters._content` module."""
+
+    def test_cleaned_removes_zalgo_and_invisible_characters(self):
+        """Zalgo and invisible characters are removed from the cleaned content."""
+        content = FilterContent("tók​en")
+        self.assertEqual(content.cleaned, "token")
+        self.assertEqual(content.raw, "tók​en")
+
+    def test_expanded_includes_spoiler_interpretations(self):
+        """Spoilered content is expanded into all of its interpretations."""
+        content = FilterContent("to||x||ken")
+        self.assertIn("token", content.expanded)
+        self.assertIn("to||x||ken", content.expanded)
+
+    def test_expanded_is_cleaned_content_without_spoilers(self):
+        """Content without spoilers isn't expanded."""
+        content = FilterContent("plain text")
+        self.assertIs(content.expanded, content.cleaned)
+
+    def test_folded_normalises_compatibility_characters(self):
+        """Compatibility characters, like fullwidth letters, are folded into their plain forms."""
+        self.assertEqual(FilterContent("ｔｏｋｅｎ").folded, "token")
+
+    def test_urls(self):
+        """All URLs in the cleaned content are found."""
+        content = FilterContent("see https://example.com and http://foo.org/bar​")
+        self.assertTupleEqual(content.urls, ("https://example.com", "http://foo.org/bar"))
+
+    def test_without_backslashes(self):
+        """Backslashes used to escape the content are removed."""
+        self.assertEqual(FilterContent(r"discord\.gg/python").without_backslashes, "discord.gg/python")
+
+    def test_of_returns_views_unchanged(self):
+        """Existing views are returned as-is rather than being wrapped again."""
+        content = FilterContent("text")
+        self.assertIs(FilterContent.of(content), content)
+        self.assertEqual(FilterContent.of("text").raw, "text")
@@ -1,8 +1,8 @@
 import unittest
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from bot.exts.filters import filtering
-from tests.helpers import MockBot, autospec
+from tests.helpers import MockBot, MockMessage, autospec
 
 
 class FilteringCogTests(unittest.IsolatedAsyncioTestCase):
@@ -38,3 +38,61 @@ class FilteringCogTests(unittest.IsolatedAsyncioTestCase):
                 )
                 if result:
                     self.assertEqual("TOKEN", result.group())
+
+    @autospec(filtering.Filtering, "_get_filterlist_items", pass_mocks=False, return_value=[])
+    async def test_invites_are_resolved_once(self):
+        """Repeated invites are only fetched once, including unknown ones."""
+        response = MagicMock(status=404)
+        response.json = AsyncMock(return_value={"message": "Unknown Invite", "code": 10006})
+        self.bot.http_session.get = AsyncMock(return_value=response)
+
+        self.assertTrue(await self.cog._has_invites("discord.gg/python and again discord.gg/python"))
+        self.assertTrue(await self.cog._has_invites("discord.gg/python"))
+        self.bot.http_session.get.assert_awaited_once()
+
+    @autospec(filtering.Filtering, "_get_filterlist_items", pass_mocks=False, return_value=[])
+    async def test_unsuccessful_invite_lookups_are_not_cached(self):
+        """Responses to failed requests, like rate limits, are fetched again next time."""
+        response = MagicMock(status=429)
+        response.json = AsyncMock(return_value={"message": "You are being rate limited."})
+        self.bot.http_session.get = AsyncMock(return_value=response)
+
+        await self.cog._has_invites("discord.gg/python")
+        await self.cog._has_invites("discord.gg/python")
+        self.assertEqual(self.bot.http_session.get.await_count, 2)
+
+    @autospec(filtering.Filtering, "_get_filterlist_items", pass_mocks=False, return_value=["TOKEN"])
+    async def test_token_filter_folds_compatibility_characters(self):
+        """Filter tokens written with compatibility characters, like fullwidth letters, are detected."""
+        result, _ = await self.cog._has_watch_regex_match("ＴＯＫＥＮ")
+        self.assertEqual("TOKEN", result.group())
+
+    @patch.object(filtering.Filtering, "_check_filter", return_value=True)
+    async def test_content_only_filters_skipped_when_content_unchanged(self, _):
+        """Only filters needing the full message are run when an edit didn't change the content."""
+        content_filter = {"enabled": True, "content_only": True, "function": AsyncMock(return_value=False)}
+        message_filter = {"enabled": True, "content_only": False, "function": AsyncMock(return_value=False)}
+        self.cog.filters = {"content_filter": content_filter, "message_filter": message_filter}
+        msg = MockMessage(content="hello")
+
+        await self.cog._filter_message(msg, content_changed=False)
+
+        content_filter["function"].assert_not_awaited()
+        message_filter["function"].assert_awaited_once_with(msg)
+        self.bot.stats.timing.assert_called_once()
+        self.assertEqual(self.bot.stats.timing.call_args.args[0], "filters.timings.message_filter")
+
+    @patch.object(filtering.Filtering, "_check_filter", return_value=True)
+    async def test_content_filters_share_normalised_content(self, _):
+        """Every filter needing only the content is given the same normalised view of it."""
+        functions = [AsyncMock(return_value=False), AsyncMock(return_value=(False, None))]
+        self.cog.filters = {
+            f"filter_{i}": {"enabled": True, "content_only": True, "function": function}
+            for i, function in enumerate(functions)
+        }
+
+        await self.cog._filter_message(MockMessage(content="hello"))
+
+        first, second = (function.await_args.args[0] for function in functions)
+        self.assertIs(first, second)
+        self.assertEqual(first.raw, "hello")
@@ -0,0 +1,94 @@
+import unittest
+
+from bot.exts.filters._matchers import DomainIndex, PatternMatcher, registered_domain
+
+
+class PatternMatcherTests(unittest.TestCase):
+    """Tests the `PatternMatcher` used for the filter token watchlist."""
+
+    def test_reports_matching_pattern(self):
+        """The pattern which matched is returned along with its match."""
+        matcher = PatternMatcher([r"foo", r"ba[rz]", r"\bqux\b"])
+
+        for text, pattern, matched in (
+            ("some foo here", "foo", "foo"),
+            ("BAZ!", "ba[rz]", "BAZ"),
+            ("a qux b", r"\bqux\b", "qux"),
+        ):
+            with self.subTest(text=text):
+                found_pattern, match = matcher.search(text)
+                self.assertEqual(found_pattern, pattern)
+                self.assertEqual(match.group(), matched)
+
+    def test_no_match_returns_none(self):
+        """None is returned when no pattern matches."""
+        matcher = PatternMatcher([r"foo", r"bar"])
+        self.assertIsNone(matcher.search("nothing to see"))
+        self.assertIsNone(PatternMatcher([]).search("nothing to see"))
+
+    def test_patterns_with_their_own_groups(self):
+        """Groups inside a pattern don't change which pattern is reported."""
+        matcher = PatternMatcher([r"x(y)", r"(?P<name>a)(b)c"])
+
+        pattern, match = matcher.search("abc")
+        self.assertEqual(pattern, r"(?P<name>a)(b)c")
+        self.assertEqual(match.group(), "abc")
+
+    def test_uncombinable_patterns_are_matched_separately(self):
+        """Patterns with backreferences or global flags still match as they would on their own."""
+        matcher = PatternMatcher([r"(a)\1", r"(?s)b.c", r"plain"])
+
+        self.assertEqual(matcher.search("xaax")[0], r"(a)\1")
+        self.assertEqual(matcher.search("b\nc")[0], r"(?s)b.c")
+        self.assertIsNone(matcher.search("ab"))
+        self.assertEqual(len(matcher), 3)
+
+    def test_invalid_patterns_are_skipped(self):
+        """An invalid pattern doesn't prevent the others from matching."""
+        with self.assertLogs("bot.exts.filters._matchers", level="WARNING"):
+            matcher = PatternMatcher([r"(unclosed", r"valid"])
+
+        self.assertEqual(matcher.search("valid")[0], "valid")
+        self.assertEqual(len(matcher), 1)
+
+    def test_conflicting_group_names_fall_back_to_separate_matching(self):
+        """Patterns which can't be combined with each other are still all matched."""
+        with self.assertLogs("bot.exts.filters._matchers", level="WARNING"):
+            matcher = PatternMatcher([r"(?P<g>a)", r"(?P<g>b)"])
+
+        self.assertEqual(matcher.search("b")[0], r"(?P<g>b)")
+
+
+class DomainIndexTests(unittest.TestCase):
+    """Tests the `DomainIndex` used for the domain blacklist."""
+
+    def setUp(self):
+        self.index = DomainIndex(["evil.com", "Bad.co.uk", "sub.shady.org"])
+
+    def test_matches_blacklisted_domains(self):
+        """URLs on a blacklisted registered domain are matched to their entry."""
+        for url, entry in (
+            ("https://evil.com", "evil.com"),
+            ("http://www.EVIL.com/some/path?q=1", "evil.com"),
+            ("https://cdn.bad.co.uk/image.png", "Bad.co.uk"),
+            ("https://sub.shady.org/", "sub.shady.org"),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.index.search(url), entry)
+
+    def test_ignores_other_domains(self):
+        """URLs which merely contain a blacklisted domain, or only share part of it, aren't matched."""
+        for url in (
+            "https://notevil.com",
+            "https://example.com/?next=evil.com",
+            "https://evil.com.example.net",
+            "https://other.shady.org",
+            "https://bad.co.uk.example.com",
+        ):
+            with self.subTest(url=url):
+                self.assertIsNone(self.index.search(url))
+
+    def test_registered_domain(self):
+        """The registered domain is extracted from hosts and full URLs alike."""
+        self.assertEqual(registered_domain("https://user@www.example.co.uk:8080/path"), "example.co.uk")
+        self.assertEqual(registered_domain("example.com"), "example.com")
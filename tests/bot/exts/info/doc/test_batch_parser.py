@@ -0,0 +1,156 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.exts.info.doc import _batch_parser
+from bot.exts.info.doc._cog import DocItem
+from tests.helpers import MockBot
+
+PAGE = """
+<dl><dt id="spam">spam()</dt><dd><p>Spam the eggs.</p></dd></dl>
+<dl><dt id="eggs">eggs()</dt><dd><p>Eggs the spam.</p></dd></dl>
+"""
+SPAM = DocItem("test", "function", "https://docs.invalid/", "api.html", "spam")
+EGGS = DocItem("test", "function", "https://docs.invalid/", "api.html", "eggs")
+HAM = DocItem("test", "function", "https://docs.invalid/", "api.html", "ham")
+
+
+class BatchParserTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for parsing the symbols of a page with the `BatchParser`."""
+
+    async def asyncSetUp(self):
+        patcher = patch("bot.instance", new=MockBot())
+        self.bot = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bot.loop = asyncio.get_running_loop()
+
+        response = MagicMock(text=AsyncMock(return_value=PAGE))
+        self.bot.http_session.get.return_value.__aenter__.return_value = response
+
+        for name in ("doc_cache", "StaleInventoryNotifier"):
+            patcher = patch.object(_batch_parser, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        _batch_parser.doc_cache.set_many = AsyncMock()
+        _batch_parser.StaleInventoryNotifier.return_value.send_warning = AsyncMock()
+
+        self.executor = ThreadPoolExecutor(1)
+        self.addCleanup(self.executor.shutdown)
+        self.page_items = MagicMock(return_value=[SPAM, EGGS, SPAM, HAM])
+
+    async def test_page_parsed_in_one_batch(self):
+        """With a page executor, all items of the page should be parsed and cached after fetching it once."""
+        parser = _batch_parser.BatchParser(self.page_items, self.executor)
+
+        with patch.object(_batch_parser, "get_page_markdown", wraps=_batch_parser.get_page_markdown) as parse:
+            markdown = await parser.get_markdown(EGGS)
+            await asyncio.gather(*parser._page_tasks)
+
+        parse.assert_called_once_with(PAGE, [EGGS, SPAM, HAM])
+        self.assertIn("Eggs the spam.", markdown)
+        self.assertEqual(self.bot.http_session.get.call_count, 1)
+        _batch_parser.doc_cache.set_many.assert_awaited_once()
+        self.assertEqual(list(_batch_parser.doc_cache.set_many.await_args.args[0]), [EGGS, SPAM])
+        parser.stale_inventory_notifier.send_warning.assert_called_once_with(HAM)
+        self.assertEqual(parser._item_futures, {})
+
+    async def test_items_of_page_in_flight_wait_for_its_batch(self):
+        """Requests for other items on a page being parsed should wait for its batch instead of fetching it again."""
+        parser = _batch_parser.BatchParser(self.page_items, self.executor)
+
+        eggs, spam = await asyncio.gather(parser.get_markdown(EGGS), parser.get_markdown(SPAM))
+
+        self.assertIn("Eggs the spam.", eggs)
+        self.assertIn("Spam the eggs.", spam)
+        self.assertEqual(self.bot.http_session.get.call_count, 1)
+
+    async def test_queue_used_without_page_executor(self):
+        """Without a page executor, the items should still be parsed through the queue."""
+        parser = _batch_parser.BatchParser(self.page_items)
+
+        with patch.object(_batch_parser.asyncio, "sleep", AsyncMock()):
+            markdown = await parser.get_markdown(SPAM)
+            await parser._parse_task
+
+        self.assertIn("Spam the eggs.", markdown)
+        # The results of the page are sent to redis together.
+        _batch_parser.doc_cache.set_many.assert_awaited_once()
+        self.assertCountEqual(_batch_parser.doc_cache.set_many.await_args.args[0], [SPAM, EGGS])
+        self.assertEqual(parser._item_futures, {})
+
+    async def test_clear_packages_keeps_other_packages(self):
+        """Clearing packages should only drop the queued items and futures of their symbols."""
+        other_package_item = SPAM._replace(package="other")
+        parser = _batch_parser.BatchParser(self.page_items)
+        for item in (SPAM, EGGS, other_package_item):
+            parser._queue.push(_batch_parser.QueueItem(item, None))
+            parser._item_futures[item]
+
+        await parser.clear({"test"})
+
+        self.assertNotIn(SPAM, parser._queue)
+        self.assertIn(other_package_item, parser._queue)
+        self.assertEqual(list(parser._item_futures), [other_package_item])
+        self.assertEqual(parser._queue.pop().doc_item, other_package_item)
+
+
+class ParseQueueTests(unittest.TestCase):
+    """Tests for the order and de-duplication of the `ParseQueue`."""
+
+    def setUp(self):
+        self.queue = _batch_parser.ParseQueue()
+        self.items = [
+            _batch_parser.QueueItem(DocItem("test", "function", "", "api.html", str(i)), None) for i in range(5)
+        ]
+
+    def pop_all(self) -> list:
+        """Pop every item from the queue and return their symbol IDs."""
+        popped = []
+        while self.queue:
+            popped.append(self.queue.pop().doc_item.symbol_id)
+        return popped
+
+    def test_items_popped_in_order_they_were_pushed(self):
+        """Items pushed to the back should be popped in the order they were pushed, without duplicates."""
+        for item in self.items + self.items[:2]:
+            self.queue.push(item)
+
+        self.assertEqual(len(self.queue), 5)
+        self.assertEqual(self.pop_all(), ["0", "1", "2", "3", "4"])
+
+    def test_moved_items_popped_first(self):
+        """The item moved to the front last should be popped first, followed by the other moved items."""
+        for item in self.items:
+            self.queue.push(item)
+
+        self.queue.move_to_front(self.items[3].doc_item)
+        self.queue.move_to_front(self.items[1].doc_item)
+        self.queue.move_to_front(self.items[3].doc_item)
+
+        self.assertEqual(len(self.queue), 5)
+        self.assertEqual(self.pop_all(), ["3", "1", "0", "2", "4"])
+
+    def test_contains(self):
+        """Only queued items should be in the queue, by their `DocItem`."""
+        self.queue.push(self.items[0])
+        self.assertIn(self.items[0].doc_item, self.queue)
+        self.assertNotIn(self.items[1].doc_item, self.queue)
+
+        self.queue.pop()
+        self.assertNotIn(self.items[0].doc_item, self.queue)
+
+    def test_moving_missing_item_raises(self):
+        """Moving an item which isn't queued should raise a `KeyError`."""
+        with self.assertRaises(KeyError):
+            self.queue.move_to_front(self.items[0].doc_item)
+
+    def test_pop_from_empty_queue_raises(self):
+        """Popping from an empty or cleared queue should raise an `IndexError`."""
+        self.queue.push(self.items[0])
+        self.queue.move_to_front(self.items[0].doc_item)
+        self.queue.clear()
+
+        self.assertFalse(self.queue)
+        with self.assertRaises(IndexError):
+            self.queue.pop()
@@ -0,0 +1,173 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.exts.info.doc import _cog
+from bot.exts.info.doc._inventory_store import FetchedInventory
+from tests.helpers import MockBot
+
+
+def api_package(name: str) -> dict:
+    """Return a documentation link of the site's API for the package `name`."""
+    return {"package": name, "base_url": f"https://{name}.invalid/", "inventory_url": f"https://{name}.invalid/inv"}
+
+
+def fetched_inventory(name: str) -> FetchedInventory:
+    """Return a fetched inventory with a single function named after the package `name`."""
+    return FetchedInventory(f"{name} digest", {"py:function": [(f"{name}_function", "api.html#$")]}, 1.0)
+
+
+class RefreshInventoriesTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for refreshing the inventories of the `DocCog`."""
+
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        doc_config = SimpleNamespace(parse_processes=0, page_cache_size=0, refresh_concurrency=2)
+        for patcher in (
+            patch("bot.instance", new=MockBot()),
+            patch.object(_cog, "Doc", new=doc_config),
+            patch.object(_cog, "SYMBOL_INDEX_PATH", new=Path(directory.name, "symbols.idx")),
+            patch.object(_cog, "doc_cache"),
+            # The initial refresh isn't started.
+            patch.object(_cog.DocCog, "init_refresh_inventory", new=MagicMock()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.bot = MockBot()
+        self.cog = _cog.DocCog(self.bot)
+        self.addCleanup(self.cog.symbol_index.close)
+        self.bot.loop = asyncio.get_running_loop()
+
+        self.cog.fetch_or_reschedule_inventory = AsyncMock(side_effect=self.fetch)
+        self.fetch_events = {}
+        self.running_fetches = 0
+        self.max_running_fetches = 0
+
+    async def fetch(self, name: str, base_url: str, inventory_url: str) -> FetchedInventory:
+        """Return the inventory of `name`, after its event in `fetch_events` is set if it has one."""
+        self.running_fetches += 1
+        self.max_running_fetches = max(self.max_running_fetches, self.running_fetches)
+        try:
+            if name in self.fetch_events:
+                await self.fetch_events[name].wait()
+            else:
+                await asyncio.sleep(0)
+        finally:
+            self.running_fetches -= 1
+        return fetched_inventory(name)
+
+    async def wait_for_symbol(self, name: str) -> None:
+        """Wait until the symbol `name` is in the index, failing the test if it isn't added within a second."""
+        async def wait() -> None:
+            while name not in self.cog.symbol_index:
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(wait(), timeout=1)
+
+    async def test_fetches_are_bounded(self):
+        """No more than `refresh_concurrency` inventories should be fetched at the same time."""
+        self.bot.api_client.get.return_value = [api_package(f"package{i}") for i in range(6)]
+
+        await self.cog.refresh_inventories()
+
+        self.assertEqual(self.max_running_fetches, 2)
+        self.assertEqual(list(self.cog.base_urls), [f"package{i}" for i in range(6)])
+        self.assertIn("package5_function", self.cog.symbol_index)
+        self.bot.stats.timing.assert_any_call("doc_inventories.package0.parse", 1.0)
+
+    async def test_ready_packages_swapped_in_before_slow_ones(self):
+        """Symbols of fetched packages should be available while other inventories are still being fetched."""
+        self.bot.api_client.get.return_value = [api_package("slow"), api_package("fast")]
+        self.fetch_events["slow"] = asyncio.Event()
+
+        refresh = asyncio.create_task(self.cog.refresh_inventories())
+        await self.wait_for_symbol("fast_function")
+
+        self.assertNotIn("slow_function", self.cog.symbol_index)
+        self.assertTrue(self.cog.refresh_event.is_set())
+
+        self.fetch_events["slow"].set()
+        await refresh
+        # The order of the packages from the API is kept.
+        self.assertEqual(list(self.cog.base_urls), ["slow", "fast"])
+        self.assertIn("slow_function", self.cog.symbol_index)
+
+    async def test_unchanged_packages_not_rebuilt(self):
+        """The index shouldn't be rebuilt if no package changed."""
+        self.bot.api_client.get.return_value = [api_package("spam")]
+        await self.cog.refresh_inventories()
+
+        self.cog.fetch_or_reschedule_inventory.side_effect = None
+        self.cog.fetch_or_reschedule_inventory.return_value = FetchedInventory("spam digest", None)
+        with patch.object(self.cog, "_replace_index") as replace_index:
+            await self.cog.refresh_inventories()
+        replace_index.assert_not_called()
+
+    async def test_removed_and_failed_packages(self):
+        """Removed packages and packages which won't be fetched again should be dropped, others kept."""
+        self.bot.api_client.get.return_value = [api_package("spam"), api_package("eggs"), api_package("ham")]
+        await self.cog.refresh_inventories()
+
+        self.bot.api_client.get.return_value = [api_package("spam"), api_package("eggs")]
+        self.cog.fetch_or_reschedule_inventory.side_effect = None
+        self.cog.fetch_or_reschedule_inventory.return_value = None
+        self.cog.inventory_scheduler.schedule_later(60, "eggs", asyncio.sleep(0))
+        self.addCleanup(self.cog.inventory_scheduler.cancel_all)
+        with patch.object(self.cog.inventory_scheduler, "cancel_all"):
+            await self.cog.refresh_inventories()
+
+        self.assertEqual(list(self.cog.base_urls), ["eggs"])
+        self.assertIn("eggs_function", self.cog.symbol_index)
+
+    async def test_swaps_coalesced_while_inventories_are_fetched(self):
+        """Packages ready within the rebuild interval should be swapped in together, not with a rebuild each."""
+        self.bot.api_client.get.return_value = [api_package("slow"), *(api_package(f"fast{i}") for i in range(5))]
+        # Both blocked fetches hold a slot, so the others need more.
+        _cog.Doc.refresh_concurrency = 8
+        self.fetch_events["slow"] = asyncio.Event()
+        self.fetch_events["fast0"] = asyncio.Event()
+
+        with patch.object(_cog, "INDEX_REBUILD_INTERVAL", 60), \
+                patch.object(self.cog, "_replace_index", wraps=self.cog._replace_index) as replace_index:
+            refresh = asyncio.create_task(self.cog.refresh_inventories())
+            await self.wait_for_symbol("fast1_function")
+            self.fetch_events["fast0"].set()
+            await asyncio.sleep(0.05)
+            # fast0 became ready within the interval, so it waits for the next rebuild.
+            self.assertNotIn("fast0_function", self.cog.symbol_index)
+
+            self.fetch_events["slow"].set()
+            await refresh
+
+        self.assertEqual(replace_index.await_count, 2)
+        self.assertIn("fast0_function", self.cog.symbol_index)
+        self.assertIn("slow_function", self.cog.symbol_index)
+
+    async def test_only_changed_packages_cleared(self):
+        """Swapping packages in should only clear the parsed and cached symbols of the changed packages."""
+        self.bot.api_client.get.return_value = [api_package("spam"), api_package("eggs")]
+        await self.cog.refresh_inventories()
+
+        with patch.object(self.cog.item_fetcher, "clear", new=AsyncMock()) as clear:
+            await self.cog.update_single("spam", "https://spam.invalid/", {"py:function": [("new", "api.html#$")]})
+
+        clear.assert_awaited_once_with({"spam"})
+        _cog.doc_cache.clear_local_cache.assert_called_with({"spam"})
+        self.assertIn("eggs_function", self.cog.symbol_index)
+        self.assertIn("new", self.cog.symbol_index)
+
+    async def test_concurrent_single_updates_rebuild_once(self):
+        """Packages updated at the same time should be added with one rebuild."""
+        with patch.object(self.cog, "_replace_index", wraps=self.cog._replace_index) as replace_index:
+            await asyncio.gather(*(
+                self.cog.update_single(name, f"https://{name}.invalid/", fetched_inventory(name).inventory)
+                for name in ("spam", "eggs", "ham")
+            ))
+
+        replace_index.assert_awaited_once()
+        self.assertEqual(list(self.cog.base_urls), ["spam", "eggs", "ham"])
@@ -0,0 +1,80 @@
+import zlib
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from bot.exts.info.doc import _inventory_parser as inventory_parser
+
+
+class V2LineParsingTests(TestCase):
+    """Tests for parsing the lines of version 2 inventories."""
+
+    def test_fast_path_matches_regex(self):
+        """Lines parsed without the regex should give the same result as the regex."""
+        lines = (
+            "print py:function 1 library/functions.html#$ -",
+            "str.join py:method 1 library/stdtypes.html#$ -",
+            "-c std:cmdoption -1 using/cmdline.html#cmdoption-c -",
+            "api std:doc -1 api.html API Reference",
+            "ünïcode py:data 0 api.html#unicode Ünïcode name",
+            "spam py:function 1 api.html#$ -\r",
+        )
+        for line in lines:
+            with self.subTest(line=line):
+                name, type_, _, location, _ = inventory_parser._V2_LINE_RE.match(line.rstrip()).groups()
+                self.assertEqual(inventory_parser._parse_v2_line(line), (name, type_, location))
+
+    def test_names_with_spaces_fall_back_to_regex(self):
+        """Names containing whitespace should still be parsed with the regex."""
+        test_cases = (
+            ("context manager std:term -1 glossary.html#term-context-manager -", "context manager"),
+            ("a b:c std:label -1 api.html#a Label", "a b:c"),
+            ("double  space py:data 1 api.html#$ -", "double  space"),
+        )
+        for line, name in test_cases:
+            with self.subTest(line=line):
+                self.assertEqual(inventory_parser._parse_v2_line(line)[0], name)
+
+
+class ZlibStreamReaderTests(IsolatedAsyncioTestCase):
+    """Tests for the line splitting of `ZlibStreamReader`."""
+
+    async def read_lines(self, text: str, chunk_size: int) -> list[str]:
+        """Compress `text` and read its lines with chunks of `chunk_size` compressed bytes."""
+        reader = inventory_parser.ZlibStreamReader(inventory_parser.BufferReader(zlib.compress(text.encode())))
+        with patch.object(inventory_parser.ZlibStreamReader, "READ_CHUNK_SIZE", chunk_size):
+            return [line async for line in reader]
+
+    async def test_lines_split_across_chunks(self):
+        """Lines should be yielded whole no matter how the chunks split them, including multi-byte characters."""
+        lines = [f"symbol_{i} py:function 1 api.html#$ ünïcödé €{i}" for i in range(200)]
+        text = "\n".join(lines) + "\n"
+        for chunk_size in (1, 7, 64, 16 * 1024):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(await self.read_lines(text, chunk_size), lines)
+
+    async def test_empty_lines_kept(self):
+        """Empty lines should be yielded like any other line."""
+        self.assertEqual(await self.read_lines("a\n\nb\n", 2), ["a", "", "b"])
+
+
+class ParseInventoryTests(IsolatedAsyncioTestCase):
+    """Tests for parsing whole inventories."""
+
+    async def test_v2_inventory(self):
+        """A version 2 inventory should be parsed into its groups, with `$` locations expanded."""
+        header = b"# Sphinx inventory version 2\n# Project: test\n# Version: 1\n# The remainder is zlib compressed.\n"
+        body = (
+            "print py:function 1 library/functions.html#$ -\n"
+            "context manager std:term -1 glossary.html#term-context-manager -\n"
+        )
+        inventory = await inventory_parser.parse_inventory(header + zlib.compress(body.encode()))
+        self.assertEqual(inventory, {
+            "py:function": [("print", "library/functions.html#print")],
+            "std:term": [("context manager", "glossary.html#term-context-manager")],
+        })
+
+    async def test_invalid_header(self):
+        """Inventories with an invalid header should raise `InvalidHeaderError`."""
+        for data in (b"", b"# Sphinx inventory version x\n", b"# Sphinx inventory version 2\n# Project: test\n"):
+            with self.subTest(data=data), self.assertRaises(inventory_parser.InvalidHeaderError):
+                await inventory_parser.parse_inventory(data)
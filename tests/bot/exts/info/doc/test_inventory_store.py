@@ -0,0 +1,119 @@
+import asyncio
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.exts.info.doc._inventory_parser import InvalidHeaderError
+from bot.exts.info.doc._inventory_store import InventoryStore, inventory_file_digest
+from tests.helpers import MockBot
+
+URL = "https://docs.invalid/objects.inv"
+
+
+def make_inventory(*symbols: str) -> bytes:
+    """Return a version 2 inventory file containing functions named `symbols`."""
+    header = b"# Sphinx inventory version 2\n# Project: test\n# Version: 1.0\n# The remainder is zlib compressed.\n"
+    lines = "".join(f"{symbol} py:function 1 api.html#$ -\n" for symbol in symbols)
+    return header + zlib.compress(lines.encode())
+
+
+class InventoryStoreTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for conditionally fetching inventories through the `InventoryStore`."""
+
+    async def asyncSetUp(self):
+        patcher = patch("bot.instance", new=MockBot())
+        self.bot = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bot.loop = asyncio.get_running_loop()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name, "inventories")
+        self.store = InventoryStore(self.directory)
+
+    def respond(self, status: int = 200, data: bytes = b"", headers: dict = None) -> None:
+        """Make the next requests get a response with the given status, body and headers."""
+        response = MagicMock(status=status, headers=headers or {}, read=AsyncMock(return_value=data))
+        self.bot.http_session.get.return_value.__aenter__.return_value = response
+
+    def request_headers(self) -> dict:
+        """Return the headers sent with the last request."""
+        return self.bot.http_session.get.call_args.kwargs["headers"]
+
+    async def test_new_inventory_is_parsed_and_stored(self):
+        """An inventory fetched for the first time should be parsed and stored with its validators."""
+        data = make_inventory("spam", "eggs")
+        self.respond(data=data, headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+        fetched = await self.store.fetch(URL)
+
+        self.assertEqual(self.request_headers(), {})
+        self.assertEqual(fetched.digest, inventory_file_digest(data))
+        self.assertEqual(fetched.inventory, {"py:function": [("spam", "api.html#spam"), ("eggs", "api.html#eggs")]})
+        self.assertEqual((self.directory / f"{fetched.digest}.inv").read_bytes(), data)
+
+    async def test_validators_are_sent(self):
+        """The validators of the stored copy should be sent, also by a new store reading the same directory."""
+        self.respond(data=make_inventory("spam"), headers={"ETag": '"v1"', "Last-Modified": "yesterday"})
+        await self.store.fetch(URL)
+
+        for store in (self.store, InventoryStore(self.directory)):
+            with self.subTest(store=store):
+                await store.fetch(URL)
+                self.assertEqual(self.request_headers(), {"If-None-Match": '"v1"', "If-Modified-Since": "yesterday"})
+
+    async def test_not_modified_with_known_digest_is_not_parsed(self):
+        """A 304 for an inventory the caller already has should return only its digest."""
+        self.respond(data=make_inventory("spam"), headers={"ETag": '"v1"'})
+        digest = (await self.store.fetch(URL)).digest
+
+        self.respond(status=304)
+        with patch("bot.exts.info.doc._inventory_store.parse_inventory") as parse_inventory:
+            fetched = await self.store.fetch(URL, digest)
+
+        parse_inventory.assert_not_called()
+        self.assertEqual(fetched[:2], (digest, None))
+
+    async def test_not_modified_is_served_from_the_stored_copy(self):
+        """A 304 for an inventory the caller doesn't have yet should be parsed from the stored copy."""
+        self.respond(data=make_inventory("spam"), headers={"ETag": '"v1"'})
+        digest = (await self.store.fetch(URL)).digest
+
+        self.respond(status=304)
+        fetched = await self.store.fetch(URL, "another digest")
+
+        self.assertEqual(fetched[:2], (digest, {"py:function": [("spam", "api.html#spam")]}))
+
+    async def test_unchanged_content_is_not_parsed(self):
+        """A full response with the content the caller already has should not be parsed."""
+        data = make_inventory("spam")
+        self.respond(data=data)
+
+        fetched = await self.store.fetch(URL, inventory_file_digest(data))
+
+        self.assertEqual(fetched[:2], (inventory_file_digest(data), None))
+
+    async def test_changed_inventory_replaces_stored_copy(self):
+        """A changed inventory should replace the previous copy, which is deleted."""
+        self.respond(data=make_inventory("spam"), headers={"ETag": '"v1"'})
+        old_digest = (await self.store.fetch(URL)).digest
+
+        self.respond(data=make_inventory("eggs"), headers={"ETag": '"v2"'})
+        fetched = await self.store.fetch(URL, old_digest)
+
+        self.assertEqual(fetched.inventory, {"py:function": [("eggs", "api.html#eggs")]})
+        self.assertFalse((self.directory / f"{old_digest}.inv").exists())
+        self.assertTrue((self.directory / f"{fetched.digest}.inv").exists())
+
+    async def test_invalid_inventory_is_not_stored(self):
+        """Inventories with an invalid header should raise and not be stored."""
+        self.respond(data=b"not an inventory\n", headers={"ETag": '"v1"'})
+
+        with self.assertRaises(InvalidHeaderError):
+            await self.store.fetch(URL)
+
+        self.respond(data=make_inventory("spam"))
+        await self.store.fetch(URL)
+        self.assertEqual(self.request_headers(), {})
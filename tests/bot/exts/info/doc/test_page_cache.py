@@ -0,0 +1,96 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.exts.info.doc._page_cache import PageCache, page_file_name
+from tests.helpers import MockBot
+
+URL = "https://docs.invalid/api.html"
+HTML = "<dl><dt id='spam'>spam()</dt></dl>"
+
+
+class PageCacheTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for conditionally fetching documentation pages through the `PageCache`."""
+
+    async def asyncSetUp(self):
+        patcher = patch("bot.instance", new=MockBot())
+        self.bot = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bot.loop = asyncio.get_running_loop()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name, "pages")
+        self.cache = PageCache(self.directory, 10_000)
+
+    def respond(self, status: int = 200, html: str = HTML, headers: dict = None) -> None:
+        """Make the next requests get a response with the given status, body and headers."""
+        response = MagicMock(status=status, headers=headers or {}, text=AsyncMock(return_value=html))
+        self.bot.http_session.get.return_value.__aenter__.return_value = response
+
+    def request_headers(self) -> dict:
+        """Return the headers sent with the last request."""
+        return self.bot.http_session.get.call_args.kwargs["headers"]
+
+    async def test_not_modified_page_is_served_from_the_stored_copy(self):
+        """A page stored with validators should be revalidated, and served locally on a 304."""
+        self.respond(headers={"ETag": '"v1"', "Last-Modified": "yesterday"})
+        self.assertEqual(await self.cache.fetch(URL), HTML)
+        self.assertEqual(self.request_headers(), {})
+
+        self.respond(status=304, html="")
+        for cache in (self.cache, PageCache(self.directory, 10_000)):
+            with self.subTest(cache=cache):
+                self.assertEqual(await cache.fetch(URL), HTML)
+                self.assertEqual(self.request_headers(), {"If-None-Match": '"v1"', "If-Modified-Since": "yesterday"})
+
+    async def test_modified_page_replaces_stored_copy(self):
+        """A full response should replace the stored copy and its validators."""
+        self.respond(headers={"ETag": '"v1"'})
+        await self.cache.fetch(URL)
+        self.respond(html="new", headers={"ETag": '"v2"'})
+        self.assertEqual(await self.cache.fetch(URL), "new")
+
+        self.respond(status=304, html="")
+        self.assertEqual(await self.cache.fetch(URL), "new")
+        self.assertEqual(self.request_headers(), {"If-None-Match": '"v2"'})
+
+    async def test_pages_without_validators_not_stored(self):
+        """Pages which can't be revalidated shouldn't be stored."""
+        self.respond()
+        await self.cache.fetch(URL)
+        self.assertFalse((self.directory / page_file_name(URL)).exists())
+
+    async def test_invalid_stored_copy_is_deleted(self):
+        """A stored copy which can't be read should be deleted and the page requested without validators."""
+        self.directory.mkdir(parents=True)
+        path = self.directory / page_file_name(URL)
+        path.write_bytes(b"[]\nnot compressed")
+
+        self.respond()
+        self.assertEqual(await self.cache.fetch(URL), HTML)
+        self.assertEqual(self.request_headers(), {})
+        self.assertFalse(path.exists())
+
+    async def test_least_recently_used_pages_evicted(self):
+        """Storing pages past the maximum size should delete the least recently used pages."""
+        # Each page takes a little over 2000 bytes compressed, so only two of them fit.
+        self.cache.max_size = 5000
+        urls = [f"https://docs.invalid/{i}.html" for i in range(3)]
+        self.respond(html=os.urandom(2000).hex(), headers={"ETag": '"v1"'})
+        for i, url in enumerate(urls[:2]):
+            await self.cache.fetch(url)
+            os.utime(self.directory / page_file_name(url), (i, i))
+
+        # Using the first page makes the second one the least recently used.
+        self.respond(status=304, html="")
+        await self.cache.fetch(urls[0])
+        self.respond(html=os.urandom(2000).hex(), headers={"ETag": '"v1"'})
+        await self.cache.fetch(urls[2])
+
+        stored = [(self.directory / page_file_name(url)).exists() for url in urls]
+        self.assertEqual(stored, [True, False, True])
+        self.assertLessEqual(self.cache._size, self.cache.max_size)
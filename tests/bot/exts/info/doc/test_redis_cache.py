@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, call, patch
+
+from bot.exts.info.doc._cog import DocItem
+from bot.exts.info.doc._redis_cache import DocRedisCache, WEEK_SECONDS
+from tests.helpers import MockBot
+
+ITEM = DocItem("test", "function", "https://docs.invalid/", "api.html", "spam")
+OTHER_PAGE_ITEM = DocItem("test", "function", "https://docs.invalid/", "other.html", "eggs")
+
+
+class DocRedisCacheLocalTierTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the in-process cache in front of redis."""
+
+    def setUp(self):
+        patcher = patch("bot.instance", new=MockBot())
+        self.bot = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cache = DocRedisCache(namespace="test")
+        self.cache._get = AsyncMock(return_value="markdown")
+
+    async def test_requested_symbols_kept_in_memory(self):
+        """A symbol read from redis should be served from memory afterwards."""
+        self.assertEqual(await self.cache.get(ITEM), "markdown")
+        self.assertEqual(await self.cache.get(ITEM), "markdown")
+
+        self.cache._get.assert_awaited_once_with(ITEM)
+        self.assertEqual(
+            [call.args[0] for call in self.bot.stats.incr.call_args_list],
+            ["doc_cache.local_misses", "doc_cache.local_hits"],
+        )
+
+    async def test_missing_symbols_not_kept(self):
+        """Symbols missing from redis should be looked up in redis every time."""
+        self.cache._get.return_value = None
+
+        self.assertIsNone(await self.cache.get(ITEM))
+        self.assertIsNone(await self.cache.get(ITEM))
+        self.assertEqual(self.cache._get.await_count, 2)
+
+    async def test_clear_local_cache(self):
+        """Symbols should be read from redis again after the local cache is cleared."""
+        await self.cache.get(ITEM)
+        self.cache.clear_local_cache()
+        await self.cache.get(ITEM)
+
+        self.assertEqual(self.cache._get.await_count, 2)
+
+    async def test_clear_local_cache_of_packages(self):
+        """Only the symbols of the given packages should be cleared from memory."""
+        other_package_item = ITEM._replace(package="other")
+        await self.cache.get(ITEM)
+        await self.cache.get(other_package_item)
+        self.cache.clear_local_cache({"test"})
+        await self.cache.get(ITEM)
+        await self.cache.get(other_package_item)
+
+        self.assertEqual(self.cache._get.await_args_list, [call(ITEM), call(other_package_item), call(ITEM)])
+
+
+class DocRedisCacheSetManyTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for writing the symbols of pages in bulk."""
+
+    def setUp(self):
+        patcher = patch.object(DocRedisCache, "namespace", new_callable=PropertyMock, return_value="doc")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cache = DocRedisCache(namespace="doc")
+        self.pipelines = []
+        connection = MagicMock()
+        connection.pipeline.side_effect = self.make_pipeline
+        self.cache._get_pool_connection = AsyncMock(return_value=connection)
+        connection.__enter__.return_value = connection
+
+    def make_pipeline(self) -> MagicMock:
+        """Return a pipeline mock whose `exists` results are True for the `other` page only."""
+        pipeline = MagicMock(execute=AsyncMock())
+
+        def exists(key: str) -> asyncio.Future:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(int(key.endswith("other")))
+            return future
+
+        pipeline.exists.side_effect = exists
+        self.pipelines.append(pipeline)
+        return pipeline
+
+    async def test_pages_written_in_one_pipeline(self):
+        """Each page should be written with one HSET, and only new pages should get an expire."""
+        item_2 = ITEM._replace(symbol_id="ham")
+        await self.cache.set_many({ITEM: "spam", item_2: "ham", OTHER_PAGE_ITEM: "eggs"})
+
+        exists_pipeline, write_pipeline = self.pipelines
+        self.assertEqual(exists_pipeline.exists.call_args_list, [call("doc:test:api"), call("doc:test:other")])
+        write_pipeline.hmset_dict.assert_has_calls([
+            call("doc:test:api", {"spam": "spam", "ham": "ham"}),
+            call("doc:test:other", {"eggs": "eggs"}),
+        ])
+        write_pipeline.expire.assert_called_once_with("doc:test:api", WEEK_SECONDS)
+        write_pipeline.execute.assert_awaited_once()
+
+    async def test_known_pages_not_checked_again(self):
+        """Pages whose expire was already handled shouldn't be checked for existence again."""
+        await self.cache.set_many({ITEM: "spam"})
+        await self.cache.set(ITEM._replace(symbol_id="ham"), "ham")
+
+        self.assertEqual(len(self.pipelines), 3)
+        self.pipelines[2].hmset_dict.assert_called_once_with("doc:test:api", {"ham": "ham"})
+        self.pipelines[2].expire.assert_not_called()
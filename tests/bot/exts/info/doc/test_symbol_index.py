@@ -0,0 +1,219 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from bot.exts.info.doc import _symbol_index as symbol_index
+from bot.exts.info.doc._cog import DocItem
+
+PYTHON_INVENTORY = {
+    "py:function": [("print", "library/functions.html#print"), ("len", "library/functions.html#len")],
+    "py:class": [("str", "library/stdtypes.html#str")],
+    "std:term": [("iterator", "glossary.html#term-iterator")],
+}
+OTHER_INVENTORY = {
+    "py:function": [("print", "api.html#print"), ("ünïcode", "api.html#unicode")],
+    "std:label": [("iterator", "api.html#iterator")],
+    "std:doc": [("ünïcode", "unicode.html")],
+}
+
+
+def build(*packages: tuple[str, dict]) -> symbol_index.SymbolIndexBuilder:
+    """Return a builder with the given packages and inventories added to it."""
+    builder = symbol_index.SymbolIndexBuilder()
+    for name, inventory in packages:
+        builder.add_package(
+            name,
+            f"https://{name}.invalid/",
+            symbol_index.inventory_entries(inventory),
+            symbol_index.inventory_digest(inventory),
+        )
+    return builder
+
+
+class SymbolIndexTests(TestCase):
+    """Tests for building and reading the symbol index."""
+
+    def setUp(self):
+        self.builder = build(("python", PYTHON_INVENTORY), ("other", OTHER_INVENTORY))
+        self.index = symbol_index.SymbolIndex(self.builder.build())
+
+    def test_index_contains_the_builders_symbols(self):
+        """Every symbol of the builder should be found in the index with the same item."""
+        self.assertEqual(len(self.index), len(self.builder.symbols))
+        for name, item in self.builder.symbols.items():
+            with self.subTest(name=name):
+                self.assertIn(name, self.index)
+                self.assertEqual(self.index.get(name), item)
+
+    def test_get_returns_doc_item(self):
+        """The item of a symbol should point to its page and fragment."""
+        self.assertEqual(
+            self.index.get("len"),
+            DocItem("python", "function", "https://python.invalid/", "library/functions.html", "len"),
+        )
+        self.assertEqual(self.index.get("ünïcode").url, "https://other.invalid/api.html")
+
+    def test_missing_symbols(self):
+        """Symbols which aren't in any inventory should not be found."""
+        for name in ("", "missing", "len2", "pr"):
+            with self.subTest(name=name):
+                self.assertIsNone(self.index.get(name))
+                self.assertNotIn(name, self.index)
+
+    def test_conflicting_symbols_are_renamed(self):
+        """Conflicting symbols should be renamed the same way the cog used to rename them."""
+        self.assertEqual(self.index.get("print").package, "python")
+        self.assertEqual(self.index.get("other.print").package, "other")
+        self.assertEqual(self.index.get("other.iterator").group, "label")
+        self.assertEqual(self.index.get("ünïcode").group, "function")
+        self.assertEqual(self.index.get("doc.ünïcode").group, "doc")
+        self.assertEqual(
+            self.index.renamed_symbols,
+            {"print": ["other.print"], "iterator": ["other.iterator"], "ünïcode": ["doc.ünïcode"]},
+        )
+
+    def test_metadata(self):
+        """The base URLs and digests of the packages should be kept in the order they were added."""
+        self.assertEqual(list(self.index.base_urls), ["python", "other"])
+        self.assertEqual(self.index.base_urls["other"], "https://other.invalid/")
+        self.assertEqual(self.index.digests["python"], symbol_index.inventory_digest(PYTHON_INVENTORY))
+
+    def test_page_items(self):
+        """All items on the page of an item should be returned, and nothing for unknown pages."""
+        page_items = self.index.page_items(self.index.get("len"))
+        self.assertCountEqual(page_items, [self.index.get("print"), self.index.get("len")])
+
+        self.assertEqual(self.index.page_items(DocItem("missing", "", "", "library/functions.html", "")), [])
+        unknown_page = self.index.get("len")._replace(relative_url_path="library/missing.html")
+        self.assertEqual(self.index.page_items(unknown_page), [])
+
+    def test_package_entries_rebuild_the_same_index(self):
+        """An index built from the entries of another index should be identical to it."""
+        entries = self.index.package_entries()
+        self.assertEqual(list(entries), ["python", "other"])
+
+        builder = symbol_index.SymbolIndexBuilder()
+        for name, package_entries in entries.items():
+            builder.add_package(name, self.index.base_urls[name], package_entries, self.index.digests[name])
+        self.assertEqual(builder.build(), self.builder.build())
+
+    def test_empty_index(self):
+        """An empty index should not contain anything."""
+        index = symbol_index.SymbolIndex.empty()
+        self.assertEqual(len(index), 0)
+        self.assertIsNone(index.get("print"))
+        self.assertEqual(index.base_urls, {})
+
+    def test_invalid_buffer_raises(self):
+        """Buffers not containing an index should be refused."""
+        with self.assertRaises(ValueError):
+            symbol_index.SymbolIndex(b"X" * symbol_index.HEADER.size)
+
+    def test_write_and_open(self):
+        """An index written to disk should be memory-mapped again when opened."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory, "doc", "symbols.idx")
+            self.assertIsNone(symbol_index.SymbolIndex.open(path))
+
+            written = symbol_index.SymbolIndex.write(self.builder, path)
+            opened = symbol_index.SymbolIndex.open(path)
+            try:
+                self.assertEqual(opened.get("other.print"), self.index.get("other.print"))
+                self.assertEqual(written.renamed_symbols, self.index.renamed_symbols)
+            finally:
+                written.close()
+                opened.close()
+
+            path.write_bytes(b"not an index")
+            self.assertIsNone(symbol_index.SymbolIndex.open(path))
+
+
+class SymbolSearchTests(TestCase):
+    """Tests for prefix and fuzzy searches of the symbol index."""
+
+    def setUp(self):
+        inventory = {
+            "py:class": [("asyncio.Queue", "library/asyncio-queue.html#$")],
+            "py:method": [
+                ("asyncio.Queue.get", "library/asyncio-queue.html#$"),
+                ("asyncio.Queue.put", "library/asyncio-queue.html#$"),
+                ("asyncio.Queue.put_nowait", "library/asyncio-queue.html#$"),
+                ("asyncio.gather", "library/asyncio-task.html#$"),
+                ("str.join", "library/stdtypes.html#$"),
+            ],
+        }
+        self.index = symbol_index.SymbolIndex(build(("python", inventory)).build())
+
+    def test_prefix_completions_come_first(self):
+        """Names starting with the query should be suggested first, without the query itself."""
+        self.assertEqual(self.index.complete("asyncio.Queue.p"), ["asyncio.Queue.put", "asyncio.Queue.put_nowait"])
+        self.assertEqual(self.index.complete("asyncio.Queue", 2), ["asyncio.Queue.get", "asyncio.Queue.put"])
+        self.assertEqual(self.index.search("asyncio.Queue.p", 3)[:2], ["asyncio.Queue.put", "asyncio.Queue.put_nowait"])
+
+    def test_misspelled_names_are_suggested(self):
+        """Names similar to a misspelled query should be suggested, ignoring case."""
+        self.assertEqual(self.index.search("asyncio.gahter")[0], "asyncio.gather")
+        self.assertEqual(self.index.search("Str.Join")[0], "str.join")
+        self.assertEqual(self.index.search("asyncio.queue.gte")[0], "asyncio.Queue.get")
+
+    def test_unrelated_queries_have_no_suggestions(self):
+        """Queries not resembling any name shouldn't get suggestions."""
+        for query in ("xy", "completely unrelated"):
+            with self.subTest(query=query):
+                self.assertEqual(self.index.search(query), [])
+        self.assertEqual(self.index.complete("missing"), [])
+
+    def test_common_trigrams_are_skipped(self):
+        """Trigrams contained in too many names shouldn't be counted if rarer trigrams match."""
+        with patch.object(symbol_index, "MAX_TRIGRAM_POSTINGS", 1):
+            self.assertEqual(self.index.search("str.jion")[0], "str.join")
+            # Only common trigrams match, the rarest one is still used.
+            self.assertIn("asyncio.Queue.get", self.index.search("asyncio.Queue.gxx"))
+
+
+class SymbolDisambiguationTests(TestCase):
+    """Tests for resolving conflicting symbol names in the `SymbolIndexBuilder`."""
+
+    def test_names_do_not_depend_on_package_order(self):
+        """The same packages added in any order should give the same names."""
+        packages = [
+            ("python", PYTHON_INVENTORY),
+            ("other", OTHER_INVENTORY),
+            ("third", {"py:function": [("print", "api.html#print")], "std:term": [("iterator", "api.html#term")]}),
+        ]
+        expected = build(*packages).symbols
+        for order in ((2, 1, 0), (1, 0, 2), (1, 2, 0)):
+            with self.subTest(order=order):
+                builder = build(*(packages[index] for index in order))
+                self.assertEqual(builder.symbols, expected)
+        self.assertEqual(expected["print"].package, "python")
+        self.assertEqual(expected["third.print"].package, "third")
+
+    def test_groups_prefixed_within_package(self):
+        """Conflicting symbols of a package should keep the name by group, and others get their group as prefix."""
+        inventory = {
+            "std:doc": [("spam", "doc.html")],
+            "std:label": [("spam", "label.html#spam")],
+            "py:module": [("spam", "module.html#spam")],
+        }
+        symbols = build(("package", inventory)).symbols
+        self.assertEqual(
+            {name: item.group for name, item in symbols.items()},
+            {"spam": "module", "label.spam": "label", "doc.spam": "doc"},
+        )
+
+    def test_taken_prefixed_names_are_qualified_further(self):
+        """A prefixed name which is already a symbol's name should be qualified with the package and the group."""
+        builder = build(
+            ("python", {"py:function": [("spam", "a.html#spam")]}),
+            ("other", {"py:function": [("spam", "b.html#spam"), ("other.spam", "c.html#other.spam")]}),
+        )
+        self.assertEqual(builder.symbols["other.spam"].relative_url_path, "c.html")
+        self.assertEqual(builder.symbols["other.function.spam"].relative_url_path, "b.html")
+        self.assertEqual(builder.renamed_symbols, {"spam": ["other.function.spam"]})
+
+    def test_package_added_twice_raises(self):
+        """Adding a package which was already added should raise a `ValueError`."""
+        with self.assertRaises(ValueError):
+            build(("python", PYTHON_INVENTORY), ("python", OTHER_INVENTORY))
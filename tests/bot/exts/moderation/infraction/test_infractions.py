@@ -1,6 +1,8 @@
 import inspect
 import textwrap
 import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from unittest.mock import ANY, AsyncMock, MagicMock, Mock, patch
 
 from discord.errors import NotFound
@@ -8,6 +10,7 @@ from discord.errors import NotFound
 from bot.constants import Event
 from bot.exts.moderation.infraction import _utils
 from bot.exts.moderation.infraction.infractions import Infractions
+from bot.utils.schedule_journal import JournalItem
 from tests.helpers import MockBot, MockContext, MockGuild, MockMember, MockRole, MockUser, autospec
 
 
@@ -231,3 +234,117 @@ class VoiceMuteTests(unittest.IsolatedAsyncioTestCase):
             "DM": "**Failed**"
         })
         notify_pardon_mock.assert_awaited_once()
+
+
+class RescheduleInfractionsTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for rescheduling the expiration of infractions from the schedule journal and the API."""
+
+    def setUp(self):
+        scheduling_config = SimpleNamespace(window=86400, sweep_interval=3600, page_size=2)
+        patcher = patch("bot.exts.moderation.infraction._scheduler.constants.InfractionScheduling", scheduling_config)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.bot = MockBot()
+        self.cog = Infractions(self.bot)
+        self.addCleanup(self.cog.scheduler.cancel_all)
+        self.cog.schedule_journal = MagicMock(items=AsyncMock(return_value=[]), add=AsyncMock(), remove=AsyncMock())
+        self.respond()
+
+    @staticmethod
+    def infraction(id_: int, expires_in: float = 3600) -> dict:
+        """Return an active infraction with the ID `id_`, expiring after `expires_in` seconds."""
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+        return {"id": id_, "type": "ban", "expires_at": expires_at.isoformat()}
+
+    def journal(self, *infractions: dict) -> None:
+        """Make the schedule journal return `infractions`."""
+        self.cog.schedule_journal.items.return_value = [
+            JournalItem(datetime.fromisoformat(infraction["expires_at"]), infraction) for infraction in infractions
+        ]
+
+    def respond(self, *infractions: dict) -> None:
+        """Make the API return the `infractions` expiring before the requested time, paginated by limit and offset."""
+        async def get(endpoint: str, params: dict) -> list:
+            expiring = [i for i in infractions if i["expires_at"] < params["expires_before"]]
+            return expiring[params["offset"]:params["offset"] + params["limit"]]
+
+        self.bot.api_client.get.side_effect = get
+
+    async def test_infractions_loaded_page_by_page(self):
+        """All pages of infractions expiring within the window should be requested and scheduled."""
+        infractions = [self.infraction(i, expires_in=i * 60) for i in range(1, 6)]
+        self.respond(*infractions)
+
+        await self.cog.reschedule_infractions(["ban"])
+
+        self.assertEqual(self.bot.api_client.get.await_count, 3)
+        offsets = [call.kwargs["params"]["offset"] for call in self.bot.api_client.get.await_args_list]
+        self.assertEqual(offsets, [0, 2, 4])
+        for infraction in infractions:
+            self.assertIn(infraction["id"], self.cog.scheduler)
+
+    async def test_infractions_outside_window_not_scheduled(self):
+        """Infractions expiring after the window should only be scheduled by a later sweep."""
+        self.respond(self.infraction(1), self.infraction(2, expires_in=86400 * 30))
+
+        await self.cog.reschedule_infractions(["ban"])
+
+        self.assertIn(1, self.cog.scheduler)
+        self.assertNotIn(2, self.cog.scheduler)
+        self.cog.schedule_journal.items.assert_awaited_once()
+        self.assertLess(
+            self.cog.schedule_journal.items.call_args.kwargs["until"],
+            datetime.now(timezone.utc) + timedelta(days=2),
+        )
+
+    async def test_journaled_infractions_scheduled_before_api_request(self):
+        """Infractions from the journal should be scheduled before the API responds."""
+        infraction = self.infraction(1)
+        self.journal(infraction)
+        self.respond(infraction)
+        respond = self.bot.api_client.get.side_effect
+
+        async def get(*args, **kwargs) -> list:
+            self.assertIn(1, self.cog.scheduler)
+            return await respond(*args, **kwargs)
+
+        self.bot.api_client.get.side_effect = get
+        await self.cog.reschedule_infractions(["ban"])
+
+        self.bot.api_client.get.assert_awaited_once()
+        self.assertIn(1, self.cog.scheduler)
+
+    async def test_overdue_journaled_infractions_wait_for_api(self):
+        """Overdue infractions from the journal shouldn't be deactivated unless the API still has them as active."""
+        self.journal(self.infraction(1, expires_in=-60))
+
+        with patch.object(self.cog, "deactivate_infraction") as deactivate_infraction:
+            await self.cog.reschedule_infractions(["ban"])
+
+        deactivate_infraction.assert_not_called()
+        self.cog.schedule_journal.remove.assert_called_once_with(1)
+
+    async def test_inactive_journaled_infractions_cancelled(self):
+        """Journaled infractions which are no longer active should be cancelled and removed from the journal."""
+        self.journal(self.infraction(1), self.infraction(2))
+        self.respond(self.cog.schedule_journal.items.return_value[1].payload)
+
+        await self.cog.reschedule_infractions(["ban"])
+
+        self.assertNotIn(1, self.cog.scheduler)
+        self.assertIn(2, self.cog.scheduler)
+        self.cog.schedule_journal.remove.assert_called_once_with(1)
+
+    async def test_edited_and_missing_infractions_scheduled_from_api(self):
+        """Infractions missing from the journal or edited since should be scheduled from the API's version."""
+        self.journal(self.infraction(1))
+        api_infractions = [self.infraction(1, expires_in=7200), self.infraction(2)]
+        self.respond(*api_infractions)
+
+        with patch.object(self.cog, "schedule_expiration", wraps=self.cog.schedule_expiration) as schedule_expiration:
+            await self.cog.reschedule_infractions(["ban"])
+
+        self.assertEqual(schedule_expiration.call_args_list[-2:], [((infraction,),) for infraction in api_infractions])
+        self.assertIn(1, self.cog.scheduler)
+        self.assertIn(2, self.cog.scheduler)
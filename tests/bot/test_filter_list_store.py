@@ -0,0 +1,90 @@
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from bot.filter_list_store import FilterListStore
+from tests.helpers import MockBot
+
+ITEM = {
+    "id": 1,
+    "type": "DOMAIN_NAME",
+    "allowed": False,
+    "content": "evil.com",
+    "comment": None,
+    "created_at": "2021-01-01T00:00:00Z",
+    "updated_at": "2021-01-01T00:00:00Z",
+}
+
+
+def change(version: int, action: str, item: dict = ITEM) -> str:
+    """Encode a change the way it is published and logged."""
+    return f"{version} {json.dumps({'action': action, 'item': item})}"
+
+
+class FilterListStoreTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the `FilterListStore` class."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.bot.redis_session = MagicMock(global_namespace="bot")
+        self.pool = self.bot.redis_session.pool
+        self.pool.zrangebyscore = AsyncMock(return_value=[])
+        self.pool.get = AsyncMock(return_value=None)
+
+        self.store = FilterListStore(self.bot)
+        self.store._load_snapshot = AsyncMock()
+
+    async def test_next_change_is_applied(self):
+        """A change following the local version is applied to the cache directly."""
+        await self.store._handle(change(1, "insert"))
+
+        self.bot.insert_item_into_filter_list_cache.assert_called_once_with(ITEM)
+        self.assertEqual(self.store.version, 1)
+        self.pool.zrangebyscore.assert_not_awaited()
+
+    async def test_already_applied_changes_are_ignored(self):
+        """Changes up to the local version, such as ones made by this process, are not applied again."""
+        self.store.version = 3
+        await self.store._handle(change(3, "insert"))
+
+        self.bot.insert_item_into_filter_list_cache.assert_not_called()
+        self.assertEqual(self.store.version, 3)
+
+    async def test_missed_changes_are_replayed_from_log(self):
+        """When changes were missed, they are replayed from the log in order."""
+        removal = {"type": ITEM["type"], "allowed": ITEM["allowed"], "content": ITEM["content"]}
+        self.pool.zrangebyscore.return_value = [(change(1, "insert"), 1.0), (change(2, "remove", removal), 2.0)]
+
+        await self.store._handle(change(2, "remove", removal))
+
+        self.bot.insert_item_into_filter_list_cache.assert_called_once_with(ITEM)
+        self.bot.remove_item_from_filter_list_cache.assert_called_once_with("DOMAIN_NAME", False, "evil.com")
+        self.assertEqual(self.store.version, 2)
+        self.store._load_snapshot.assert_not_awaited()
+
+    async def test_snapshot_is_loaded_when_log_is_incomplete(self):
+        """The snapshot is reloaded when the missed changes are no longer in the log."""
+        self.store.version = 1
+        self.pool.zrangebyscore.return_value = [(change(5, "insert"), 5.0)]
+
+        await self.store._handle(change(5, "insert"))
+
+        self.store._load_snapshot.assert_awaited_once()
+        self.bot.insert_item_into_filter_list_cache.assert_not_called()
+
+    async def test_reload_loads_snapshot(self):
+        """A reload published by another process makes the snapshot be loaded again."""
+        self.pool.get.return_value = b"1"
+        await self.store._handle(f"1 {json.dumps({'action': 'reload'})}")
+
+        self.store._load_snapshot.assert_awaited_once()
+
+    async def test_catch_up_does_nothing_when_up_to_date(self):
+        """Catching up when no changes were missed neither applies changes nor loads the snapshot."""
+        self.store.version = 4
+        self.pool.get.return_value = b"4"
+
+        await self.store._catch_up()
+
+        self.store._load_snapshot.assert_not_awaited()
+        self.bot.insert_item_into_filter_list_cache.assert_not_called()
@@ -0,0 +1,81 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+from discord.utils import time_snowflake
+
+from bot.utils.message_snapshot import MessageSnapshot
+from tests.helpers import MockGuild, MockMember, MockMessage, MockRole, MockTextChannel
+
+
+class MessageSnapshotTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the MessageSnapshot class in the `bot.utils.message_snapshot` module."""
+
+    def setUp(self):
+        self.guild = MockGuild()
+        self.guild.get_member.return_value = None
+        self.guild.get_role.return_value = None
+        self.guild.get_channel_or_thread.return_value = None
+
+        self.channel = MockTextChannel(guild=self.guild)
+        self.author = MockMember()
+        self.sent_at = datetime(2021, 1, 1, tzinfo=timezone.utc)
+        self.message = MockMessage(
+            id=time_snowflake(self.sent_at),
+            channel=self.channel,
+            author=self.author,
+            content="hello",
+            attachments=["attachment"],
+            embeds=[],
+            mentions=[],
+            role_mentions=[],
+        )
+
+    def test_from_message_copies_fields(self):
+        """A snapshot keeps the fields of the message it was taken from."""
+        snapshot = MessageSnapshot.from_message(self.message)
+
+        self.assertEqual(snapshot.id, self.message.id)
+        self.assertIs(snapshot.channel, self.channel)
+        self.assertIs(snapshot.author, self.author)
+        self.assertEqual(snapshot.content, "hello")
+        self.assertTupleEqual(snapshot.attachments, ("attachment",))
+        self.assertEqual(snapshot.created_at, self.sent_at)
+        self.assertIs(snapshot.guild, self.guild)
+
+    def test_snapshot_is_immutable(self):
+        """The fields of a snapshot can't be changed, and no other attributes can be added."""
+        snapshot = MessageSnapshot.from_message(self.message)
+
+        with self.assertRaises(AttributeError):
+            snapshot.content = "edited"
+        with self.assertRaises(AttributeError):
+            snapshot.reactions = []
+
+    async def test_delete_uses_partial_message(self):
+        """Deleting a snapshot deletes the message through a partial message re-hydrated from the channel."""
+        partial_message = self.channel.get_partial_message.return_value
+        partial_message.delete = AsyncMock()
+        snapshot = MessageSnapshot.from_message(self.message)
+
+        await snapshot.delete()
+
+        self.channel.get_partial_message.assert_called_once_with(self.message.id)
+        partial_message.delete.assert_awaited_once_with(delay=None)
+
+    def test_clean_content_resolves_mentions(self):
+        """Mentions are shown the way the client shows them, and mass mentions are escaped."""
+        member = MockMember(id=123456789012345678, display_name="lemon")
+        role = MockRole(id=223456789012345678, name="helpers")
+        self.message.mentions = [member]
+        self.message.role_mentions = [role]
+        self.message.content = (
+            f"<@{member.id}> <@!{member.id}> <@&{role.id}> <#323456789012345678> <@423456789012345678> @everyone"
+        )
+
+        snapshot = MessageSnapshot.from_message(self.message)
+
+        self.assertEqual(
+            snapshot.clean_content,
+            "@lemon @lemon @helpers #deleted-channel @deleted-user @\u200beveryone"
+        )
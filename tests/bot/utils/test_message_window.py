@@ -0,0 +1,149 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from bot.utils.message_features import MessageFeatures
+from bot.utils.message_window import MessageWindow, SlidingWindows, WindowRule
+from tests.helpers import MockMember, MockMessage
+
+START = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def measure_content(features: MessageFeatures) -> dict:
+    """Count the characters of the message's content."""
+    return {"chars": features.chars}
+
+
+def make_msg(id_: int, author: MockMember, content: str = "", seconds: int = 0) -> MockMessage:
+    """Make a message sent by `author` `seconds` after the start of the tests."""
+    return MockMessage(id=id_, author=author, content=content, created_at=START + timedelta(seconds=seconds))
+
+
+class MessageWindowTests(unittest.TestCase):
+    """Tests for the MessageWindow class in the `bot.utils.message_window` module."""
+
+    def test_append_adds_to_totals(self):
+        """Appending a message adds its measurement to the running totals."""
+        window = MessageWindow(measure_content)
+        window.append(MockMessage(id=1, content="abc"))
+        window.append(MockMessage(id=2, content="de"))
+
+        self.assertEqual(window.totals["chars"], 5)
+        self.assertEqual(len(window), 2)
+
+    def test_iteration_is_newest_first(self):
+        """Iterating over the window yields the most recently appended message first."""
+        messages = [MockMessage(id=i, content="") for i in range(3)]
+        window = MessageWindow(measure_content)
+        for msg in messages:
+            window.append(msg)
+
+        self.assertListEqual(list(window), messages[::-1])
+
+    def test_popleft_subtracts_from_totals(self):
+        """Removing the oldest message subtracts its measurement, and drops keys which reach zero."""
+        window = MessageWindow(measure_content)
+        first = MockMessage(id=1, content="abc")
+        window.append(first)
+        window.append(MockMessage(id=2, content="de"))
+
+        self.assertIs(window.popleft(), first)
+        self.assertEqual(window.totals["chars"], 2)
+
+        window.popleft()
+        self.assertNotIn("chars", window.totals)
+
+    def test_maxlen_evicts_oldest(self):
+        """Appending to a full window evicts the oldest message and its measurement."""
+        window = MessageWindow(measure_content, maxlen=2)
+        messages = [MockMessage(id=i, content="a" * (i + 1)) for i in range(3)]
+        for msg in messages:
+            window.append(msg)
+
+        self.assertListEqual(list(window), messages[:0:-1])
+        self.assertEqual(window.totals["chars"], 5)
+
+    def test_update_remeasures_message(self):
+        """Updating a message replaces it and adjusts the totals by the difference in measurements."""
+        window = MessageWindow(measure_content)
+        window.append(MockMessage(id=1, content="abc"))
+        edited = MockMessage(id=1, content="abcdef")
+
+        self.assertTrue(window.update(edited))
+        self.assertEqual(window.totals["chars"], 6)
+        self.assertIs(window.oldest, edited)
+        self.assertFalse(window.update(MockMessage(id=2, content="")))
+
+    def test_from_messages_keeps_order(self):
+        """A window built from a newest-first list iterates in the same order."""
+        messages = [MockMessage(id=i, content="ab") for i in range(3)]
+        window = MessageWindow.from_messages(messages, measure_content)
+
+        self.assertListEqual(list(window), messages)
+        self.assertEqual(window.totals["chars"], 6)
+
+
+class SlidingWindowsTests(unittest.TestCase):
+    """Tests for the SlidingWindows class in the `bot.utils.message_window` module."""
+
+    def setUp(self):
+        self.alice = MockMember(id=1)
+        self.bob = MockMember(id=2)
+        self.windows = SlidingWindows({
+            "chars": WindowRule(interval=10, measure=measure_content),
+            "shared": WindowRule(interval=5, per_author=False),
+        })
+
+    def test_windows_are_per_author(self):
+        """Each author gets their own window for rules which are per author."""
+        alice_msg = make_msg(1, self.alice, "abc")
+        bob_msg = make_msg(2, self.bob, "de")
+        self.windows.append(alice_msg, START)
+        self.windows.append(bob_msg, START)
+
+        self.assertListEqual(list(self.windows.get("chars", alice_msg)), [alice_msg])
+        self.assertEqual(self.windows.get("chars", bob_msg).totals["chars"], 2)
+
+    def test_shared_window_spans_authors(self):
+        """Rules which are not per author see the messages of all authors."""
+        messages = [make_msg(1, self.alice), make_msg(2, self.bob)]
+        for msg in messages:
+            self.windows.append(msg, START)
+
+        self.assertListEqual(list(self.windows.get("shared", messages[0])), messages[::-1])
+
+    def test_messages_expire_after_interval(self):
+        """Messages leave a rule's window once they are older than its interval."""
+        old = make_msg(1, self.alice, "abc", seconds=0)
+        new = make_msg(2, self.alice, "de", seconds=7)
+        self.windows.append(old, START)
+        self.windows.append(new, START + timedelta(seconds=7))
+
+        self.assertListEqual(list(self.windows.get("chars", new)), [new, old])
+        self.assertListEqual(list(self.windows.get("shared", new)), [new])
+
+        self.windows.expire(START + timedelta(seconds=10))
+        self.assertListEqual(list(self.windows.get("chars", new)), [new])
+        self.assertEqual(self.windows.get("chars", new).totals["chars"], 2)
+
+    def test_empty_windows_are_dropped(self):
+        """Windows are discarded once all of their messages have expired."""
+        self.windows.append(make_msg(1, self.alice), START)
+        self.windows.expire(START + timedelta(seconds=60))
+
+        self.assertDictEqual(self.windows._windows, {})
+
+    def test_features_are_extracted_once_per_message(self):
+        """A message's features are shared between the windows of all rules."""
+        with patch("bot.utils.message_window.MessageFeatures", wraps=MessageFeatures) as features:
+            self.windows.append(make_msg(1, self.alice, "abc"), START)
+
+        features.assert_called_once()
+
+    def test_update_adjusts_totals(self):
+        """Edited messages are re-measured in the windows they belong to."""
+        msg = make_msg(1, self.alice, "abc")
+        self.windows.append(msg, START)
+
+        self.assertTrue(self.windows.update(make_msg(1, self.alice, "abcdef")))
+        self.assertEqual(self.windows.get("chars", msg).totals["chars"], 6)
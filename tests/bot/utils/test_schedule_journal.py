@@ -0,0 +1,65 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+
+from bot.utils.schedule_journal import JournalItem, ScheduleJournal
+
+DUE = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+class ScheduleJournalTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for recording scheduled items in the `ScheduleJournal`."""
+
+    def setUp(self):
+        patcher = patch.object(ScheduleJournal, "namespace", new_callable=PropertyMock, return_value="journal")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.journal = ScheduleJournal(namespace="journal")
+        self.connection = MagicMock(zrangebyscore=AsyncMock(), hmget=AsyncMock())
+        self.connection.__enter__.return_value = self.connection
+        self.transaction = self.connection.multi_exec.return_value
+        self.transaction.execute = AsyncMock()
+        self.journal._get_pool_connection = AsyncMock(return_value=self.connection)
+
+    async def test_add_writes_due_time_and_payload_in_one_transaction(self):
+        """Adding an item should score it by its due time and store its payload atomically."""
+        await self.journal.add(5, DUE, {"id": 5})
+
+        self.transaction.zadd.assert_called_once_with("journal:due", DUE.timestamp(), "5")
+        self.transaction.hset.assert_called_once_with("journal:items", "5", json.dumps({"id": 5}))
+        self.transaction.execute.assert_awaited_once()
+
+    async def test_naive_due_times_are_utc(self):
+        """Naïve due times should be treated as UTC."""
+        await self.journal.add(5, DUE.replace(tzinfo=None), {"id": 5})
+        self.transaction.zadd.assert_called_once_with("journal:due", DUE.timestamp(), "5")
+
+    async def test_remove_deletes_due_time_and_payload(self):
+        """Removing an item should delete it from both keys in one transaction."""
+        await self.journal.remove(5)
+
+        self.transaction.zrem.assert_called_once_with("journal:due", "5")
+        self.transaction.hdel.assert_called_once_with("journal:items", "5")
+        self.transaction.execute.assert_awaited_once()
+
+    async def test_items_read_with_a_range_scan(self):
+        """Items should be returned in due order, skipping items whose payload is missing."""
+        self.connection.zrangebyscore.return_value = [("1", DUE.timestamp()), ("2", DUE.timestamp() + 60)]
+        self.connection.hmget.return_value = [json.dumps({"id": 1}), None]
+
+        items = await self.journal.items(until=DUE)
+
+        self.assertEqual(items, [JournalItem(DUE, {"id": 1})])
+        self.connection.zrangebyscore.assert_awaited_once_with(
+            "journal:due", max=DUE.timestamp(), withscores=True, encoding="utf-8"
+        )
+        self.connection.hmget.assert_awaited_once_with("journal:items", "1", "2", encoding="utf-8")
+
+    async def test_no_items(self):
+        """The payloads shouldn't be requested if there are no items."""
+        self.connection.zrangebyscore.return_value = []
+
+        self.assertEqual(await self.journal.items(), [])
+        self.connection.hmget.assert_not_awaited()
@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+
+from bot.utils import scheduling
+
+
+class LazySchedulerTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the `Scheduler` with `lazy_tasks`, which only creates tasks once they're due."""
+
+    def setUp(self):
+        self.scheduler = scheduling.Scheduler("test", lazy_tasks=True)
+        self.addCleanup(self.scheduler.cancel_all)
+        self.calls = []
+
+    async def record(self, value: str) -> None:
+        """Record that the coroutine for `value` ran."""
+        self.calls.append(value)
+
+    async def test_no_task_until_due(self):
+        """A coroutine scheduled in the future shouldn't get a task until it's due."""
+        self.scheduler.schedule_later(0.05, "spam", self.record("spam"))
+
+        self.assertIn("spam", self.scheduler)
+        self.assertEqual(self.scheduler._scheduled_tasks, {})
+
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.calls, ["spam"])
+        self.assertNotIn("spam", self.scheduler)
+
+    async def test_due_in_order(self):
+        """Coroutines should run in the order they're due, regardless of the order they were scheduled in."""
+        self.scheduler.schedule_later(0.06, "late", self.record("late"))
+        self.scheduler.schedule_at(datetime.utcnow() + timedelta(seconds=0.02), "early", self.record("early"))
+        self.scheduler.schedule_later(0.04, "middle", self.record("middle"))
+
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.calls, ["early", "middle", "late"])
+
+    async def test_past_times_run_immediately(self):
+        """Coroutines scheduled in the past should get their task immediately."""
+        self.scheduler.schedule_at(datetime.utcnow() - timedelta(seconds=5), "spam", self.record("spam"))
+        self.assertIn("spam", self.scheduler._scheduled_tasks)
+
+        await asyncio.sleep(0)
+        self.assertEqual(self.calls, ["spam"])
+
+    async def test_cancel_pending(self):
+        """Cancelled coroutines should be closed and never run, and their ID should be free to reschedule."""
+        coroutine = self.record("first")
+        self.scheduler.schedule_later(0.02, "spam", coroutine)
+        self.scheduler.cancel("spam")
+
+        self.assertNotIn("spam", self.scheduler)
+        self.assertEqual(coroutine.cr_frame, None)
+
+        self.scheduler.schedule_later(0.04, "spam", self.record("second"))
+        await asyncio.sleep(0.08)
+        self.assertEqual(self.calls, ["second"])
+
+    async def test_duplicate_ids_not_scheduled(self):
+        """A coroutine with the ID of a pending coroutine should be closed instead of scheduled."""
+        self.scheduler.schedule_later(0.02, "spam", self.record("first"))
+        duplicate = self.record("second")
+        self.scheduler.schedule_later(0.01, "spam", duplicate)
+        self.scheduler.schedule("spam", self.record("third"))
+
+        self.assertEqual(duplicate.cr_frame, None)
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.calls, ["first"])
+
+    async def test_cancelled_entries_dropped_from_heap(self):
+        """Cancelling many pending coroutines shouldn't keep their entries in the heap."""
+        for i in range(200):
+            self.scheduler.schedule_later(60, i, self.record(str(i)))
+        for i in range(190):
+            self.scheduler.cancel(i)
+
+        self.assertLessEqual(len(self.scheduler._pending_heap), 2 * 10 + 64)
+        self.assertEqual(len(self.scheduler._pending), 10)
+
+    async def test_cancel_all(self):
+        """All pending and running tasks should be cancelled."""
+        self.scheduler.schedule("running", asyncio.sleep(10))
+        self.scheduler.schedule_later(0.01, "pending", self.record("pending"))
+
+        self.scheduler.cancel_all()
+        await asyncio.sleep(0.03)
+
+        self.assertNotIn("running", self.scheduler)
+        self.assertNotIn("pending", self.scheduler)
+        self.assertEqual(self.calls, [])